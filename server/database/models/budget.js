@@ -1,10 +1,12 @@
 const { DataTypes } = require('sequelize');
 const sequelize = require('./db');
+const withCategoryKey = require('./categoryKey');
 
 const Budget = sequelize.define('Budget', {
     id: { type: DataTypes.INTEGER, primaryKey: true, autoIncrement: true },
     user_id: { type: DataTypes.INTEGER, allowNull: false },
     category: { type: DataTypes.STRING(100), allowNull: false },
+    category_key: { type: DataTypes.STRING(100), allowNull: true },
     amount: { type: DataTypes.DECIMAL(10, 2), allowNull: false },
     period_start: { type: DataTypes.DATEONLY, allowNull: false },
     period_end: { type: DataTypes.DATEONLY, allowNull: false },
@@ -16,7 +18,10 @@ const Budget = sequelize.define('Budget', {
 }, {
     tableName: 'djangoapp_budget',
     timestamps: false,
-    indexes: [{ unique: true, fields: ['category', 'user_id'] }],
+    indexes: [
+        { unique: true, fields: ['user_id', 'category', 'period_start'] },
+        { name: 'budget_user_catkey_idx', fields: ['user_id', 'category_key'] },
+    ],
 });
 
-module.exports = Budget;
\ No newline at end of file
+module.exports = withCategoryKey(Budget);
\ No newline at end of file
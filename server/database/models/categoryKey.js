@@ -0,0 +1,23 @@
+// category_key is the category trimmed and lowercased, stored next to
+// the name as typed so case-insensitive category filters can use an
+// index. Mirrors djangoapp/services/category_keys.py -- keep the two in
+// sync. Django fills the column on save(); these hooks do the same for
+// rows written through this API.
+
+function categoryKey(category) {
+    return category == null ? null : String(category).trim().toLowerCase();
+}
+
+function withCategoryKey(model) {
+    const fill = (instance) => {
+        instance.category_key = categoryKey(instance.category);
+    };
+    // create() and instance.update()
+    model.addHook('beforeSave', fill);
+    // POST /bulk
+    model.addHook('beforeBulkCreate', (instances) => instances.forEach(fill));
+    return model;
+}
+
+module.exports = withCategoryKey;
+module.exports.categoryKey = categoryKey;
@@ -13,6 +13,7 @@ const FriendshipNotification = sequelize.define('FriendshipNotification', {
 }, {
     tableName: 'djangoapp_friendshipnotification',
     timestamps: false,
+    indexes: [{ name: 'friend_notification_inbox_idx', fields: ['user_id', 'is_read', 'created_at'] }],
 });
 
 module.exports = FriendshipNotification;
\ No newline at end of file
@@ -12,6 +12,7 @@ const Income = sequelize.define('Income', {
 }, {
     tableName: 'djangoapp_income',
     timestamps: false,
+    indexes: [{ name: 'income_user_period_idx', fields: ['user_id', 'period_start', 'period_end'] }],
 });
 
 module.exports = Income;
\ No newline at end of file
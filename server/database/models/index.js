@@ -11,6 +11,7 @@ const SharedBudgetInvite = require('./sharedBudgetInvite');
 const SharedExpense = require('./sharedExpense');
 const ExpenseSplit = require('./expenseSplit');
 const Settlement = require('./settlement');
+const SharedBudgetBalance = require('./sharedBudgetBalance');
 const SharedBudgetNotification = require('./sharedBudgetNotification');
 const Friendship = require('./friendship');
 const FriendshipNotification = require('./friendshipNotification');
@@ -49,6 +50,10 @@ Settlement.belongsTo(SharedBudget, { foreignKey: 'shared_budget_id', as: 'shared
 Settlement.belongsTo(User, { foreignKey: 'payer_id', as: 'payer' });
 Settlement.belongsTo(User, { foreignKey: 'receiver_id', as: 'receiver' });
 
+SharedBudget.hasMany(SharedBudgetBalance, { foreignKey: 'shared_budget_id', as: 'balances' });
+SharedBudgetBalance.belongsTo(SharedBudget, { foreignKey: 'shared_budget_id', as: 'sharedBudget' });
+SharedBudgetBalance.belongsTo(User, { foreignKey: 'user_id' });
+
 SharedBudgetNotification.belongsTo(User, { foreignKey: 'user_id' });
 SharedBudgetNotification.belongsTo(User, { foreignKey: 'from_user_id', as: 'fromUser' });
 SharedBudgetNotification.belongsTo(SharedBudget, { foreignKey: 'shared_budget_id', as: 'sharedBudget' });
@@ -74,6 +79,7 @@ module.exports = {
     SharedExpense,
     ExpenseSplit,
     Settlement,
+    SharedBudgetBalance,
     SharedBudgetNotification,
     Friendship,
     FriendshipNotification,
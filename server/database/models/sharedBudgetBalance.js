@@ -0,0 +1,18 @@
+const { DataTypes } = require('sequelize');
+const sequelize = require('./db');
+
+const SharedBudgetBalance = sequelize.define('SharedBudgetBalance', {
+    id: { type: DataTypes.BIGINT, primaryKey: true, autoIncrement: true },
+    shared_budget_id: { type: DataTypes.BIGINT, allowNull: false },
+    user_id: { type: DataTypes.INTEGER, allowNull: false },
+    total_paid: { type: DataTypes.DECIMAL(12, 2), defaultValue: 0 },
+    total_owed: { type: DataTypes.DECIMAL(12, 2), defaultValue: 0 },
+    settlements_in: { type: DataTypes.DECIMAL(12, 2), defaultValue: 0 },
+    settlements_out: { type: DataTypes.DECIMAL(12, 2), defaultValue: 0 },
+}, {
+    tableName: 'djangoapp_sharedbudgetbalance',
+    timestamps: false,
+    indexes: [{ unique: true, fields: ['shared_budget_id', 'user_id'] }],
+});
+
+module.exports = SharedBudgetBalance;
@@ -13,6 +13,7 @@ const SharedBudgetNotification = sequelize.define('SharedBudgetNotification', {
 }, {
     tableName: 'djangoapp_sharedbudgetnotification',
     timestamps: false,
+    indexes: [{ name: 'sb_notification_inbox_idx', fields: ['user_id', 'is_read', 'created_at'] }],
 });
 
 module.exports = SharedBudgetNotification;
\ No newline at end of file
@@ -1,5 +1,6 @@
 const { DataTypes } = require('sequelize');
 const sequelize = require('./db');
+const withCategoryKey = require('./categoryKey');
 
 const SharedExpense = sequelize.define('SharedExpense', {
     id: { type: DataTypes.BIGINT, primaryKey: true, autoIncrement: true },
@@ -9,6 +10,7 @@ const SharedExpense = sequelize.define('SharedExpense', {
     paid_by_id: { type: DataTypes.INTEGER, allowNull: false },
     date: { type: DataTypes.DATEONLY, allowNull: false },
     category: { type: DataTypes.STRING(50), allowNull: true },
+    category_key: { type: DataTypes.STRING(50), allowNull: true },
     created_at: { type: DataTypes.DATE },
     created_by_id: { type: DataTypes.INTEGER, allowNull: false },
     receipt_image: { type: DataTypes.STRING(255), allowNull: true },
@@ -16,6 +18,7 @@ const SharedExpense = sequelize.define('SharedExpense', {
 }, {
     tableName: 'djangoapp_sharedexpense',
     timestamps: false,
+    indexes: [{ name: 'sharedexpense_catkey_idx', fields: ['shared_budget_id', 'category_key'] }],
 });
 
-module.exports = SharedExpense;
\ No newline at end of file
+module.exports = withCategoryKey(SharedExpense);
\ No newline at end of file
@@ -1,5 +1,6 @@
 const { DataTypes } = require('sequelize');
 const sequelize = require('./db');
+const withCategoryKey = require('./categoryKey');
 
 const Subscription = sequelize.define('Subscription', {
     id: { type: DataTypes.INTEGER, primaryKey: true, autoIncrement: true },
@@ -7,6 +8,7 @@ const Subscription = sequelize.define('Subscription', {
     name: { type: DataTypes.STRING(100), allowNull: false },
     amount: { type: DataTypes.DECIMAL(10, 2), allowNull: false },
     category: { type: DataTypes.STRING(100), allowNull: false },
+    category_key: { type: DataTypes.STRING(100), allowNull: true },
     billing_cycle: { type: DataTypes.STRING(20), defaultValue: 'monthly' },
     billing_day: { type: DataTypes.INTEGER, defaultValue: 1 },
     start_date: { type: DataTypes.DATEONLY, allowNull: false },
@@ -15,9 +17,11 @@ const Subscription = sequelize.define('Subscription', {
     description: { type: DataTypes.STRING(255), allowNull: true, defaultValue: '' },
     created_at: { type: DataTypes.DATE },
     updated_at: { type: DataTypes.DATE },
+    materialized_through: { type: DataTypes.DATEONLY, allowNull: true },
 }, {
     tableName: 'djangoapp_subscription',
     timestamps: false,
+    indexes: [{ name: 'subscription_user_catkey_idx', fields: ['user_id', 'category_key'] }],
 });
 
-module.exports = Subscription;
\ No newline at end of file
+module.exports = withCategoryKey(Subscription);
\ No newline at end of file
@@ -1,5 +1,6 @@
 const { DataTypes } = require('sequelize');
 const sequelize = require('./db');
+const withCategoryKey = require('./categoryKey');
 
 const Transaction = sequelize.define('Transaction', {
     id: { type: DataTypes.INTEGER, primaryKey: true, autoIncrement: true },
@@ -7,10 +8,15 @@ const Transaction = sequelize.define('Transaction', {
     amount: { type: DataTypes.DECIMAL(10, 2), allowNull: false },
     description: { type: DataTypes.STRING(255), allowNull: false },
     category: { type: DataTypes.STRING(100), allowNull: true },
+    category_key: { type: DataTypes.STRING(100), allowNull: true },
     date: { type: DataTypes.DATEONLY, allowNull: false },
 }, {
     tableName: 'djangoapp_transaction',
     timestamps: false,
+    indexes: [
+        { name: 'transaction_user_date_idx', fields: ['user_id', 'date'] },
+        { name: 'transaction_user_catkey_idx', fields: ['user_id', 'category_key', 'date'] },
+    ],
 });
 
-module.exports = Transaction;
\ No newline at end of file
+module.exports = withCategoryKey(Transaction);
\ No newline at end of file
@@ -0,0 +1,53 @@
+const buildCrudRouter = require('./crud');
+const db = require('../models');
+
+const COLUMNS = ['total_paid', 'total_owed', 'settlements_in', 'settlements_out'];
+
+/**
+ * Router for the per-member shared budget ledger (djangoapp's
+ * SharedBudgetBalance). Rows are never written directly; instead
+ *
+ *   POST /adjust   { shared_budget_id, adjustments: [{ user_id, total_paid, ... }] }
+ *
+ * adds each delta to the member's row (creating it if needed) as a single
+ * `SET col = col + ?` update, all in one transaction, so concurrent
+ * expenses for the same budget can't lose each other's changes. It
+ * responds with the budget's rows after the update. The ledger is
+ * rebuilt from scratch by Django's reconcile_shared_budget_balances command.
+ */
+function buildBalanceRouter() {
+    const model = db.SharedBudgetBalance;
+    const router = buildCrudRouter(model, { readOnly: true });
+
+    router.post('/adjust', async (req, res) => {
+        const { shared_budget_id: sharedBudgetId, adjustments = [] } = req.body;
+        if (!sharedBudgetId || !Array.isArray(adjustments)) {
+            return res.status(400).json({ error: 'shared_budget_id and an adjustments list are required' });
+        }
+        try {
+            await db.sequelize.transaction(async (transaction) => {
+                for (const adjustment of adjustments) {
+                    const by = {};
+                    for (const column of COLUMNS) {
+                        if (adjustment[column] && Number(adjustment[column]) !== 0) by[column] = adjustment[column];
+                    }
+                    if (!Object.keys(by).length) continue;
+
+                    const [row] = await model.findOrCreate({
+                        where: { shared_budget_id: sharedBudgetId, user_id: adjustment.user_id },
+                        transaction,
+                    });
+                    await row.increment(by, { transaction });
+                }
+            });
+            const rows = await model.findAll({ where: { shared_budget_id: sharedBudgetId } });
+            res.json(rows);
+        } catch (err) {
+            res.status(400).json({ error: err.message });
+        }
+    });
+
+    return router;
+}
+
+module.exports = buildBalanceRouter;
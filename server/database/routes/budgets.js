@@ -0,0 +1,59 @@
+const buildCrudRouter = require('./crud');
+const db = require('../models');
+
+/**
+ * Router for budgets: the generic CRUD routes plus
+ *
+ *   POST /rollover   { rollovers: [{ id, period_end, successor }] }
+ *
+ * which retires expired budgets and creates their next periods in one
+ * transaction (see djangoapp/services/budgets_service.reset_expired_budgets).
+ * A budget is only retired if it is still active and still ends on the
+ * given period_end; otherwise someone else already rolled it over, and
+ * its successor is skipped too. That makes retrying -- or two workers
+ * racing on the same budgets -- harmless. `successor` is the row to
+ * create, or null for budgets that don't recur.
+ *
+ * Responds with { deactivated: [ids], created: [rows] }.
+ */
+function buildBudgetRouter() {
+    const model = db.Budget;
+    const router = buildCrudRouter(model);
+
+    router.post('/rollover', async (req, res) => {
+        const { rollovers } = req.body;
+        if (!Array.isArray(rollovers)) {
+            return res.status(400).json({ error: 'rollovers must be a list' });
+        }
+        try {
+            const result = await db.sequelize.transaction(async (transaction) => {
+                const rows = await model.findAll({
+                    where: { id: rollovers.map((r) => r.id), is_active: true },
+                    lock: transaction.LOCK.UPDATE,
+                    transaction,
+                });
+                const current = new Map(rows.map((row) => [row.id, row]));
+                const won = rollovers.filter((r) => {
+                    const row = current.get(Number(r.id));
+                    return row && String(row.period_end) === String(r.period_end);
+                });
+                if (!won.length) return { deactivated: [], created: [] };
+
+                const ids = won.map((r) => r.id);
+                await model.update({ is_active: false }, { where: { id: ids }, transaction });
+                const created = await model.bulkCreate(
+                    won.filter((r) => r.successor).map((r) => r.successor),
+                    { validate: true, transaction },
+                );
+                return { deactivated: ids, created };
+            });
+            res.json(result);
+        } catch (err) {
+            res.status(400).json({ error: err.message });
+        }
+    });
+
+    return router;
+}
+
+module.exports = buildBudgetRouter;
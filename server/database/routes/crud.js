@@ -1,14 +1,156 @@
 const express = require('express');
+const { Op, fn, col } = require('sequelize');
+
+const escapeLike = (value) => String(value).replace(/[\\%_]/g, (c) => `\\${c}`);
+
+// Django-style lookup suffixes accepted in list query params, e.g.
+// ?date__gte=2025-01-01 or ?id__in=1,2,3. These are what the Django
+// gateway (djangoapp/restapi.py) sends, so keep the two in sync.
+const LOOKUPS = {
+    gte: (value) => ({ [Op.gte]: value }),
+    lte: (value) => ({ [Op.lte]: value }),
+    gt: (value) => ({ [Op.gt]: value }),
+    lt: (value) => ({ [Op.lt]: value }),
+    ne: (value) => ({ [Op.ne]: value }),
+    in: (value) => ({ [Op.in]: String(value).split(',').filter((v) => v !== '') }),
+    // MySQL's default collation makes LIKE case-insensitive.
+    iexact: (value) => ({ [Op.like]: escapeLike(value) }),
+    icontains: (value) => ({ [Op.like]: `%${escapeLike(value)}%` }),
+    isnull: (value) => (value === 'true' || value === 'True' ? { [Op.is]: null } : { [Op.not]: null }),
+    // A NULL bound means "open-ended", e.g. ?end_date__gte_or_null= for
+    // subscriptions that haven't ended -- plain gte would drop those.
+    gte_or_null: (value) => ({ [Op.or]: { [Op.gte]: value, [Op.is]: null } }),
+};
+
+// Buckets for GET /buckets: MySQL DATE_FORMAT patterns that map a date to
+// the first day of its day/month/year, so each bucket key is a plain
+// YYYY-MM-DD string.
+const BUCKETS = {
+    day: '%Y-%m-%d',
+    month: '%Y-%m-01',
+    year: '%Y-01-01',
+};
+
+// Aggregates for GET /aggregate, e.g. ?sum=amount or ?max=date,due_date.
+// Result keys follow Django's naming: "<column>__<aggregate>".
+const AGGREGATES = {
+    sum: 'SUM',
+    min: 'MIN',
+    max: 'MAX',
+};
+
+const splitColumns = (value) => (value ? String(value).split(',').filter((c) => c !== '') : []);
+
+// Upper bound on ?limit for the list route, whatever the caller asks for.
+const MAX_PAGE_SIZE = 500;
+
+/**
+ * ?order=-date,-id -> [['date', 'DESC'], ['id', 'ASC']] ('-' means
+ * descending). Throws on columns the model doesn't have.
+ */
+function parseOrder(model, value) {
+    return splitColumns(value).map((term) => {
+        const desc = term.startsWith('-');
+        const column = desc ? term.slice(1) : term;
+        if (!model.rawAttributes[column]) {
+            throw new Error(`Unknown column "${column}" on ${model.name}`);
+        }
+        return [column, desc ? 'DESC' : 'ASC'];
+    });
+}
+
+/**
+ * Keyset condition for ?after=<v1>,<v2>,...: rows that sort strictly
+ * after the row with those values under `order`. For -date,-id that is
+ *   date <= v1 AND (date < v1 OR (date = v1 AND id < v2))
+ * The leading bound on its own lets the database range-scan an index on
+ * the first column instead of evaluating the OR for every row.
+ */
+function keysetWhere(order, after) {
+    const values = String(after).split(',');
+    if (values.length !== order.length) {
+        throw new Error('after needs one value per order column');
+    }
+    const past = (direction) => (direction === 'DESC' ? Op.lt : Op.gt);
+    const branches = order.map(([column, direction], i) => {
+        const branch = {};
+        order.slice(0, i).forEach(([earlier], j) => { branch[earlier] = values[j]; });
+        branch[column] = { [past(direction)]: values[i] };
+        return branch;
+    });
+    const [[first, direction]] = order;
+    return {
+        [Op.and]: [
+            { [first]: { [direction === 'DESC' ? Op.lte : Op.gte]: values[0] } },
+            { [Op.or]: branches },
+        ],
+    };
+}
+
+/**
+ * Sequelize find options for the list route's ?order, ?limit and ?after
+ * params. Throws on invalid values.
+ */
+function buildPage(model, where, { order, limit, after }) {
+    const options = { where };
+    if (order !== undefined) {
+        options.order = parseOrder(model, order);
+    }
+    if (after !== undefined) {
+        if (!options.order || !options.order.length) {
+            throw new Error('after requires order');
+        }
+        options.where = { [Op.and]: [where, keysetWhere(options.order, after)] };
+    }
+    if (limit !== undefined) {
+        const size = Number.parseInt(limit, 10);
+        if (!(size > 0)) {
+            throw new Error('limit must be a positive integer');
+        }
+        options.limit = Math.min(size, MAX_PAGE_SIZE);
+    }
+    return options;
+}
+
+/**
+ * Translate query params into a Sequelize where clause. Plain keys are
+ * exact matches; "<column>__<lookup>" keys use the LOOKUPS table above.
+ * Several lookups on the same column are combined with AND.
+ */
+function buildWhere(query) {
+    const where = {};
+    for (const [key, value] of Object.entries(query)) {
+        const [column, lookup] = key.split('__');
+        if (!lookup) {
+            where[column] = value;
+            continue;
+        }
+        const build = LOOKUPS[lookup];
+        if (!build) {
+            throw new Error(`Unsupported lookup "${lookup}" on ${column}`);
+        }
+        const condition = build(value);
+        where[column] = (where[column] && typeof where[column] === 'object')
+            ? Object.assign(where[column], condition)
+            : condition;
+    }
+    return where;
+}
 
 /**
  * Build a generic CRUD router for a Sequelize model.
  *
  *   GET    /            list (optionally filtered by any column via query params,
- *                        e.g. ?user_id=3)
+ *                        e.g. ?user_id=3 or ?id__in=1,2,3 -- see LOOKUPS;
+ *                        ?order=-date,-id&limit=50&after=2025-01-31,812
+ *                        pages through it by keyset -- see buildPage)
  *   GET    /:id         retrieve one
  *   POST   /            create
+ *   POST   /bulk        create many rows at once (body: an array of rows)
  *   PATCH  /:id         partial update
  *   DELETE /:id         delete
+ *   GET    /aggregate   sum/min/max/count, optionally per group_by column(s)
+ *   GET    /buckets     per-day/month/year totals (only with the `buckets` option)
  *
  * This is a data-access layer only. It intentionally does NOT reimplement
  * the business logic that lives in djangoapp/services/* (budget spend
@@ -16,14 +158,90 @@ const express = require('express');
  * auto-accept, etc.). Callers (Django) are responsible for that logic and
  * for authorization -- this API trusts whatever calls it with a valid
  * internal API key.
+ *
+ * Pass { readOnly: true } to mount only the two GET routes.
+ *
+ * Pass { buckets: { date: 'date', sum: 'amount' } } to mount GET /buckets,
+ * which sums `sum` per ?bucket=day|month|year of `date` and returns
+ * [{ bucket: 'YYYY-MM-DD', total, count }] in date order. The other
+ * query params filter rows exactly like the list route.
  */
-function buildCrudRouter(model, { include } = {}) {
+function buildCrudRouter(model, { include, readOnly = false, buckets } = {}) {
     const router = express.Router();
 
+    // ?sum=amount&count=1&group_by=category&user_id=3 ->
+    //   [{ category: 'Food', amount__sum: '12.50', count: 2 }, ...]
+    // Without group_by the response is a single row. Every other query
+    // param filters rows exactly like the list route.
+    router.get('/aggregate', async (req, res) => {
+        const { group_by: groupBy, count, sum, min, max, ...filters } = req.query;
+        const groupColumns = splitColumns(groupBy);
+        const attributes = [...groupColumns];
+        const columns = [...groupColumns];
+        for (const [name, sqlFn] of Object.entries(AGGREGATES)) {
+            for (const column of splitColumns(req.query[name])) {
+                attributes.push([fn(sqlFn, col(column)), `${column}__${name}`]);
+                columns.push(column);
+            }
+        }
+        if (count) attributes.push([fn('COUNT', col(model.primaryKeyAttribute)), 'count']);
+
+        const unknown = columns.filter((column) => !model.rawAttributes[column]);
+        if (unknown.length) {
+            return res.status(400).json({ error: `Unknown column(s) on ${model.name}: ${unknown.join(', ')}` });
+        }
+        if (attributes.length === groupColumns.length) {
+            return res.status(400).json({ error: 'Nothing to aggregate: pass sum, min, max or count' });
+        }
+
+        try {
+            const rows = await model.findAll({
+                where: buildWhere(filters),
+                attributes,
+                group: groupColumns.length ? groupColumns : undefined,
+                raw: true,
+            });
+            res.json(groupColumns.length ? rows : rows[0]);
+        } catch (err) {
+            res.status(500).json({ error: err.message });
+        }
+    });
+
+    // Must be registered before /:id, which would otherwise match it.
+    if (buckets) {
+        router.get('/buckets', async (req, res) => {
+            const { bucket = 'day', ...filters } = req.query;
+            const format = BUCKETS[bucket];
+            if (!format) return res.status(400).json({ error: `Unsupported bucket "${bucket}"` });
+            try {
+                const rows = await model.findAll({
+                    where: buildWhere(filters),
+                    attributes: [
+                        [fn('DATE_FORMAT', col(buckets.date), format), 'bucket'],
+                        [fn('SUM', col(buckets.sum)), 'total'],
+                        [fn('COUNT', col('id')), 'count'],
+                    ],
+                    group: ['bucket'],
+                    order: [[col('bucket'), 'ASC']],
+                    raw: true,
+                });
+                res.json(rows);
+            } catch (err) {
+                res.status(500).json({ error: err.message });
+            }
+        });
+    }
+
     router.get('/', async (req, res) => {
+        const { order, limit, after, ...filters } = req.query;
+        let options;
         try {
-            const where = { ...req.query };
-            const rows = await model.findAll({ where, include });
+            options = buildPage(model, buildWhere(filters), { order, limit, after });
+        } catch (err) {
+            return res.status(400).json({ error: err.message });
+        }
+        try {
+            const rows = await model.findAll({ ...options, include });
             res.json(rows);
         } catch (err) {
             res.status(500).json({ error: err.message });
@@ -40,6 +258,8 @@ function buildCrudRouter(model, { include } = {}) {
         }
     });
 
+    if (readOnly) return router;
+
     router.post('/', async (req, res) => {
         try {
             const row = await model.create(req.body);
@@ -49,6 +269,23 @@ function buildCrudRouter(model, { include } = {}) {
         }
     });
 
+    // One INSERT for many rows, e.g. every split of a new expense. The
+    // rows go in inside a transaction, so either all of them are created
+    // or none are.
+    router.post('/bulk', async (req, res) => {
+        if (!Array.isArray(req.body)) {
+            return res.status(400).json({ error: 'Expected an array of rows' });
+        }
+        try {
+            const rows = await model.sequelize.transaction((transaction) => (
+                model.bulkCreate(req.body, { validate: true, transaction })
+            ));
+            res.status(201).json(rows);
+        } catch (err) {
+            res.status(400).json({ error: err.message });
+        }
+    });
+
     router.patch('/:id', async (req, res) => {
         try {
             const row = await model.findByPk(req.params.id);
@@ -64,6 +301,7 @@ function buildCrudRouter(model, { include } = {}) {
         try {
             const deleted = await model.destroy({ where: { id: req.params.id } });
             if (!deleted) return res.status(404).json({ error: `${model.name} not found` });
+            res.json({ message: `${model.name} deleted` });
         } catch (err) {
             res.status(500).json({ error: err.message });
         }
@@ -72,4 +310,5 @@ function buildCrudRouter(model, { include } = {}) {
     return router;
 }
 
-module.exports = buildCrudRouter;
\ No newline at end of file
+module.exports = buildCrudRouter;
+module.exports.buildWhere = buildWhere;
\ No newline at end of file
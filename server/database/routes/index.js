@@ -1,11 +1,18 @@
 const express = require('express');
 const buildCrudRouter = require('./crud');
+const buildBalanceRouter = require('./balances');
+const buildBudgetRouter = require('./budgets');
 const db = require('../models');
 
 const router = express.Router();
 
-router.use('/transactions', buildCrudRouter(db.Transaction));
-router.use('/budgets', buildCrudRouter(db.Budget));
+// Django owns auth_user, so users are lookup-only here. The User model
+// deliberately exposes no password/permission columns.
+router.use('/users', buildCrudRouter(db.User, { readOnly: true }));
+router.use('/transactions', buildCrudRouter(db.Transaction, {
+    buckets: { date: 'date', sum: 'amount' },
+}));
+router.use('/budgets', buildBudgetRouter());
 router.use('/subscriptions', buildCrudRouter(db.Subscription, {
     include: [{ model: db.SubscriptionPayment, as: 'payments' }],
 }));
@@ -21,6 +28,7 @@ router.use('/shared-expenses', buildCrudRouter(db.SharedExpense, {
 }));
 router.use('/expense-splits', buildCrudRouter(db.ExpenseSplit));
 router.use('/settlements', buildCrudRouter(db.Settlement));
+router.use('/shared-budget-balances', buildBalanceRouter());
 router.use('/shared-budget-notifications', buildCrudRouter(db.SharedBudgetNotification));
 router.use('/friendships', buildCrudRouter(db.Friendship));
 router.use('/friendship-notifications', buildCrudRouter(db.FriendshipNotification));
@@ -12,6 +12,7 @@ from .models.models import (
     SharedExpense,
     ExpenseSplit,
     Settlement,
+    SharedBudgetBalance,
     SharedBudgetNotification,
 )
 from .models.friendship import Friendship, FriendshipNotification
@@ -104,6 +105,12 @@ class SettlementAdmin(admin.ModelAdmin):
     search_fields = ('shared_budget__name', 'payer__username', 'receiver__username')
 
 
+@admin.register(SharedBudgetBalance)
+class SharedBudgetBalanceAdmin(admin.ModelAdmin):
+    list_display = ('id', 'shared_budget', 'user', 'total_paid', 'total_owed', 'settlements_in', 'settlements_out')
+    search_fields = ('shared_budget__name', 'user__username')
+
+
 @admin.register(SharedBudgetNotification)
 class SharedBudgetNotification(admin.ModelAdmin):
     list_display = ('id', 'user', 'from_user', 'notification_type', 'shared_budget', 'is_read', 'created_at')
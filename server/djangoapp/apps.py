@@ -1,4 +1,28 @@
+import sys
+
 from django.apps import AppConfig
 
+# WSGI servers the site is run under (matched against argv[0], which is
+# the script or the `python -m` module path)
+WEB_SERVERS = ('gunicorn', 'uwsgi')
+
+
+def is_web_process(argv=None):
+    """Whether this process serves the site, rather than being migrate, shell, tests etc."""
+    argv = sys.argv if argv is None else argv
+    if not argv:
+        return False
+    if argv[0].endswith('manage.py'):
+        return argv[1:2] == ['runserver']
+    return any(server in argv[0] for server in WEB_SERVERS)
+
+
 class MoneyManagerAppConfig(AppConfig):
     name = 'djangoapp'
+
+    def ready(self):
+        from . import scheduler, signals  # noqa: F401 (connects the receivers)
+
+        # Only web processes poll; migrate, shell, tests etc. shouldn't start jobs
+        if scheduler.SCHEDULER_ENABLED and is_web_process():
+            scheduler.start_scheduler()
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from djangoapp.models.models import SharedBudget, SharedBudgetBalance
+
+class Command(BaseCommand):
+    help = 'Rebuild the shared budget balance ledger from expenses, splits and settlements'
+
+    def add_arguments(self, parser):
+        # Optional: specify a single budget
+        parser.add_argument(
+            '--budget',
+            type=int,
+            help='ID of the shared budget to rebuild (default: all budgets)',
+        )
+
+    def handle(self, *args, **options):
+        budget_id = options.get('budget')
+
+        budgets = SharedBudget.objects.all()
+        if budget_id:
+            budgets = budgets.filter(id=budget_id)
+            if not budgets.exists():
+                self.stdout.write(self.style.ERROR(f"Shared budget {budget_id} not found"))
+                return
+        self.stdout.write(f"Rebuilding balances for {budgets.count()} shared budgets")
+
+        total_rows = 0
+        for budget in budgets:
+            try:
+                rows = SharedBudgetBalance.rebuild(budget)
+                total_rows += len(rows)
+            except Exception as e:
+                self.stdout.write(
+                    self.style.ERROR(f"   Error for {budget.name}: {e}")
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"\nTotal balance rows written: {total_rows}")
+        )
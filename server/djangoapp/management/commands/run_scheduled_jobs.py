@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from djangoapp import scheduler
+
+class Command(BaseCommand):
+    help = 'Run the periodic background jobs (subscription payments, budget rollover) that are due'
+
+    def add_arguments(self, parser):
+        # Optional: run one job right away
+        parser.add_argument(
+            '--job',
+            choices=list(scheduler.JOBS),
+            help='Run only this job, even if it is not due yet (default: every due job)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=scheduler.BATCH_SIZE,
+            help=f'Users per batch (default: {scheduler.BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, checking for due jobs every SCHEDULER_POLL_SECONDS',
+        )
+
+    def handle(self, *args, **options):
+        job_name = options.get('job')
+        batch_size = options['batch_size']
+
+        while True:
+            names = [job_name] if job_name else list(scheduler.JOBS)
+            for name in names:
+                result = scheduler.run_job(name, force=bool(job_name), batch_size=batch_size)
+                if result is None:
+                    self.stdout.write(f"    {name}: not due or already running elsewhere")
+                    continue
+
+                changed, failed = result
+                self.stdout.write(self.style.SUCCESS(f"    {name}: {changed} changed"))
+                if failed:
+                    self.stdout.write(self.style.ERROR(f"    {name}: failed for {failed} users"))
+
+            if not options['loop']:
+                break
+            time.sleep(scheduler.POLL_SECONDS)
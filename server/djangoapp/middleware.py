@@ -0,0 +1,38 @@
+import logging
+
+from django.conf import settings
+
+from . import request_cache
+
+logger = logging.getLogger(__name__)
+
+
+class GatewayCacheMiddleware:
+    """
+    Give every request its own gateway read cache (see request_cache.py).
+
+    The cache is exposed as `request.gateway_cache`; its hit/miss counters
+    are logged at DEBUG level and, when settings.DEBUG is on, returned in
+    X-Gateway-Cache-Hits / X-Gateway-Cache-Misses response headers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        cache, token = request_cache.activate()
+        request.gateway_cache = cache
+        try:
+            response = self.get_response(request)
+        finally:
+            request_cache.deactivate(token)
+
+        stats = cache.stats()
+        logger.debug(
+            "Gateway cache for %s %s: %d hits, %d misses",
+            request.method, request.path, stats["hits"], stats["misses"],
+        )
+        if settings.DEBUG:
+            response["X-Gateway-Cache-Hits"] = str(stats["hits"])
+            response["X-Gateway-Cache-Misses"] = str(stats["misses"])
+        return response
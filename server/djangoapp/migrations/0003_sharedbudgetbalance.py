@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:14
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_balances(apps, schema_editor):
+    """Fill the new ledger from existing expenses, splits and settlements."""
+    SharedBudgetMember = apps.get_model('djangoapp', 'SharedBudgetMember')
+    SharedExpense = apps.get_model('djangoapp', 'SharedExpense')
+    ExpenseSplit = apps.get_model('djangoapp', 'ExpenseSplit')
+    Settlement = apps.get_model('djangoapp', 'Settlement')
+    SharedBudgetBalance = apps.get_model('djangoapp', 'SharedBudgetBalance')
+
+    totals = defaultdict(lambda: dict.fromkeys(
+        ('total_paid', 'total_owed', 'settlements_in', 'settlements_out'), 0
+    ))
+    for member in SharedBudgetMember.objects.values('shared_budget_id', 'user_id'):
+        totals[(member['shared_budget_id'], member['user_id'])]
+
+    sources = [
+        ('total_paid', 'shared_budget_id', 'paid_by_id', SharedExpense.objects.all(), 'amount'),
+        ('total_owed', 'shared_expense__shared_budget_id', 'user_id',
+         ExpenseSplit.objects.filter(is_settled=False), 'amount_owed'),
+        ('settlements_in', 'shared_budget_id', 'receiver_id', Settlement.objects.all(), 'amount'),
+        ('settlements_out', 'shared_budget_id', 'payer_id', Settlement.objects.all(), 'amount'),
+    ]
+    for column, budget_field, user_field, queryset, amount_field in sources:
+        for row in queryset.values(budget_field, user_field).annotate(total=Sum(amount_field)):
+            totals[(row[budget_field], row[user_field])][column] = row['total'] or 0
+
+    SharedBudgetBalance.objects.bulk_create(
+        SharedBudgetBalance(shared_budget_id=budget_id, user_id=user_id, **values)
+        for (budget_id, user_id), values in totals.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0002_alter_subscriptionpayment_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SharedBudgetBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_owed', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('settlements_in', models.DecimalField(decimal_places=2, default=0, help_text='Settlements this member has received.', max_digits=12)),
+                ('settlements_out', models.DecimalField(decimal_places=2, default=0, help_text='Settlements this member has paid.', max_digits=12)),
+                ('shared_budget', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balances', to='djangoapp.sharedbudget')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shared_budget_balances', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('shared_budget', 'user')},
+            },
+        ),
+        migrations.RunPython(backfill_balances, migrations.RunPython.noop),
+    ]
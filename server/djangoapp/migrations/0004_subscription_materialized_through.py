@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0003_sharedbudgetbalance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscription',
+            name='materialized_through',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
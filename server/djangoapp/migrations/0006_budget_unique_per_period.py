@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:24
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0005_scheduledjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='budget',
+            unique_together={('user', 'category', 'period_start')},
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0006_budget_unique_per_period'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='friendshipnotification',
+            index=models.Index(fields=['user', 'is_read', 'created_at'], name='friend_notification_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['user', 'period_start', 'period_end'], name='income_user_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sharedbudgetnotification',
+            index=models.Index(fields=['user', 'is_read', 'created_at'], name='sb_notification_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'date'], name='transaction_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'category', 'date'], name='transaction_user_cat_date_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:31
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+
+def backfill_category_keys(apps, schema_editor):
+    """category_key = the category trimmed and lowercased, one UPDATE per table."""
+    for model_name in ('Transaction', 'Budget', 'Subscription', 'SharedExpense'):
+        model = apps.get_model('djangoapp', model_name)
+        model.objects.update(category_key=Lower(Trim('category')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangoapp', '0007_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_user_cat_date_idx',
+        ),
+        migrations.AddField(
+            model_name='budget',
+            name='category_key',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='sharedexpense',
+            name='category_key',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='subscription',
+            name='category_key',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='category_key',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.RunPython(backfill_category_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='budget',
+            index=models.Index(fields=['user', 'category_key'], name='budget_user_catkey_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sharedexpense',
+            index=models.Index(fields=['shared_budget', 'category_key'], name='sharedexpense_catkey_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['user', 'category_key'], name='subscription_user_catkey_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'category_key', 'date'], name='transaction_user_catkey_idx'),
+        ),
+    ]
@@ -134,6 +134,10 @@ class FriendshipNotification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        # The notification list: a user's (unread) notifications, newest first
+        indexes = [
+            models.Index(fields=['user', 'is_read', 'created_at'], name='friend_notification_inbox_idx'),
+        ]
 
     def __str__(self):
         return f"{self.notification_type} for {self.user.username}"
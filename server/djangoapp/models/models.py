@@ -1,10 +1,37 @@
-from django.db import models
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.db.models import Sum, Q
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
-class Transaction(models.Model):
+from ..services.category_keys import category_key
+from ..services.splits import CENT, allocate, split_evenly
+
+
+class CategoryKeyModel(models.Model):
+    """
+    Base for models with a free-text `category`: adds category_key, the
+    category trimmed and lowercased (services/category_keys.py), which is
+    refreshed on every save() so case-insensitive category filters can
+    use an index. Writes that skip save() -- queryset.update(),
+    bulk_create() -- have to set it themselves.
+    """
+    category_key = models.CharField(max_length=100, null=True, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.category_key = category_key(self.category)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'category' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'category_key'}
+        super().save(*args, **kwargs)
+
+class Transaction(CategoryKeyModel):
     id = models.AutoField(primary_key=True)
     user = models.ForeignKey('auth.User', on_delete=models.CASCADE)
     amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
@@ -12,12 +39,19 @@ class Transaction(models.Model):
     category = models.CharField(max_length=100, null=True, blank=True)
     date = models.DateField()
 
-    
+    class Meta:
+        # Spending reads are always one user's rows over a date range,
+        # optionally for one category.
+        indexes = [
+            models.Index(fields=['user', 'date'], name='transaction_user_date_idx'),
+            models.Index(fields=['user', 'category_key', 'date'], name='transaction_user_catkey_idx'),
+        ]
+
     def __str__(self):
         return f"Transaction {self.id}: {self.amount} on {self.date} by {self.user.username}"
 
 
-class Budget(models.Model):
+class Budget(CategoryKeyModel):
     RECURRENCE_CHOICES = [
         ('daily', 'Daily'),
         ('weekly', 'Weekly'),
@@ -47,14 +81,19 @@ class Budget(models.Model):
     created_at = models.DateField(auto_now_add=True)
    
     class Meta:
-        unique_together = ('category', 'user')
+        # One row per period: an expired recurring budget stays as history
+        # (is_active=False) next to the row for its current period.
+        unique_together = ('user', 'category', 'period_start')
+        indexes = [
+            models.Index(fields=['user', 'category_key'], name='budget_user_catkey_idx'),
+        ]
     
     def __str__(self):
         return f"Category: {self.category} by {self.user.username}"
 
 
 
-class Subscription(models.Model):
+class Subscription(CategoryKeyModel):
     BILLING_CYCLE_CHOICES = [
         ('daily', 'Daily'),
         ('weekly', 'Weekly'),
@@ -85,8 +124,16 @@ class Subscription(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # High-water mark for payment generation: every payment due on or
+    # before this date already exists. Cleared whenever the schedule
+    # changes so the next run regenerates from start_date.
+    materialized_through = models.DateField(null=True, blank=True)
+
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['user', 'category_key'], name='subscription_user_catkey_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - ${self.amount}/{self.billing_cycle}"
@@ -126,6 +173,11 @@ class Income(models.Model):
     period_start = models.DateField()
     period_end = models.DateField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'period_start', 'period_end'], name='income_user_period_idx'),
+        ]
+
     def clean(self):
         if self.period_end < self.period_start:
             raise ValueError("End date must be after start date")
@@ -250,8 +302,17 @@ class SharedBudgetMember(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.shared_budget.name} ({self.role})"
     
+    def _balance_row(self):
+        """This member's SharedBudgetBalance row, if the ledger has one."""
+        return SharedBudgetBalance.objects.filter(
+            shared_budget_id=self.shared_budget_id, user_id=self.user_id
+        ).first()
+
     def get_total_paid(self):
         """Get total amount this member has paid."""
+        row = self._balance_row()
+        if row is not None:
+            return row.total_paid
         result = SharedExpense.objects.filter(
             shared_budget=self.shared_budget,
             paid_by=self.user
@@ -260,6 +321,9 @@ class SharedBudgetMember(models.Model):
     
     def get_total_owed(self):
         """Get total amount this member owes (from splits)."""
+        row = self._balance_row()
+        if row is not None:
+            return row.total_owed
         result = ExpenseSplit.objects.filter(
             shared_expense__shared_budget=self.shared_budget,
             user=self.user,
@@ -272,7 +336,13 @@ class SharedBudgetMember(models.Model):
         Get member's balance.
         Positive = others owe them, Negative = they owe others.
         """
-        return self.get_total_paid() - self.get_total_owed()
+        row = self._balance_row()
+        if row is not None:
+            return row.balance
+        settlements = Settlement.objects.filter(shared_budget=self.shared_budget)
+        settlements_in = settlements.filter(receiver=self.user).aggregate(total=Sum('amount'))['total'] or 0
+        settlements_out = settlements.filter(payer=self.user).aggregate(total=Sum('amount'))['total'] or 0
+        return self.get_total_paid() - self.get_total_owed() - settlements_in + settlements_out
     
 
 class SharedBudgetInvite(models.Model):
@@ -337,7 +407,7 @@ class SharedBudgetInvite(models.Model):
         self.save()
 
 
-class SharedExpense(models.Model):
+class SharedExpense(CategoryKeyModel):
     """An expense within a shared budget."""
 
     shared_budget = models.ForeignKey(
@@ -365,54 +435,60 @@ class SharedExpense(models.Model):
 
     class Meta:
         ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['shared_budget', 'category_key'], name='sharedexpense_catkey_idx'),
+        ]
 
     def __str__(self):
         return f"{self.description} - ${self.amount} by {self.paid_by.username}"
     
     def create_equal_splits(self):
-        """Create equal splits for all budget members."""
-        members = self.shared_budget.members.all()
-        member_count = members.count()
-
-        if member_count == 0:
-            return
-        
-        split_amount = self.amount / member_count
-
-        for member in members:
-            ExpenseSplit.objects.create(
-                shared_expense=self,
-                user=member.user,
-                amount_owed=split_amount
-            )
+        """Create equal splits for all budget members, in one insert."""
+        members = list(self.shared_budget.members.all())
+        if not members:
+            return []
+
+        amounts = split_evenly(self.amount, len(members))
+        splits = ExpenseSplit.objects.bulk_create(
+            ExpenseSplit(shared_expense=self, user_id=member.user_id, amount_owed=amount)
+            for member, amount in zip(members, amounts)
+        )
+        SharedBudgetBalance.rebuild_on_commit(self.shared_budget_id)
+        return splits
 
     def create_percentage_splits(self):
-        """Create splits based on member contribution percentages."""
-        members = self.shared_budget.members.all()
-
-        for member in members:
-            split_amount = (self.amount * member.contribution_percentage) / 100
-            ExpenseSplit.objects.create(
-                shared_expense=self,
-                user=member.user,
-                amount_owed=split_amount
-            )
+        """Create splits based on member contribution percentages, in one insert."""
+        members = list(self.shared_budget.members.all())
+        if not members:
+            return []
+
+        amounts = allocate(self.amount, [member.contribution_percentage for member in members])
+        splits = ExpenseSplit.objects.bulk_create(
+            ExpenseSplit(shared_expense=self, user_id=member.user_id, amount_owed=amount)
+            for member, amount in zip(members, amounts)
+        )
+        SharedBudgetBalance.rebuild_on_commit(self.shared_budget_id)
+        return splits
 
     def create_custom_splits(self, splits_data):
         """
-        Create custom splits from provided data.
+        Create custom splits from provided data, in one insert.
         splits_data = [{'user_id': 1, 'amount': 50.00}, ...]
         """
-        created_splits = []
-        for split in splits_data:
-            user = User.objects.get(id=split['user_id'])
-            expense_split = ExpenseSplit.objects.create(
+        user_ids = {split['user_id'] for split in splits_data}
+        if User.objects.filter(id__in=user_ids).count() != len(user_ids):
+            raise User.DoesNotExist("Split for a user that does not exist")
+
+        splits = ExpenseSplit.objects.bulk_create(
+            ExpenseSplit(
                 shared_expense=self,
-                user=user,
-                amount_owed=float(str(split['amount']))
+                user_id=split['user_id'],
+                amount_owed=Decimal(str(split['amount'])).quantize(CENT)
             )
-            created_splits.append(expense_split)
-        return created_splits
+            for split in splits_data
+        )
+        SharedBudgetBalance.rebuild_on_commit(self.shared_budget_id)
+        return splits
 
 
 class ExpenseSplit(models.Model):
@@ -474,6 +550,96 @@ class Settlement(models.Model):
 
     def __str__(self):
         return f"{self.payer.username} paid ${self.amount} to {self.receiver.username}"
+
+
+class SharedBudgetBalance(models.Model):
+    """
+    Running totals for one member of a shared budget.
+
+    Kept up to date incrementally whenever expenses or settlements are
+    written through the API (see services/balance_ledger.py), so reading
+    a balance is a single row lookup however many expenses the budget
+    has. rebuild() recomputes the rows from the underlying tables; ORM
+    writes (admin, populate.py, the create_*_splits helpers) go through
+    rebuild_on_commit() instead, see djangoapp/signals.py.
+    """
+
+    shared_budget = models.ForeignKey(
+        SharedBudget,
+        on_delete=models.CASCADE,
+        related_name='balances'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shared_budget_balances'
+    )
+    total_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_owed = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    settlements_in = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0,
+        help_text="Settlements this member has received."
+    )
+    settlements_out = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0,
+        help_text="Settlements this member has paid."
+    )
+
+    class Meta:
+        unique_together = ['shared_budget', 'user']
+
+    def __str__(self):
+        return f"{self.user.username} in {self.shared_budget.name}: {self.balance}"
+
+    @property
+    def balance(self):
+        """Positive = others owe them, Negative = they owe others."""
+        return self.total_paid - self.total_owed - self.settlements_in + self.settlements_out
+
+    @classmethod
+    def rebuild(cls, shared_budget):
+        """Recompute every member's totals for `shared_budget` from scratch."""
+        totals = defaultdict(lambda: dict.fromkeys(
+            ('total_paid', 'total_owed', 'settlements_in', 'settlements_out'), 0
+        ))
+        # Every member gets a row, even before they have any activity
+        for member in shared_budget.members.all():
+            totals[member.user_id]
+
+        sources = [
+            ('total_paid', 'paid_by',
+             SharedExpense.objects.filter(shared_budget=shared_budget), 'amount'),
+            ('total_owed', 'user',
+             ExpenseSplit.objects.filter(shared_expense__shared_budget=shared_budget, is_settled=False), 'amount_owed'),
+            ('settlements_in', 'receiver',
+             Settlement.objects.filter(shared_budget=shared_budget), 'amount'),
+            ('settlements_out', 'payer',
+             Settlement.objects.filter(shared_budget=shared_budget), 'amount'),
+        ]
+        for column, user_field, queryset, amount_field in sources:
+            for row in queryset.values(user_field).annotate(total=Sum(amount_field)):
+                totals[row[user_field]][column] = row['total'] or 0
+
+        with transaction.atomic():
+            cls.objects.filter(shared_budget=shared_budget).delete()
+            return cls.objects.bulk_create(
+                cls(shared_budget=shared_budget, user_id=user_id, **values)
+                for user_id, values in totals.items()
+            )
+
+    @classmethod
+    def rebuild_on_commit(cls, shared_budget_id):
+        """
+        Rebuild a budget's rows once the current transaction commits
+        (straight away outside one). Does nothing if the budget is gone
+        by then, e.g. deleted along with its expenses.
+        """
+        def rebuild():
+            shared_budget = SharedBudget.objects.filter(pk=shared_budget_id).first()
+            if shared_budget is not None:
+                cls.rebuild(shared_budget)
+
+        transaction.on_commit(rebuild)
     
 
 class SharedBudgetNotification(models.Model):
@@ -513,10 +679,36 @@ class SharedBudgetNotification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        # The notification list: a user's (unread) notifications, newest first
+        indexes = [
+            models.Index(fields=['user', 'is_read', 'created_at'], name='sb_notification_inbox_idx'),
+        ]
 
     def __str__(self):
         return f"{self.notification_type} for {self.user.username}"
     
     def mark_as_read(self):
         self.is_read=True
-        self.save()
\ No newline at end of file
+        self.save()
+
+class ScheduledJob(models.Model):
+    """
+    Bookkeeping and lock for one periodic background job (see scheduler.py).
+
+    Every web worker and cron run races for the same row; only the one
+    whose conditional UPDATE claims `locked_until` gets to run the job.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    next_run_at = models.DateTimeField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_finished_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} (next run {self.next_run_at})"
@@ -0,0 +1,104 @@
+"""
+Request-scoped identity map for gateway reads.
+
+Within one Django request the same rows tend to be fetched over and over
+(the current budget, the same users/{id}, ...). While a RequestCache is
+active, restapi.get_request() serves repeat reads from it instead of
+going back to the Node API, and every write through restapi drops the
+entries it could have made stale.
+
+The cache lives in a ContextVar, so it is only active inside a request
+handled by GatewayCacheMiddleware (see djangoapp/middleware.py). Code
+running outside a request -- management commands, shell, most unit
+tests -- always talks to the API directly.
+"""
+import copy
+import threading
+from contextvars import ContextVar
+
+_current_cache = ContextVar("gateway_request_cache", default=None)
+
+
+def normalize_endpoint(endpoint):
+    return endpoint.strip("/")
+
+
+def resource_of(endpoint):
+    """'shared-budgets/4/members' -> 'shared-budgets'"""
+    return normalize_endpoint(endpoint).split("/", 1)[0]
+
+
+def make_key(endpoint, params):
+    """Cache key: normalized endpoint + params sorted and stringified."""
+    return (
+        normalize_endpoint(endpoint),
+        tuple(sorted((key, str(value)) for key, value in params.items())),
+    )
+
+
+class RequestCache:
+    """Per-request map of GET results keyed by make_key(), with hit/miss counters."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return a copy of the cached value, or None on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                value = self._entries[key]
+            else:
+                self.misses += 1
+                return None
+        # Hand out copies so a caller sorting or annotating its rows can't
+        # change what the next caller in the same request sees.
+        return copy.deepcopy(value)
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = copy.deepcopy(value)
+
+    def invalidate(self, endpoint, cascade=False):
+        """
+        Drop everything a write to `endpoint` could have made stale.
+
+        A plain create/update on '<resource>/' or '<resource>/<id>' only
+        touches that resource. Deletes (cascade=True, since rows cascade in
+        the database) and action endpoints like
+        'shared-expenses/3/create-equal-splits' can change other tables
+        too, so they flush the whole cache.
+        """
+        parts = normalize_endpoint(endpoint).split("/")
+        with self._lock:
+            if cascade or len(parts) > 2:
+                self._entries.clear()
+                return
+            resource = parts[0]
+            for key in [k for k in self._entries if resource_of(k[0]) == resource]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+def get_current_cache():
+    """The active RequestCache, or None outside a request."""
+    return _current_cache.get()
+
+
+def activate():
+    """Install a fresh RequestCache. Returns (cache, token) for deactivate()."""
+    cache = RequestCache()
+    return cache, _current_cache.set(cache)
+
+
+def deactivate(token):
+    _current_cache.reset(token)
@@ -1,7 +1,16 @@
+import atexit
+import contextvars
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+from .request_cache import get_current_cache, make_key
+
 load_dotenv()
 
 # In docker-compose, "api" is the service name for the Node container, so
@@ -10,54 +19,271 @@ load_dotenv()
 BACKEND_URL = os.getenv('BACKEND_URL', default='http://api:3030/api/')
 INTERNAL_API_KEY = os.getenv('INTERNAL_API_KEY', default="")
 
+# Connection pool tuning. Every gateway call goes to the same host, so a
+# single pool is all we need; POOL_MAXSIZE caps how many keep-alive
+# sockets a worker holds open to the Node API at once (raise it if you
+# run gunicorn with many threads per worker).
+POOL_CONNECTIONS = int(os.getenv('BACKEND_POOL_CONNECTIONS', default='4'))
+POOL_MAXSIZE = int(os.getenv('BACKEND_POOL_MAXSIZE', default='16'))
+MAX_RETRIES = int(os.getenv('BACKEND_MAX_RETRIES', default='2'))
+RETRY_BACKOFF = float(os.getenv('BACKEND_RETRY_BACKOFF', default='0.1'))
+TIMEOUT = 5
+
+# Upper bound on how many gateway reads one request runs at the same time
+# (see run_concurrently). Keep it at or below POOL_MAXSIZE so parallel
+# calls reuse pooled sockets instead of opening throwaway ones.
+FANOUT_MAX_WORKERS = int(os.getenv('BACKEND_FANOUT_MAX_WORKERS', default='6'))
+
+# The list route never returns more rows than this, whatever ?limit says
+# (MAX_PAGE_SIZE in database/routes/crud.js).
+MAX_PAGE_SIZE = 500
+
+# Only these verbs are retried after the request reached the server.
+# Connection failures (nothing was sent yet) are retried for every verb.
+# DELETE is left out on purpose: a retried delete that already succeeded
+# comes back as a 404, which delete_request would report as a failure.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
 
 def _headers():
     return {"x-internal-api-key": INTERNAL_API_KEY}
 
 
+def _build_session():
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=IDEMPOTENT_METHODS,
+        # Hand the final response back to raise_for_status() instead of
+        # raising MaxRetryError, so callers keep the same error handling.
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(_headers())
+    return session
+
+
+def get_session():
+    """
+    Return the process-wide pooled Session used for every gateway call.
+
+    The session is created lazily and rebuilt whenever the process id
+    changes, so gunicorn workers forked from a preloaded master never
+    share keep-alive sockets with their parent.
+    """
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            # A session inherited across fork() is just dropped, not
+            # closed -- closing it here would tear down sockets that the
+            # parent process may still be using.
+            _session = _build_session()
+            _session_pid = pid
+    return _session
+
+
+def close_session():
+    """Close the pooled session (if this process owns one)."""
+    global _session, _session_pid
+
+    with _session_lock:
+        if _session is not None and _session_pid == os.getpid():
+            _session.close()
+        _session = None
+        _session_pid = None
+
+
+atexit.register(close_session)
+
+
+def _invalidate(endpoint, cascade=False):
+    """Drop request-cached reads a write to `endpoint` may have made stale."""
+    cache = get_current_cache()
+    if cache is not None:
+        cache.invalidate(endpoint, cascade=cascade)
+
+
 def get_request(endpoint, **params):
-    """GET <BACKEND_URL><endpoint>?<params>. Returns None on failuer."""
+    """
+    GET <BACKEND_URL><endpoint>?<params>. Returns None on failuer.
+
+    Inside a request, successful results are memoized per endpoint+params
+    (see request_cache.py) until a write touches the same resource.
+    """
+    cache = get_current_cache()
+    if cache is not None:
+        key = make_key(endpoint, params)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
     url = BACKEND_URL + endpoint
     try:
-        response = requests.get(url, params=params, headers=_headers(), timeout=5)
+        response = get_session().get(url, params=params, timeout=TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        data = response.json()
     except requests.RequestException as e:
         print(f"Error caliing GET {url}: {e}")
         return None
 
+    if cache is not None and data is not None:
+        cache.set(key, data)
+    return data
+
+
+class ApiReadError(Exception):
+    """A read the caller can't do without failed; see require()."""
+
+
+def require(data, endpoint):
+    """
+    `data` as returned by get_request() or aggregate_request(), or
+    ApiReadError if that read failed. For callers that would otherwise
+    pass a failed read off as an empty list or a zero total -- e.g. a
+    summary that would then be cached.
+    """
+    if data is None:
+        raise ApiReadError(f"GET {endpoint} failed")
+    return data
+
+
+def aggregate_request(endpoint, group_by=None, sum=None, min=None, max=None, count=False, **filters):
+    """
+    GET <BACKEND_URL><endpoint>aggregate -- totals computed by the Node API.
+
+    `sum`, `min`, `max` and `group_by` take a column name or a list of
+    them; `count=True` adds a row count. Results use Django's naming, e.g.
+        aggregate_request("transactions/", sum="amount", count=True, user_id=1)
+        -> {"amount__sum": "42.50", "count": 3}
+    With `group_by` a list of such rows (one per group) comes back instead.
+    Remaining kwargs filter rows just like get_request. Sums over no rows
+    are None. Returns None on failure.
+    """
+    params = dict(filters)
+    for name, columns in (("group_by", group_by), ("sum", sum), ("min", min), ("max", max)):
+        if columns:
+            params[name] = columns if isinstance(columns, str) else ",".join(columns)
+    if count:
+        params["count"] = 1
+    return get_request(endpoint.rstrip("/") + "/aggregate", **params)
+
+
+def page_request(endpoint, order, limit, after=None, **filters):
+    """
+    One page of a list endpoint, paginated by keyset rather than offset.
+
+    `order` lists the columns to sort by ("-" prefix for descending) and
+    must end in a unique one, e.g. ("-date", "-id"). `after` is the cursor
+    returned for the previous page, or None for the first. Remaining
+    kwargs filter rows just like get_request.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Returns (None, None) on failure. One extra row is requested to tell
+    whether another page follows, so `limit` is capped at one below the
+    API's MAX_PAGE_SIZE -- otherwise a full page would look like the last.
+    """
+    limit = min(limit, MAX_PAGE_SIZE - 1)
+    params = dict(filters, order=",".join(order), limit=limit + 1)
+    if after:
+        params["after"] = after
+    rows = get_request(endpoint, **params)
+    if rows is None:
+        return None, None
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, ",".join(str(last[column.lstrip("-")]) for column in order)
+
 
 def post_request(endpoint, data):
     """POST a JSON body to <BACKEND_URL><endpoint>. Returns None on failure."""
     url = BACKEND_URL + endpoint
     try:
-        response = requests.post(url, json=data, headers=_headers(), timeout=5)
+        response = get_session().post(url, json=data, timeout=TIMEOUT)
         response.raise_for_status()
         return response.json()
     except requests.RequestException as e:
         print(f"Error calling POST {url}: {e}")
         return None
+    finally:
+        _invalidate(endpoint)
 
 
 def patch_request(endpoint, data):
     """PATCH a JSON body to <BACKEND_URL><endpoint>. Return None on failure."""
     url = BACKEND_URL + endpoint
     try:
-        response = requests.patch(url, json=data, headers=_headers(), timeout=5)
+        response = get_session().patch(url, json=data, timeout=TIMEOUT)
         response.raise_for_status()
         return response.json()
     except requests.RequestException as e:
         print(f"Error calling PATCH {url}: {e}")
         return None
+    finally:
+        _invalidate(endpoint)
 
 
 def delete_request(endpoint):
     """DELETE <BACKEND_URL><endpoint>. Return None on failure."""
     url = BACKEND_URL + endpoint
     try:
-        response = requests.delete(url, headers=_headers(), timeout=5)
+        response = get_session().delete(url, timeout=TIMEOUT)
         response.raise_for_status()
         return response.json()
     except requests.RequestException as e:
         print(f"Error calling DELETE {url}: {e}")
         return None
+    finally:
+        _invalidate(endpoint, cascade=True)
+
+
+def run_concurrently(calls):
+    """
+    Run independent gateway fetches at the same time and collect the results.
+
+    `calls` maps a name to a `(func, *args)` tuple; the return value maps the
+    same names to what each func returned. The calls run on a small thread
+    pool (at most FANOUT_MAX_WORKERS threads), so the total wait is roughly
+    the slowest call instead of the sum of all of them.
+
+    Each call runs in a copy of the caller's context, so the request cache
+    installed by GatewayCacheMiddleware is shared with the worker threads.
+    If a call raises, the exception is re-raised here once every call has
+    finished.
+
+    Only use this for calls that talk to the Node API -- Django ORM queries
+    made from the worker threads would each open their own DB connection.
+    """
+    if not calls:
+        return {}
+
+    max_workers = min(len(calls), FANOUT_MAX_WORKERS)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gateway-fanout") as executor:
+        futures = {
+            name: executor.submit(contextvars.copy_context().run, func, *args)
+            for name, (func, *args) in calls.items()
+        }
+    # Leaving the with-block waits for every future, so nothing is still
+    # running in the background if one of the calls failed.
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,219 @@
+"""
+Periodic background jobs: subscription payment generation, budget
+rollover and reconciling the shared budget balance ledger.
+
+These used to run inline -- the dashboard triggered payment generation
+and get_budgets reset expired budgets before answering. They now run here
+for every active user, in batches, once a day at the start of the
+off-peak window (02:00 local time by default). A job that missed its window, e.g. because
+nothing was running, is run as soon as the scheduler next checks.
+
+Every process may run the scheduler; a ScheduledJob row per job acts as
+the lock, so each run happens exactly once however many gunicorn workers
+(or cron invocations) are racing for it.
+
+Two ways to drive it:
+  * a polling thread in each web process (gunicorn or runserver; see
+    apps.py). This is on by default, so a stock deploy needs nothing
+    else.
+  * `python manage.py run_scheduled_jobs`, from cron or with --loop as a
+    dedicated process. Set SCHEDULER_ENABLED=false on the web processes
+    if you run it this way.
+"""
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models.models import ScheduledJob, SharedBudget
+from .services.balance_ledger import reconcile_ledger
+from .services.budgets_service import reset_expired_budgets
+from .services.subscription_service import generate_subscription_payments
+from .summary_cache import bump_version
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', default='true').lower() == 'true'
+POLL_SECONDS = int(os.getenv('SCHEDULER_POLL_SECONDS', default='60'))
+BATCH_SIZE = int(os.getenv('SCHEDULER_BATCH_SIZE', default='200'))
+# Jobs are scheduled for this local hour (the start of the off-peak window)
+WINDOW_START_HOUR = int(os.getenv('SCHEDULER_WINDOW_START_HOUR', default='2'))
+# How long a claimed job stays locked without a heartbeat. Renewed after
+# every batch, so it only has to outlast one batch.
+LOCK_TTL = timedelta(minutes=10)
+# How soon to try again after a run that failed outright
+RETRY_AFTER = timedelta(hours=1)
+
+
+def _rolled_over_budgets(user):
+    changed = len(reset_expired_budgets(user))
+    if changed:
+        bump_version(user)
+    return changed
+
+
+def _generated_payments(user):
+    changed = generate_subscription_payments(user)
+    if changed:
+        bump_version(user)
+    return changed
+
+
+def _reconciled_balances(user):
+    # Each shared budget has one creator, so every budget is visited once
+    return sum(reconcile_ledger(budget) for budget in SharedBudget.objects.filter(created_by=user))
+
+
+# job name -> per-user function returning how many rows it changed.
+# Budget rollover goes first so the new periods exist before anything
+# else looks at them.
+JOBS = {
+    'reset_expired_budgets': _rolled_over_budgets,
+    'generate_subscription_payments': _generated_payments,
+    'reconcile_shared_budget_balances': _reconciled_balances,
+}
+
+
+def _owner():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def next_window_start(now=None):
+    """The start of the first off-peak window after `now`."""
+    now = timezone.localtime(now)
+    start = timezone.make_aware(datetime.combine(now.date(), time(WINDOW_START_HOUR)))
+    return start if start > now else start + timedelta(days=1)
+
+
+def acquire(name, owner, force=False):
+    """
+    Try to claim job `name`. Returns True if this caller now holds the lock.
+
+    The claim is a single conditional UPDATE, so two processes can never
+    both win. Unless `force` is set, the job must also be due.
+    """
+    now = timezone.now()
+    ScheduledJob.objects.bulk_create([ScheduledJob(name=name)], ignore_conflicts=True)
+
+    claimable = ScheduledJob.objects.filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now), name=name
+    )
+    if not force:
+        claimable = claimable.filter(Q(next_run_at__isnull=True) | Q(next_run_at__lte=now))
+    return claimable.update(locked_until=now + LOCK_TTL, locked_by=owner, last_started_at=now) == 1
+
+
+def _heartbeat(name, owner):
+    ScheduledJob.objects.filter(name=name, locked_by=owner).update(
+        locked_until=timezone.now() + LOCK_TTL
+    )
+
+
+def _release(name, owner, next_run_at, error=''):
+    ScheduledJob.objects.filter(name=name, locked_by=owner).update(
+        locked_until=None,
+        locked_by='',
+        last_finished_at=timezone.now(),
+        next_run_at=next_run_at,
+        last_error=error,
+    )
+
+
+def user_batches(batch_size=BATCH_SIZE):
+    """Active users, `batch_size` at a time, paging by id."""
+    last_id = 0
+    while True:
+        batch = list(User.objects.filter(is_active=True, id__gt=last_id).order_by('id')[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+
+def run_job(name, force=False, batch_size=BATCH_SIZE):
+    """
+    Run job `name` for every active user if it's due and nobody else is
+    running it. Returns (changed, failed_users), or None if it didn't run.
+
+    One user failing doesn't stop the run; their error is logged and the
+    rest carry on.
+    """
+    owner = _owner()
+    if not acquire(name, owner, force=force):
+        return None
+
+    job = JOBS[name]
+    changed = failed = 0
+    try:
+        for batch in user_batches(batch_size):
+            for user in batch:
+                try:
+                    changed += job(user)
+                except Exception:
+                    failed += 1
+                    logger.exception("Job %s failed for user %s", name, user.id)
+            _heartbeat(name, owner)
+    except Exception as e:
+        logger.exception("Job %s failed", name)
+        _release(name, owner, timezone.now() + RETRY_AFTER, error=str(e))
+        raise
+
+    _release(name, owner, next_window_start())
+    logger.info("Job %s changed %d rows (%d users failed)", name, changed, failed)
+    return changed, failed
+
+
+def run_due_jobs():
+    """Run every job that's due. Returns {name: result} for the ones that ran."""
+    results = {}
+    for name in JOBS:
+        result = run_job(name)
+        if result is not None:
+            results[name] = result
+    return results
+
+
+class SchedulerThread(threading.Thread):
+    """Polls run_due_jobs() every POLL_SECONDS until stopped."""
+
+    def __init__(self, poll_seconds=POLL_SECONDS):
+        super().__init__(name='djangoapp-scheduler', daemon=True)
+        self.poll_seconds = poll_seconds
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.poll_seconds):
+            close_old_connections()
+            try:
+                run_due_jobs()
+            except Exception:
+                logger.exception("Scheduled jobs failed")
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self.stopped.set()
+
+
+_thread = None
+_thread_pid = None
+_thread_lock = threading.Lock()
+
+
+def start_scheduler():
+    """Start this process's scheduler thread, once (restarted after fork)."""
+    global _thread, _thread_pid
+
+    with _thread_lock:
+        if _thread is not None and _thread_pid == os.getpid() and _thread.is_alive():
+            return _thread
+        _thread = SchedulerThread()
+        _thread_pid = os.getpid()
+        _thread.start()
+    return _thread
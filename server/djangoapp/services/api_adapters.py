@@ -1,17 +1,22 @@
 """
 Converts raw JSON rows returned by the Node database API into typed
 objects, so the existing pure business-logic functions (things like
-get_subscription_amount_for_period, which do date arithmetic and Decimal
-math) can keep working completely unchanged.
+get_subscription_amount_for_period, which do date arithmetic and money
+math) can keep working completely unchanged. Amounts of money come out
+as Money (services/money.py).
 
 This is the seam between "data access over HTTP" and "business logic in
 Django" for the gateway architecture: fetch raw rows -> adapt -> compute.
+
+The adapted objects are slotted classes rather than SimpleNamespaces: a
+list view can adapt tens of thousands of rows, and dropping the
+per-object __dict__ roughly halves what they take up.
 """
 from datetime import date
 from decimal import Decimal
-from types import SimpleNamespace
 
-from ..restapi import get_request
+from ..restapi import get_request, aggregate_request, require
+from .money import Money, ZERO
 
 
 def _parse_date(value):
@@ -22,185 +27,316 @@ def _parse_decimal(value):
     return Decimal(str(value)) if value is not None else Decimal("0")
 
 
-def budget_from_row(row):
-    return SimpleNamespace(
-        id=row["id"],
-        user_id=row["user_id"],
-        category=row["category"],
-        amount=_parse_decimal(row["amount"]),
-        period_start=_parse_date(row["period_start"]),
-        period_end=_parse_date(row["period_end"]),
-        recurrence=row.get("recurrence"),
-        is_active=bool(row["is_active"]),
-        is_recurring=bool(row["is_recurring"]),
-        is_shared=bool(row["is_shared"]),
-    )
+class _Lazy:
+    """
+    A field that is only parsed the first time it's read.
 
+    Used for the bookkeeping timestamps (created_at and friends) that few
+    callers look at. The parsed value is cached in the instance slot of
+    the same name with a leading underscore. A missing key parses like a
+    null.
+    """
+    __slots__ = ("key", "parse", "cache")
 
-def transaction_from_row(row):
-    return SimpleNamespace(
-        id=row["id"],
-        user_id=row["user_id"],
-        amount=_parse_decimal(row["amount"]),
-        description=row["description"],
-        category=row.get("category"),
-        date=_parse_date(row["date"]),
-    )
+    def __init__(self, key, parse=_parse_date):
+        self.key = key
+        self.parse = parse
 
+    def __set_name__(self, owner, name):
+        self.cache = owner.__dict__["_" + name]
 
-def subscription_from_row(row):
-    return SimpleNamespace(
-        id=row["id"],
-        user_id=row["user_id"],
-        name=row["name"],
-        amount=_parse_decimal(row["amount"]),
-        category=row["category"],
-        billing_cycle=row["billing_cycle"],
-        billing_day=row["billing_day"],
-        start_date=_parse_date(row["start_date"]),
-        end_date=_parse_date(row.get("end_date")),
-        status=row["status"],
-        description=row["description"],
-        created_at=_parse_date(row.get("created_at")),
-        updated_at=_parse_date(row.get("updated_at")),
-    )
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            return self.cache.__get__(obj, objtype)
+        except AttributeError:
+            value = self.parse(obj._row.get(self.key))
+            self.cache.__set__(obj, value)
+            return value
+
+    def __set__(self, obj, value):
+        self.cache.__set__(obj, value)
+
+
+class AdaptedRow:
+    """
+    Base for the typed row objects below.
+
+    They're slotted, so an object costs a few pointers instead of a
+    per-instance __dict__. Fields the business logic uses are converted
+    in __init__; _Lazy ones are parsed from the raw row kept in `_row`
+    when first read. Like the SimpleNamespaces they replace, two rows
+    compare equal when every field does.
+    """
+    __slots__ = ("_row",)
+    _fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = tuple(name.lstrip("_") for name in cls.__slots__)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._fields)
+
+    __hash__ = None
 
 
-def subscription_payment_from_row(row):
-    return SimpleNamespace(
-        id=row["id"],
-        subscription_id=row["subscription_id"],
-        amount=_parse_decimal(row["amount"]),
-        due_date=_parse_date(row["due_date"]),
-        is_paid=bool(row["is_paid"]),
-        paid_date=_parse_date(row.get("paid_date")),
+class BudgetRow(AdaptedRow):
+    __slots__ = (
+        "id", "user_id", "category", "amount", "period_start", "period_end",
+        "recurrence", "is_active", "is_recurring", "is_shared",
     )
 
-def income_from_row(row):
-    return SimpleNamespace(
-        id=row["id"],
-        user_id=row["user_id"],
-        amount=_parse_decimal(row["amount"]),
-        source=row["source"],
-        date_received=_parse_date(row["date_received"]),
-        period_start=_parse_date(row["period_start"]),
-        period_end=_parse_date(row.get("period_end")),
+    def __init__(self, row):
+        self.id = row["id"]
+        self.user_id = row["user_id"]
+        self.category = row["category"]
+        self.amount = Money.parse(row["amount"])
+        self.period_start = _parse_date(row["period_start"])
+        self.period_end = _parse_date(row["period_end"])
+        self.recurrence = row.get("recurrence")
+        self.is_active = bool(row["is_active"])
+        self.is_recurring = bool(row["is_recurring"])
+        self.is_shared = bool(row["is_shared"])
+
+
+class TransactionRow(AdaptedRow):
+    __slots__ = ("id", "user_id", "amount", "description", "category", "date")
+
+    def __init__(self, row):
+        self.id = row["id"]
+        self.user_id = row["user_id"]
+        self.amount = Money.parse(row["amount"])
+        self.description = row["description"]
+        self.category = row.get("category")
+        self.date = _parse_date(row["date"])
+
+
+class SubscriptionRow(AdaptedRow):
+    __slots__ = (
+        "id", "user_id", "name", "amount", "category", "billing_cycle", "billing_day",
+        "start_date", "end_date", "status", "description", "_created_at", "_updated_at",
     )
 
+    created_at = _Lazy("created_at")
+    updated_at = _Lazy("updated_at")
+
+    def __init__(self, row):
+        self._row = row
+        self.id = row["id"]
+        self.user_id = row["user_id"]
+        self.name = row["name"]
+        self.amount = Money.parse(row["amount"])
+        self.category = row["category"]
+        self.billing_cycle = row["billing_cycle"]
+        self.billing_day = row["billing_day"]
+        self.start_date = _parse_date(row["start_date"])
+        self.end_date = _parse_date(row.get("end_date"))
+        self.status = row["status"]
+        self.description = row["description"]
+
+
+class SubscriptionPaymentRow(AdaptedRow):
+    __slots__ = ("id", "subscription_id", "amount", "due_date", "is_paid", "paid_date")
+
+    def __init__(self, row):
+        self.id = row["id"]
+        self.subscription_id = row["subscription_id"]
+        self.amount = Money.parse(row["amount"])
+        self.due_date = _parse_date(row["due_date"])
+        self.is_paid = bool(row["is_paid"])
+        self.paid_date = _parse_date(row.get("paid_date"))
+
+
+class IncomeRow(AdaptedRow):
+    __slots__ = ("id", "user_id", "amount", "source", "date_received", "period_start", "period_end")
+
+    def __init__(self, row):
+        self.id = row["id"]
+        self.user_id = row["user_id"]
+        self.amount = Money.parse(row["amount"])
+        self.source = row["source"]
+        self.date_received = _parse_date(row["date_received"])
+        self.period_start = _parse_date(row["period_start"])
+        self.period_end = _parse_date(row.get("period_end"))
+
+
+class SharedBudgetRow(AdaptedRow):
+    __slots__ = (
+        "id", "name", "description", "total_amount", "category", "period_start", "period_end",
+        "is_active", "default_split_type", "created_by",
+    )
 
-def shared_budget_from_row(row):
-    return SimpleNamespace(
-        id=row["id"],
-        name=row["name"],
-        description=row["description"],
-        total_amount=_parse_decimal(row["total_amount"]),
-        category=row["category"],
-        period_start=_parse_date(row["period_start"]),
-        period_end=_parse_date(row["period_end"]),
-        is_active=bool(row["is_active"]),
-        default_split_type=row["default_split_type"],
-        created_by=row["created_by"],
+    def __init__(self, row):
+        self.id = row["id"]
+        self.name = row["name"]
+        self.description = row["description"]
+        self.total_amount = Money.parse(row["total_amount"])
+        self.category = row["category"]
+        self.period_start = _parse_date(row["period_start"])
+        self.period_end = _parse_date(row["period_end"])
+        self.is_active = bool(row["is_active"])
+        self.default_split_type = row["default_split_type"]
+        self.created_by = row["created_by"]
+
+
+class SharedBudgetMemberRow(AdaptedRow):
+    __slots__ = ("id", "shared_budget_id", "user_id", "role", "contribution_percentage", "_joined_at")
+
+    joined_at = _Lazy("joined_at")
+
+    def __init__(self, row):
+        self._row = row
+        self.id = row["id"]
+        self.shared_budget_id = row["shared_budget"]
+        self.user_id = row["user_id"]
+        self.role = row["role"]
+        self.contribution_percentage = _parse_decimal(row["contribution_percentage"])
+
+
+class SharedBudgetInviteRow(AdaptedRow):
+    __slots__ = (
+        "id", "shared_budget_id", "invited_by_id", "invited_user_id", "role", "message", "status",
+        "_created_at",
     )
 
+    created_at = _Lazy("created_at")
 
-def shared_budget_member_from_row(row):
-    return SimpleNamespace(
-        id=row["id"],
-        shared_budget_id=row["shared_budget"],
-        user_id=row["user_id"],
-        role=row["role"],
-        contriution_percentage=_parse_decimal(row["contribution_percentage"]),
-        joined_at=_parse_date(row.get("joined_at")),
-    )
+    def __init__(self, row):
+        self._row = row
+        self.id = row["id"]
+        self.shared_budget_id = row["shared_budget"]
+        self.invited_by_id = row["invited_by"]
+        self.invited_user_id = row["invited_user"]
+        self.role = row["role"]
+        self.message = row["message"]
+        self.status = row["status"]
 
 
-def shared_budget_invite_from_row(row):
-    return SimpleNamespace(
-        id=row["id"],
-        shared_budget_id=row["shared_budget"],
-        invited_by_id=row["invited_by"],
-        invited_user_id=row["invited_user"],
-        role=row["role"],
-        message=row["message"],
-        status=row["status"],
-        created_at=_parse_date(row.get("created_at")),
+class SharedExpenseRow(AdaptedRow):
+    __slots__ = (
+        "id", "shared_budget_id", "description", "amount", "paid_by_id", "date", "category",
+        "created_by_id", "notes",
     )
 
+    def __init__(self, row):
+        self.id = row["id"]
+        self.shared_budget_id = row["shared_budget"]
+        self.description = row["description"]
+        self.amount = Money.parse(row["amount"])
+        self.paid_by_id = row["paid_by"]
+        self.date = _parse_date(row["date"])
+        self.category = row["category"]
+        self.created_by_id = row["created_by"]
+        self.notes = row["notes"]
 
-def shared_expense_from_row(row):
-    return SimpleNamespace(
-        id=row["id"],
-        shared_budget_id=row["shared_budget"],
-        description=row["description"],
-        amount=_parse_decimal(row["amount"]),
-        paid_by_id=row["paid_by"],
-        date=_parse_date(row["date"]),
-        category=row["category"],
-        created_by_id=row["created_by"],
-        notes=row["notes"],
-    )
 
+class ExpenseSplitRow(AdaptedRow):
+    __slots__ = ("id", "shared_expense_id", "user_id", "amount_owed", "is_settled", "_settled_at")
 
-def expense_split_from_row(row):
-    return SimpleNamespace(
-        id=row["id"],
-        shared_expense_id=row["shared_expense"],
-        user_id=row["user_id"],
-        amount_owed=_parse_decimal(row["amount_owed"]),
-        is_settled=bool(row["is_settled"]),
-        settled_at=_parse_date(row.get("settled_at")),
-    )
+    settled_at = _Lazy("settled_at")
 
+    def __init__(self, row):
+        self._row = row
+        self.id = row["id"]
+        self.shared_expense_id = row["shared_expense"]
+        self.user_id = row["user_id"]
+        self.amount_owed = Money.parse(row["amount_owed"])
+        self.is_settled = bool(row["is_settled"])
 
-def settlement_from_row(row):
-    return SimpleNamespace(
-        id=row["id"],
-        shared_budget_id=row["shared_budget"],
-        payer_id=row["payer"],
-        receiver_id=row["receiver"],
-        amount=_parse_decimal(row["amount"]),
-        date=_parse_date(row["date"]),
-        notes=row["notes"],
-        created_at=_parse_date(row.get("created_at")),
-    )
 
+class SettlementRow(AdaptedRow):
+    __slots__ = ("id", "shared_budget_id", "payer_id", "receiver_id", "amount", "date", "notes", "_created_at")
 
-def shared_budget_notification_from_row(row):
-    return SimpleNamespace(
-        id=row["id"],
-        user_id=row["user_id"],
-        from_user_id=row["from_user"],
-        notification_type=row["notification_type"],
-        shared_budget_id=row["shared_budget"],
-        message=row["message"],
-        is_read=bool(row["is_read"]),
-        created_at=_parse_date(row.get("created_at")),
-    )
+    created_at = _Lazy("created_at")
 
+    def __init__(self, row):
+        self._row = row
+        self.id = row["id"]
+        self.shared_budget_id = row["shared_budget"]
+        self.payer_id = row["payer"]
+        self.receiver_id = row["receiver"]
+        self.amount = Money.parse(row["amount"])
+        self.date = _parse_date(row["date"])
+        self.notes = row["notes"]
 
-def friendship_from_row(row):
-    return SimpleNamespace(
-        id=row["id"],
-        sender_id=row["sender"],
-        receiver_id=row["receiver"],
-        status=row["status"],
-        created_at=_parse_date(row.get("created_at")),
-        updated_at=_parse_date(row.get("updated_at")),
+
+class SharedBudgetNotificationRow(AdaptedRow):
+    __slots__ = (
+        "id", "user_id", "from_user_id", "notification_type", "shared_budget_id", "message", "is_read",
+        "_created_at",
     )
 
+    created_at = _Lazy("created_at")
+
+    def __init__(self, row):
+        self._row = row
+        self.id = row["id"]
+        self.user_id = row["user_id"]
+        self.from_user_id = row["from_user"]
+        self.notification_type = row["notification_type"]
+        self.shared_budget_id = row["shared_budget"]
+        self.message = row["message"]
+        self.is_read = bool(row["is_read"])
+
+
+class FriendshipRow(AdaptedRow):
+    __slots__ = ("id", "sender_id", "receiver_id", "status", "_created_at", "_updated_at")
+
+    created_at = _Lazy("created_at")
+    updated_at = _Lazy("updated_at")
 
-def friendship_notification_from_row(row):
-    return SimpleNamespace(
-        id=row["id"],
-        user_id=row["user_id"],
-        from_user_id=row["from_user"],
-        notification_type=row["notification_type"],
-        friendship_id=row.get("friendship_id"),
-        message=row["message"],
-        is_read=bool(row["is_read"]),
-        created_at=_parse_date(row.get("created_at")),
+    def __init__(self, row):
+        self._row = row
+        self.id = row["id"]
+        self.sender_id = row["sender"]
+        self.receiver_id = row["receiver"]
+        self.status = row["status"]
+
+
+class FriendshipNotificationRow(AdaptedRow):
+    __slots__ = (
+        "id", "user_id", "from_user_id", "notification_type", "friendship_id", "message", "is_read",
+        "_created_at",
     )
 
+    created_at = _Lazy("created_at")
+
+    def __init__(self, row):
+        self._row = row
+        self.id = row["id"]
+        self.user_id = row["user_id"]
+        self.from_user_id = row["from_user"]
+        self.notification_type = row["notification_type"]
+        self.friendship_id = row.get("friendship_id")
+        self.message = row["message"]
+        self.is_read = bool(row["is_read"])
+
+
+# The <model>_from_row names are what the views and services call; use
+# them with map() to adapt a whole list of rows.
+budget_from_row = BudgetRow
+transaction_from_row = TransactionRow
+subscription_from_row = SubscriptionRow
+subscription_payment_from_row = SubscriptionPaymentRow
+income_from_row = IncomeRow
+shared_budget_from_row = SharedBudgetRow
+shared_budget_member_from_row = SharedBudgetMemberRow
+shared_budget_invite_from_row = SharedBudgetInviteRow
+shared_expense_from_row = SharedExpenseRow
+expense_split_from_row = ExpenseSplitRow
+settlement_from_row = SettlementRow
+shared_budget_notification_from_row = SharedBudgetNotificationRow
+friendship_from_row = FriendshipRow
+friendship_notification_from_row = FriendshipNotificationRow
+
 
 def get_username(user_id):
     """Get username for a user ID."""
@@ -222,21 +358,85 @@ def get_user_last_name(user_id):
     user_row = get_request(f"users/{user_id}")
     return user_row["last_name"] if user_row else ""
 
+def _user_data_from_row(user_row):
+    return {
+        'id': user_row["id"],
+        'username': user_row["username"],
+        'first_name': user_row["first_name"],
+        'last_name': user_row["last_name"],
+        'email': user_row["email"],
+    }
+
+
+def placeholder_user_data(user_id):
+    """Stand-in user data for an id the API doesn't know about."""
+    return {
+        'id': user_id,
+        'username': f'user_{user_id}',
+        'first_name': '',
+        'last_name': '',
+        'email': '',
+    }
+
+
+def get_users_by_ids(user_ids):
+    """
+    Resolve many user ids with a single `GET users/?id__in=...` request.
+
+    Returns {user_id: user_data} for the ids the API found. Look up ids
+    with `users.get(user_id) or placeholder_user_data(user_id)` when a
+    missing user should still render.
+    """
+    ids = sorted({user_id for user_id in user_ids if user_id is not None})
+    if not ids:
+        return {}
+
+    user_rows = get_request("users/", id__in=",".join(str(i) for i in ids)) or []
+    return {row["id"]: _user_data_from_row(row) for row in user_rows}
+
+
 def get_user_data(user_id):
     user_row = get_request(f"users/{user_id}")
     if user_row:
-        return {
-            'id': user_row["id"],
-            'username': user_row["username"],
-            'first_name': user_row["first_name"],
-            'last_name': user_row["last_name"],
-            'email': user_row["email"],
-        }
+        return _user_data_from_row(user_row)
     else:
-        return {
-            'id': user_id,
-            'username': f'user_{user_id}',
-            'first_name': '',
-            'last_name': '',
-            'email': '',
-        }
\ No newline at end of file
+        return placeholder_user_data(user_id)
+
+
+def get_total_and_count(endpoint, column="amount", **filters):
+    """
+    Sum `column` over the rows matching `filters` and count them, e.g.
+    get_total_and_count("transactions/", user_id=1, date__gte="2025-01-01").
+
+    The API does the summing, so only the total crosses the wire. Returns
+    (ZERO, 0) when nothing matches; raises ApiReadError if the request
+    fails, rather than reporting a zero total.
+    """
+    row = require(aggregate_request(endpoint, sum=column, count=True, **filters), endpoint)
+    return Money.parse(row.get(f"{column}__sum")), row.get("count") or 0
+
+
+def get_total(endpoint, column="amount", **filters):
+    """Like get_total_and_count, but just the Money total."""
+    return get_total_and_count(endpoint, column, **filters)[0]
+
+
+def get_payment_total_and_count(user_id, **filters):
+    """
+    get_total_and_count over a user's subscription payments.
+
+    Payments have no user_id column, so they're matched by the ids of
+    the user's subscriptions, looked up in one grouped request first.
+    """
+    rows = require(
+        aggregate_request("subscriptions/", group_by="id", count=True, user_id=user_id), "subscriptions/"
+    )
+    if not rows:
+        return ZERO, 0
+    subscription_ids = ",".join(str(row["id"]) for row in rows)
+    return get_total_and_count("subscription-payments/", subscription_id__in=subscription_ids, **filters)
+
+
+def get_payment_total(user_id, **filters):
+    """Like get_payment_total_and_count, but just the Money total."""
+    return get_payment_total_and_count(user_id, **filters)[0]
@@ -0,0 +1,188 @@
+"""
+Incremental upkeep of the per-member balance ledger (SharedBudgetBalance).
+
+Every write that moves money inside a shared budget -- adding, editing or
+deleting an expense, recording a settlement -- turns into per-member
+deltas that are posted to shared-budget-balances/adjust, where the Node
+API applies them in one transaction. Reading balances is then one request
+for the budget's ledger rows, however many expenses it has, instead of
+re-summing the whole ledger (services/debts.py).
+
+The ledger update is a second write after the expense or settlement
+itself, so it can fail on its own. When it does, the budget's ledger is
+rebuilt from the underlying tables straight away (rebuild_ledger). The
+scheduler's nightly reconcile_shared_budget_balances job, also available
+as `manage.py reconcile_shared_budget_balances`, catches any drift left
+over.
+"""
+import logging
+from collections import defaultdict
+
+from ..models.models import SharedBudget, SharedBudgetBalance
+from ..restapi import get_request, post_request
+from .debts import _amount, compute_balances, fetch_budget_ledger
+from .money import ZERO, Money
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("total_paid", "total_owed", "settlements_in", "settlements_out")
+
+
+def _empty():
+    return dict.fromkeys(COLUMNS, ZERO)
+
+
+def expense_deltas(expense_row, split_rows, sign=1):
+    """
+    Per-user ledger changes for adding an expense and its splits.
+
+    Pass sign=-1 for the reverse (the expense being removed). Settled
+    splits don't count towards total_owed, same as compute_balances().
+    """
+    deltas = defaultdict(_empty)
+    deltas[expense_row["paid_by"]]["total_paid"] += sign * _amount(expense_row["amount"])
+    for split_row in split_rows:
+        if not split_row.get("is_settled"):
+            deltas[split_row["user_id"]]["total_owed"] += sign * _amount(split_row["amount_owed"])
+    return deltas
+
+
+def settlement_deltas(settlement_row, sign=1):
+    """Per-user ledger changes for recording (or, with sign=-1, removing) a settlement."""
+    amount = sign * _amount(settlement_row["amount"])
+    deltas = defaultdict(_empty)
+    deltas[settlement_row["payer"]]["settlements_out"] += amount
+    deltas[settlement_row["receiver"]]["settlements_in"] += amount
+    return deltas
+
+
+def merge_deltas(*all_deltas):
+    """Add several delta maps together into one."""
+    merged = defaultdict(_empty)
+    for deltas in all_deltas:
+        for user_id, values in deltas.items():
+            for column, value in values.items():
+                merged[user_id][column] += value
+    return merged
+
+
+def apply_deltas(budget_id, deltas):
+    """
+    Post the non-zero deltas to the ledger in a single request.
+
+    Returns the budget's ledger rows after the update, [] when there was
+    nothing to change, or None if the request failed.
+    """
+    adjustments = [
+        {"user_id": user_id, **{column: str(value) for column, value in values.items() if value}}
+        for user_id, values in deltas.items()
+        if any(values.values())
+    ]
+    if not adjustments:
+        return []
+    return post_request("shared-budget-balances/adjust", {
+        "shared_budget_id": budget_id,
+        "adjustments": adjustments,
+    })
+
+
+def rebuild_ledger(budget_id):
+    """
+    Recompute a budget's ledger rows from its expenses, splits and
+    settlements. Returns the new rows, or None if that failed too (the
+    nightly reconcile job will try again).
+    """
+    try:
+        return SharedBudgetBalance.rebuild(SharedBudget.objects.get(pk=budget_id))
+    except Exception:
+        logger.exception("Could not rebuild the balance ledger of shared budget %s", budget_id)
+        return None
+
+
+def _record(budget_id, deltas):
+    """apply_deltas(), rebuilding the budget's ledger if the update failed."""
+    rows = apply_deltas(budget_id, deltas)
+    if rows is None:
+        logger.warning("Ledger update for shared budget %s failed; rebuilding it", budget_id)
+        rebuild_ledger(budget_id)
+    return rows
+
+
+def record_expense(budget_id, expense_row, split_rows):
+    """Add a newly created expense and its splits to the ledger."""
+    return _record(budget_id, expense_deltas(expense_row, split_rows))
+
+
+def record_expense_removed(budget_id, expense_row, split_rows):
+    """Take a deleted expense and the splits it had back out of the ledger."""
+    return _record(budget_id, expense_deltas(expense_row, split_rows, sign=-1))
+
+
+def record_expense_changed(budget_id, old_expense_row, old_split_rows, new_expense_row, new_split_rows):
+    """Replace an expense's old contribution to the ledger with its new one, in one request."""
+    return _record(budget_id, merge_deltas(
+        expense_deltas(old_expense_row, old_split_rows, sign=-1),
+        expense_deltas(new_expense_row, new_split_rows),
+    ))
+
+
+def record_settlement(budget_id, settlement_row):
+    """Add a new settlement to the ledger."""
+    return _record(budget_id, settlement_deltas(settlement_row))
+
+
+def _ledger_snapshot(shared_budget):
+    return {
+        (row.user_id, *(getattr(row, column) for column in COLUMNS))
+        for row in SharedBudgetBalance.objects.filter(shared_budget=shared_budget)
+    }
+
+
+def reconcile_ledger(shared_budget):
+    """
+    Rebuild a budget's ledger rows and report whether they had drifted
+    from the underlying tables.
+    """
+    before = _ledger_snapshot(shared_budget)
+    SharedBudgetBalance.rebuild(shared_budget)
+    drifted = _ledger_snapshot(shared_budget) != before
+    if drifted:
+        logger.warning("Balance ledger of shared budget %s had drifted; rebuilt", shared_budget.id)
+    return drifted
+
+
+def get_ledger_balances(budget_id, member_ids=()):
+    """
+    Every member's balance for a budget, read straight from the ledger.
+
+    Returns the same shape as debts.compute_balances(), so the two are
+    interchangeable. If the ledger can't be read, falls back to summing
+    the raw expenses, splits and settlements.
+    """
+    rows = get_request("shared-budget-balances/", shared_budget_id=budget_id)
+    if rows is None:
+        return compute_balances(fetch_budget_ledger(budget_id), member_ids)
+
+    def entry(paid=ZERO, owed=ZERO, settlements_out=ZERO, settlements_in=ZERO):
+        return {
+            "total_paid": paid,
+            "total_owed": owed,
+            "settlements_paid": settlements_out,
+            "settlements_received": settlements_in,
+            "balance": paid - owed - settlements_in + settlements_out,
+        }
+
+    balances = {user_id: entry() for user_id in member_ids}
+    for row in rows:
+        balances[row["user_id"]] = entry(
+            _amount(row["total_paid"]),
+            _amount(row["total_owed"]),
+            _amount(row["settlements_out"]),
+            _amount(row["settlements_in"]),
+        )
+    return balances
+
+
+def total_paid(balances):
+    """Sum of what every member has paid, i.e. the budget's total spent."""
+    return Money.total(entry["total_paid"] for entry in balances.values())
@@ -0,0 +1,108 @@
+"""
+When a subscription bills: the date arithmetic behind its schedule.
+
+Shared by subscription_service (which materializes the dates as
+SubscriptionPayment rows) and spending_calculations (which only needs to
+know how many charges fall in a period), so both agree on what the
+schedule is. Everything here is closed form -- the cost doesn't grow
+with how long ago the subscription started.
+"""
+from calendar import monthrange
+from datetime import date
+
+# Fixed-length cycles, in days. Anything not listed here (or in
+# MONTHLY_CYCLES) falls back to FALLBACK_CYCLE_DAYS.
+CYCLE_DAYS = {"daily": 1, "weekly": 7}
+# Calendar cycles, in months
+MONTHLY_CYCLES = {"monthly": 1, "yearly": 12}
+FALLBACK_CYCLE_DAYS = 31
+
+
+def _month_number(d):
+    """Months since year 0, so month arithmetic is plain integer math."""
+    return d.year * 12 + d.month - 1
+
+
+def _clamped_date(month_number, day):
+    """`day` of the given month, clamped to the month's last day (Jan 31 -> Feb 28)."""
+    year, month = divmod(month_number, 12)
+    return date(year, month + 1, min(day, monthrange(year, month + 1)[1]))
+
+
+def _ceil_div(a, b):
+    return -(-a // b)
+
+
+def _monthly_indexes(start_date, first, end_date, step, billing_day):
+    """
+    (nth, lo, hi): nth(n) is the n-th billing date of a calendar cycle and
+    lo..hi (inclusive, possibly empty) the indexes landing in [first, end_date].
+    """
+    base = _month_number(start_date)
+    # Monthly dates move to billing_day; yearly ones keep the start day
+    day = (billing_day or start_date.day) if step == 1 else start_date.day
+
+    def nth(n):
+        return start_date if n == 0 else _clamped_date(base + n * step, day)
+
+    # Every cycle lands in a known month, so the first/last index in
+    # range is the month distance, corrected by one if the clamped
+    # day falls just outside the window.
+    lo = max(0, _ceil_div(_month_number(first) - base, step))
+    if nth(lo) < first:
+        lo += 1
+    hi = (_month_number(end_date) - base) // step
+    if hi >= 0 and nth(hi) > end_date:
+        hi -= 1
+    return nth, lo, hi
+
+
+def _first_fixed_ordinal(start_date, first, step):
+    """Ordinal of the first fixed-cycle billing date on or after `first`."""
+    origin = start_date.toordinal()
+    return origin + _ceil_div(first.toordinal() - origin, step) * step
+
+
+def get_billing_dates(start_date, end_date, billing_cycle, billing_day=1, window_start=None):
+    """
+    Calculate all billing dates between start_date and end_date.
+
+    The n-th date is computed directly from start_date rather than by
+    stepping from the previous one, so there's no iteration cap and the
+    cost is proportional to the number of dates returned. Pass
+    `window_start` to only get the dates on or after it.
+
+    The first billing date is always start_date. After that, monthly
+    cycles fall on `billing_day` and yearly cycles on start_date's
+    anniversary, both clamped to the length of the month.
+    """
+    first = start_date if window_start is None else max(start_date, window_start)
+    if first > end_date:
+        return []
+
+    if billing_cycle in MONTHLY_CYCLES:
+        nth, lo, hi = _monthly_indexes(start_date, first, end_date, MONTHLY_CYCLES[billing_cycle], billing_day)
+        return [nth(n) for n in range(lo, hi + 1)]
+
+    # Fixed-length cycles are just every step-th day ordinal
+    step = CYCLE_DAYS.get(billing_cycle, FALLBACK_CYCLE_DAYS)
+    lo = _first_fixed_ordinal(start_date, first, step)
+    return list(map(date.fromordinal, range(lo, end_date.toordinal() + 1, step)))
+
+
+def count_billing_dates(start_date, end_date, billing_cycle, billing_day=1, window_start=None):
+    """
+    len(get_billing_dates(...)) without building the list: O(1) for any
+    window, however many charges it holds.
+    """
+    first = start_date if window_start is None else max(start_date, window_start)
+    if first > end_date:
+        return 0
+
+    if billing_cycle in MONTHLY_CYCLES:
+        _, lo, hi = _monthly_indexes(start_date, first, end_date, MONTHLY_CYCLES[billing_cycle], billing_day)
+        return max(0, hi - lo + 1)
+
+    step = CYCLE_DAYS.get(billing_cycle, FALLBACK_CYCLE_DAYS)
+    lo = _first_fixed_ordinal(start_date, first, step)
+    return max(0, (end_date.toordinal() - lo) // step + 1)
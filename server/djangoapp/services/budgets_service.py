@@ -1,66 +1,94 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from datetime import date, timedelta
-from decimal import Decimal
+from itertools import accumulate
 from dateutil.relativedelta import relativedelta
 
 from ..restapi import get_request, post_request, patch_request, delete_request
 from .api_adapters import budget_from_row, transaction_from_row, subscription_from_row
+from .category_keys import category_key
+from .money import ZERO, Money
 from .spending_calculations import get_subscription_amount_for_period
 
 
-def reset_expired_budgets(user):
-    """Check and reset expired budgets, creating new ones if recurring."""
-    today = date.today()
+def reset_expired_budgets(user, today=None):
+    """
+    Retire the user's expired budgets and roll recurring ones forward.
 
+    A recurring budget that hasn't been looked at for a while is carried
+    straight to the period containing `today` (calculate_next_period is
+    chained over every missed period), so a daily budget left alone for a
+    year catches up in one call instead of one day per call. Only the
+    current period is created; the periods skipped over would just be
+    empty history.
+
+    All deactivations and creations go out as one budgets/rollover write,
+    which the API applies in a single transaction. Each entry carries the
+    period_end we saw, and the API skips budgets that are no longer active
+    or no longer end there -- so running this twice, or from two workers
+    at once, never creates a second successor.
+
+    Returns the newly created budgets.
+    """
+    today = today or date.today()
+
+    # period_end is the last day the budget covers, so it has only expired
+    # once that day is over.
     rows = get_request(
-        "budget/",
+        "budgets/",
         user_id=user.id,
-        period_end__lte=today.isoformat(),
+        period_end__lt=today.isoformat(),
     ) or []
     # NOTE: filtering booleans (is_active) through the generic API's query
     # params is unreliable (MySQL boolean coercion of the string "true"
     # isn't guaranteed), so we filter it here in Python instead.
 
     expired = [budget_from_row(r) for r in rows if r["is_active"]]
+    if not expired:
+        return []
+
+    rollovers = [
+        {
+            "id": budget.id,
+            "period_end": budget.period_end.isoformat(),
+            "successor": _successor_row(budget, today) if budget.is_recurring else None,
+        }
+        for budget in expired
+    ]
 
-    created_budgets = []
+    result = post_request("budgets/rollover", {"rollovers": rollovers})
+    if not result:
+        return []
+    return [budget_from_row(r) for r in result["created"]]
 
-    for budget in expired:
-        # Deactivate the expired budget
-        patch_request(f"budget/{budget.id}", {"is_active": False})
 
-        # Skip if not recurring
-        if not budget.is_recurring:
-            continue
-        
-        # Calculate next period based on recurrence type
-        next_start, next_end = calculate_next_period(
-            budget.period_end,
-            budget.recurrence
-        )
+def current_period(period_end, recurrence, today):
+    """
+    The first period after `period_end` that hasn't ended by `today`.
+
+    Walks calculate_next_period forward over every missed period. Returns
+    (start, end).
+    """
+    next_start, next_end = calculate_next_period(period_end, recurrence)
+    while next_end < today:
+        next_start, next_end = calculate_next_period(next_end, recurrence)
+    return next_start, next_end
+
 
-        # Create new budget
-        new_row = post_request("budgets/", {
-            "user_id": budget.user_id,
-            "category": budget.category,
-            "amount": str(budget.amount),
-            "period_start": next_start.isoformat(),
-            "period_end": next_end.isoformat(),
-            "recurrence": budget.recurrence,
-            "is_active": True,
-            "is_recurring": True,
-            "is_shared": budget.is_shared,
-        })
-        # NOTE: the (category, user) unique_together constraint still
-        # exists on this table (enforced by Sequelize now instead of
-        # Django). A colliding create returns None here rather than
-        # raising IntegrityError -- restapi.post_request swallows HTTP
-        # error responses and logs them instead of propagating an
-        # exception. Any test asserting IntegrityError against this path
-        # will need to change to asserting `created_budgets == []` instead.
-        if new_row:
-            created_budgets.append(budget_from_row(new_row))
-
-    return created_budgets
+def _successor_row(budget, today):
+    """Row for the budget's current period, ready to post to the API."""
+    next_start, next_end = current_period(budget.period_end, budget.recurrence, today)
+    return {
+        "user_id": budget.user_id,
+        "category": budget.category,
+        "amount": str(budget.amount),
+        "period_start": next_start.isoformat(),
+        "period_end": next_end.isoformat(),
+        "recurrence": budget.recurrence,
+        "is_active": True,
+        "is_recurring": True,
+        "is_shared": budget.is_shared,
+    }
 
 
 def calculate_next_period(period_end, recurrence):
@@ -87,7 +115,7 @@ def get_transactions_for_budget(budget):
     rows = get_request(
         "transactions/",
         user_id=budget.user_id,
-        category=budget.category,
+        category_key=category_key(budget.category),
         date__gte=budget.period_start.isoformat(),
         date__lte=budget.period_end.isoformat(),
     ) or []
@@ -100,21 +128,18 @@ def get_subscriptions_for_budget(budget):
         "subscriptions/",
         user_id=budget.user_id,
         status="active",
+        category_key=category_key(budget.category),
     ) or []
-
-    return [
-        subscription_from_row(r) for r in rows
-        if r["category"].lower() == budget.category.lower()
-    ]
+    return [subscription_from_row(r) for r in rows]
 
 
 def compute_budget_spent(budget):
     """Caclulate total spent for a budget."""
     transactions = get_transactions_for_budget(budget)
-    transaction_total = sum((t.amount for t in transactions), Decimal("0"))
+    transaction_total = Money.total(t.amount for t in transactions)
 
     # Subscription total for the budget period
-    subscription_total = Decimal("0")
+    subscription_total = ZERO
     for subscription in get_subscriptions_for_budget(budget):
         subscription_total += get_subscription_amount_for_period(
             subscription,
@@ -130,6 +155,74 @@ def compute_budget_spent(budget):
     }
 
 
+def compute_budgets_spent(user, budgets):
+    """
+    compute_budget_spent() for many of a user's budgets at once.
+
+    Fetches the user's transactions once, over the span covering every
+    budget's period, and their active subscriptions once -- two requests
+    however many budgets there are, instead of two per budget.
+    Transactions are then grouped by category key and sorted by date with
+    running totals, so each budget's share is two binary searches and a
+    subtraction.
+
+    Returns {budget.id: {"total", "transactions", "subscriptions"}}, the
+    same breakdown compute_budget_spent() gives.
+    """
+    if not budgets:
+        return {}
+
+    rows = get_request(
+        "transactions/",
+        user_id=user.id,
+        date__gte=min(b.period_start for b in budgets).isoformat(),
+        date__lte=max(b.period_end for b in budgets).isoformat(),
+    ) or []
+    subscription_rows = get_request("subscriptions/", user_id=user.id, status="active") or []
+
+    by_category = defaultdict(list)
+    for transaction in map(transaction_from_row, rows):
+        by_category[category_key(transaction.category)].append(transaction)
+
+    # category -> (sorted dates, running totals in cents with a leading 0)
+    index = {}
+    for category, transactions in by_category.items():
+        transactions.sort(key=lambda t: t.date)
+        index[category] = (
+            [t.date for t in transactions],
+            list(accumulate((t.amount.cents for t in transactions), initial=0)),
+        )
+
+    subscriptions_by_category = defaultdict(list)
+    for subscription in map(subscription_from_row, subscription_rows):
+        subscriptions_by_category[category_key(subscription.category)].append(subscription)
+
+    spent = {}
+    for budget in budgets:
+        key = category_key(budget.category)
+        transaction_total = ZERO
+        if key in index:
+            dates, totals = index[key]
+            lo = bisect_left(dates, budget.period_start)
+            hi = bisect_right(dates, budget.period_end)
+            transaction_total = Money(totals[hi] - totals[lo])
+
+        subscription_total = ZERO
+        for subscription in subscriptions_by_category[key]:
+            subscription_total += get_subscription_amount_for_period(
+                subscription,
+                budget.period_start,
+                budget.period_end
+            )
+
+        spent[budget.id] = {
+            "total": float(transaction_total + subscription_total),
+            "transactions": float(transaction_total),
+            "subscriptions": float(subscription_total),
+        }
+    return spent
+
+
 def toggle_budget_recurring(budget_id, user, is_recurring):
     """Toggle the recurring status of a budget."""
     row = get_request(f"budgets/{budget_id}")
@@ -0,0 +1,19 @@
+"""
+The normalized form of a free-text category.
+
+Categories are typed by users, so "Food", "food " and "FOOD" all mean the
+same thing. Filtering with category__iexact or lowercasing in Python
+works, but neither can use an index. Instead every categorized table
+stores category_key -- the category trimmed and lowercased -- next to
+the name as typed, and filters go through that indexed column.
+
+The Node API keeps the column up to date for its writes
+(database/models/categoryKey.js); keep the two definitions in sync.
+"""
+
+
+def category_key(category):
+    """'  Food ' -> 'food'. None stays None."""
+    if category is None:
+        return None
+    return category.strip().lower()
@@ -0,0 +1,120 @@
+"""
+Balances and simplified debts for a shared budget.
+
+A budget's whole ledger -- its expenses, their splits and its settlements --
+is pulled in three bulk requests (fetch_budget_ledger). compute_balances()
+and simplify_debts() are then plain functions over those rows, so they can
+be tested without the API and shared by every view that shows balances.
+"""
+import heapq
+from types import SimpleNamespace
+
+from ..restapi import get_request
+from .money import CENT, ZERO, Money
+
+_amount = Money.parse
+
+
+def fetch_budget_ledger(budget_id):
+    """Fetch a shared budget's expenses, splits and settlements (3 requests)."""
+    expenses = get_request("shared-expenses/", shared_budget=budget_id) or []
+
+    splits = []
+    if expenses:
+        expense_ids = ",".join(str(expense_row["id"]) for expense_row in expenses)
+        splits = get_request("expense-splits/", shared_expense__in=expense_ids) or []
+
+    settlements = get_request("settlements/", shared_budget=budget_id) or []
+
+    return SimpleNamespace(expenses=expenses, splits=splits, settlements=settlements)
+
+
+def total_expenses(ledger):
+    """Sum of every expense in the ledger."""
+    return Money.total(_amount(expense_row["amount"]) for expense_row in ledger.expenses)
+
+
+def compute_balances(ledger, member_ids=()):
+    """
+    Net position of every user in the ledger, in one pass over each list.
+
+    Returns {user_id: {"total_paid", "total_owed", "settlements_paid",
+    "settlements_received", "balance"}} with Money values. A positive
+    balance means others owe that user; negative means they owe others.
+    Settled splits don't count towards what a user owes. `member_ids` are
+    included with zero balances even if they have no activity yet.
+    """
+    def empty():
+        return {
+            "total_paid": ZERO,
+            "total_owed": ZERO,
+            "settlements_paid": ZERO,
+            "settlements_received": ZERO,
+        }
+
+    balances = {user_id: empty() for user_id in member_ids}
+
+    for expense_row in ledger.expenses:
+        entry = balances.setdefault(expense_row["paid_by"], empty())
+        entry["total_paid"] += _amount(expense_row["amount"])
+
+    # Booleans are filtered here rather than in the query string, since
+    # the generic API's coercion of "false" isn't reliable.
+    for split_row in ledger.splits:
+        entry = balances.setdefault(split_row["user_id"], empty())
+        if not split_row.get("is_settled"):
+            entry["total_owed"] += _amount(split_row["amount_owed"])
+
+    for settlement_row in ledger.settlements:
+        amount = _amount(settlement_row["amount"])
+        balances.setdefault(settlement_row["payer"], empty())["settlements_paid"] += amount
+        balances.setdefault(settlement_row["receiver"], empty())["settlements_received"] += amount
+
+    for entry in balances.values():
+        entry["balance"] = (
+            entry["total_paid"]
+            - entry["total_owed"]
+            - entry["settlements_received"]
+            + entry["settlements_paid"]
+        )
+
+    return balances
+
+
+def simplify_debts(balances):
+    """
+    Turn net balances into a short list of payments that settles everyone.
+
+    Greedy matching: the largest debtor always pays the largest creditor,
+    using two heaps so each step is O(log n). Balances under a cent are
+    treated as settled. Returns [{"from_user_id", "to_user_id", "amount"}]
+    with Money amounts, in the order they were matched.
+    """
+    # heapq is a min-heap, so store negated amounts; the user id breaks
+    # ties so the output is deterministic.
+    debtors = []
+    creditors = []
+    for user_id, entry in balances.items():
+        balance = entry["balance"]
+        if balance <= -CENT:
+            debtors.append((balance, user_id))
+        elif balance >= CENT:
+            creditors.append((-balance, user_id))
+    heapq.heapify(debtors)
+    heapq.heapify(creditors)
+
+    debts = []
+    while debtors and creditors:
+        owes, debtor_id = heapq.heappop(debtors)
+        owed, creditor_id = heapq.heappop(creditors)
+        owes, owed = -owes, -owed
+
+        amount = min(owes, owed)
+        debts.append({"from_user_id": debtor_id, "to_user_id": creditor_id, "amount": amount})
+
+        if owes - amount >= CENT:
+            heapq.heappush(debtors, (amount - owes, debtor_id))
+        if owed - amount >= CENT:
+            heapq.heappush(creditors, (amount - owed, creditor_id))
+
+    return debts
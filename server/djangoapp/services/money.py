@@ -0,0 +1,201 @@
+"""
+Amounts of money as a whole number of cents.
+
+Amounts arrive from the Node API as DECIMAL(10, 2) strings ("12.50"),
+and the services used to flip them between Decimal, float and
+Decimal(str(float)) depending on who was adding them up -- slow, and the
+float legs drift by fractions of a cent. Money keeps an int count of
+cents instead, so adding amounts up is integer addition and always
+exact.
+
+Money compares equal to a Decimal, int or float of the same value
+(Money.parse("12.50") == Decimal("12.50")), so it can stand in where a
+Decimal was used. Convert at the edges: Money.parse() on the way in;
+float(), str() or to_decimal() on the way out to JSON, the API or the
+ORM.
+"""
+import operator
+from decimal import Decimal, ROUND_HALF_UP
+from fractions import Fraction
+
+
+class Money:
+    """
+    An amount in whole cents. Treat it as immutable.
+
+    Supports +, - and comparisons with other Money, ints and Decimals;
+    * by an int (or a Decimal rate, rounded half up to the cent); and
+    Money / Money, which gives the ratio as a Decimal. Use Money.total()
+    rather than sum() for long lists.
+    """
+    __slots__ = ("cents",)
+
+    def __init__(self, cents=0):
+        self.cents = cents
+
+    @classmethod
+    def parse(cls, value):
+        """
+        Money from an API amount string, a Decimal, an int or a float.
+
+        None counts as zero. Anything finer than a cent is rounded half
+        up.
+        """
+        if value is None:
+            return cls(0)
+        if isinstance(value, Money):
+            return value
+        if isinstance(value, int):
+            return cls(value * 100)
+        if isinstance(value, str) and len(value) <= 16 and value[-3:-2] == ".":
+            # The API's two-decimal strings: with this few digits the
+            # float is within a tiny fraction of a cent, so rounding it
+            # is exact -- and much cheaper than building a Decimal.
+            try:
+                return cls(round(float(value) * 100))
+            except ValueError:
+                pass
+        amount = Decimal(str(value)) if isinstance(value, float) else Decimal(value)
+        return cls(int(amount.scaleb(2).to_integral_value(rounding=ROUND_HALF_UP)))
+
+    @classmethod
+    def total(cls, amounts):
+        """Sum of an iterable of Money (integer addition under the hood)."""
+        return cls(sum(amount.cents for amount in amounts))
+
+    def to_decimal(self):
+        return Decimal(self.cents).scaleb(-2)
+
+    def allocate(self, weights):
+        """
+        Split into shares proportional to `weights`, to the cent.
+
+        Shares are floored to whole cents and the cents that leaves over
+        go one each to the largest remainders, so they always add up to
+        exactly this amount. Ties go to the earlier weight. If every
+        weight is zero the amount is split evenly instead.
+        """
+        if self.cents < 0:
+            return [-share for share in (-self).allocate(weights)]
+
+        weights = [Fraction(str(weight)) for weight in weights]
+        if not weights:
+            return []
+
+        total_weight = sum(weights)
+        if total_weight <= 0:
+            weights = [Fraction(1)] * len(weights)
+            total_weight = Fraction(len(weights))
+
+        exact = [self.cents * weight / total_weight for weight in weights]
+        shares = [int(share) for share in exact]
+
+        leftover = self.cents - sum(shares)
+        by_remainder = sorted(range(len(exact)), key=lambda i: exact[i] - shares[i], reverse=True)
+        for i in by_remainder[:leftover]:
+            shares[i] += 1
+
+        return [Money(share) for share in shares]
+
+    def _cents_of(self, other):
+        """`other` in cents if it's a whole number of them, else None."""
+        if type(other) is Money:
+            return other.cents
+        if isinstance(other, int):
+            return other * 100
+        if isinstance(other, Decimal) and other.is_finite():
+            cents = other.scaleb(2)
+            if cents == cents.to_integral_value():
+                return int(cents)
+        return None
+
+    def __add__(self, other):
+        cents = self._cents_of(other)
+        if cents is None:
+            return NotImplemented
+        return Money(self.cents + cents)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        cents = self._cents_of(other)
+        if cents is None:
+            return NotImplemented
+        return Money(self.cents - cents)
+
+    def __rsub__(self, other):
+        cents = self._cents_of(other)
+        if cents is None:
+            return NotImplemented
+        return Money(cents - self.cents)
+
+    def __mul__(self, other):
+        if isinstance(other, int):
+            return Money(self.cents * other)
+        if isinstance(other, Decimal):
+            return Money(int((self.cents * other).to_integral_value(rounding=ROUND_HALF_UP)))
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if type(other) is Money:
+            return Decimal(self.cents) / Decimal(other.cents)
+        return NotImplemented
+
+    def __neg__(self):
+        return Money(-self.cents)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return Money(abs(self.cents))
+
+    def __bool__(self):
+        return self.cents != 0
+
+    def __float__(self):
+        return self.cents / 100
+
+    def _compare(self, other, op):
+        if type(other) is Money:
+            return op(self.cents, other.cents)
+        if isinstance(other, int):
+            return op(self.cents, other * 100)
+        if isinstance(other, (Decimal, float, Fraction)):
+            return op(self.to_decimal(), other)
+        return NotImplemented
+
+    def __eq__(self, other):
+        return self._compare(other, operator.eq)
+
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+
+    def __hash__(self):
+        # Equal to a Decimal of the same value, so hash like one
+        return hash(self.to_decimal())
+
+    def __str__(self):
+        whole, cents = divmod(abs(self.cents), 100)
+        return f"{'-' if self.cents < 0 else ''}{whole}.{cents:02d}"
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+    def __format__(self, spec):
+        return format(self.to_decimal(), spec) if spec else str(self)
+
+
+ZERO = Money(0)
+CENT = Money(1)
@@ -0,0 +1,72 @@
+"""
+Split an expense amount between members, to the cent.
+
+Dividing 100.00 three ways gives 33.333..., which can't be stored in a
+two-decimal column; rounding every share the same way leaves the splits
+a cent short of (or over) the expense. allocate() works in whole cents
+and hands the leftover cents out one at a time (largest remainder
+first), so the shares always add up to exactly the amount.
+
+Used by both the ORM (SharedExpense.create_*_splits) and the gateway
+views, which then write all of an expense's splits in one bulk insert.
+"""
+from decimal import Decimal
+
+from .money import Money
+
+CENT = Decimal("0.01")
+
+
+def allocate(amount, weights):
+    """
+    Divide `amount` into shares proportional to `weights`.
+
+    Returns a list of Decimals (two decimal places), one per weight, that
+    sum exactly to `amount`. Ties for the leftover cents go to the earlier
+    weight. If every weight is zero the amount is split evenly instead.
+    The work is done in whole cents by Money.allocate(); the results are
+    Decimals so they can go straight into the ORM's DecimalFields.
+    """
+    return [share.to_decimal() for share in Money.parse(amount).allocate(weights)]
+
+
+def split_evenly(amount, count):
+    """`amount` split into `count` near-equal shares that sum to it exactly."""
+    return allocate(amount, [1] * count)
+
+
+def member_split_rows(expense_id, amount, member_rows, split_type="equal"):
+    """
+    Split rows for an expense across a budget's members (gateway rows).
+
+    `split_type` is "equal" or "percentage" (by each member's
+    contribution_percentage). The rows are ready to post to
+    expense-splits/bulk.
+    """
+    if split_type == "percentage":
+        shares = allocate(amount, [member_row["contribution_percentage"] for member_row in member_rows])
+    else:
+        shares = split_evenly(amount, len(member_rows))
+
+    return [
+        {
+            "shared_expense": expense_id,
+            "user_id": member_row["user_id"],
+            "amount_owed": str(share),
+            "is_settled": False,
+        }
+        for member_row, share in zip(member_rows, shares)
+    ]
+
+
+def custom_split_rows(expense_id, splits_data):
+    """Split rows from user-supplied [{"user_id", "amount_owed", "is_settled"?}] (gateway rows)."""
+    return [
+        {
+            "shared_expense": expense_id,
+            "user_id": split_data["user_id"],
+            "amount_owed": str(split_data["amount_owed"]),
+            "is_settled": split_data.get("is_settled", False),
+        }
+        for split_data in splits_data
+    ]
@@ -1,8 +1,13 @@
 from datetime import date, timedelta
-from calendar import monthrange
-from django.db.models import Sum
+from django.db.models import Q, Sum
 from django.utils import timezone
-from django.db import IntegrityError
+from .billing_schedule import (
+    CYCLE_DAYS,
+    FALLBACK_CYCLE_DAYS,
+    _clamped_date,
+    _month_number,
+    get_billing_dates,
+)
 from .spending_calculations import compute_subscription_total
 from ..models.models import Subscription, SubscriptionPayment
 
@@ -32,86 +37,68 @@ def generate_subscription_payments(user, up_to_date=None):
 
 def generate_payments_for_subscription(subscription, up_to_date):
     """
-    Generate all missing SubscriptionPayment records for a subscription
-    from start_date to up_to_date.
+    Generate the missing SubscriptionPayment records for a subscription
+    up to up_to_date.
+
+    Only billing dates after subscription.materialized_through are
+    computed, and they're inserted in one bulk_create, so a call costs a
+    few queries however old the subscription is. The first run (no mark
+    yet) covers everything from start_date.
     """
-    created_payments = []
+    mark = subscription.materialized_through
+    end = min(up_to_date, subscription.end_date) if subscription.end_date else up_to_date
+    if end < subscription.start_date or (mark is not None and mark >= end):
+        return []
 
-    # Get all billing dates from start to now
     billing_dates = get_billing_dates(
         start_date=subscription.start_date,
-        end_date=up_to_date,
+        end_date=end,
         billing_cycle=subscription.billing_cycle,
-        billing_day=subscription.billing_day
+        billing_day=subscription.billing_day,
+        window_start=mark + timedelta(days=1) if mark else None,
     )
 
-    for billing_date in billing_dates:
-        # Skip if subscription was ended before this date
-        if subscription.end_date and billing_date > subscription.end_date:
-            continue
-
-        try:
-            payment, created = SubscriptionPayment.objects.get_or_create(
-                subscription=subscription,
-                due_date=billing_date,
-                defaults={
-                    'amount': subscription.amount,
-                    'is_paid': False,
-                }
-            )
-        except IntegrityError:
-            # Payment already exists
-            pass
-
-        if created:
-            created_payments.append(payment)
+    created_payments = []
+    if billing_dates:
+        # Without a mark, earlier runs (or a concurrent one) may already
+        # have created some of these; ignore_conflicts covers the race.
+        existing = set(SubscriptionPayment.objects.filter(
+            subscription=subscription,
+            due_date__gte=billing_dates[0],
+            due_date__lte=billing_dates[-1],
+        ).values_list('due_date', flat=True))
+
+        created_payments = SubscriptionPayment.objects.bulk_create(
+            [
+                SubscriptionPayment(
+                    subscription=subscription,
+                    due_date=billing_date,
+                    amount=subscription.amount,
+                    is_paid=False,
+                )
+                for billing_date in billing_dates
+                if billing_date not in existing
+            ],
+            ignore_conflicts=True,
+        )
+
+    # Only ever move the mark forward
+    Subscription.objects.filter(pk=subscription.pk).filter(
+        Q(materialized_through__isnull=True) | Q(materialized_through__lt=end)
+    ).update(materialized_through=end)
+    subscription.materialized_through = end
 
     return created_payments
     
-def get_billing_dates(start_date, end_date, billing_cycle, billing_day=1):
-    """
-    Calculate all billing dates between start_date and end_date.
-    """
-
-    dates = []
-    current = start_date
-
-    while current <= end_date:
-        dates.append(current)
-        current = get_next_billing_date(current, billing_cycle, billing_day)
-
-        # Safety: prevent infinite loop
-        if len(dates) > 1000:
-            break
-
-    return dates
-
 def get_next_billing_date(from_date, billing_cycle, billing_day=1):
     """Calculate the next billing date after from_date."""
 
-    if billing_cycle == "daily":
-        return from_date + timedelta(days=1)
-    elif billing_cycle == "weekly":
-        return from_date + timedelta(weeks=1)
-    elif billing_cycle == "monthly":
-        year, month = from_date.year, from_date.month
-
-        # Move to next month
-        if month == 12:
-            year += 1
-            month = 1
-        else:
-            month += 1
-
-        # Handle months with fewer days
-        max_day = monthrange(year, month)[1]
-        day = min(billing_day, max_day)
-
-        return from_date.replace(year=year, month=month, day=day)
+    if billing_cycle == "monthly":
+        return _clamped_date(_month_number(from_date) + 1, billing_day or from_date.day)
     elif billing_cycle == "yearly":
-        return from_date.replace(year=from_date.year + 1)
-    
-    return from_date + timedelta(days=31)   # Default fallback
+        return _clamped_date(_month_number(from_date) + 12, from_date.day)
+
+    return from_date + timedelta(days=CYCLE_DAYS.get(billing_cycle, FALLBACK_CYCLE_DAYS))
 
 def get_subscriptions_for_period(user, period: str):
     """
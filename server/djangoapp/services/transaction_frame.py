@@ -0,0 +1,245 @@
+"""
+A user's transactions held column by column, for in-memory analytics.
+
+The dashboard shows one period's transactions four ways: the chart
+(totals per day, month or year), spending per category, and the spent
+figures in the budget and income panels. Instead of asking the API for
+each of those separately, it loads the period's transactions once with
+load_transaction_frame() and works them all out from the frame. When
+those sections are served from the summary cache, LazyTransactionFrame
+skips the load altogether. Periods longer than MAX_FRAME_DAYS (or with
+no bounds at all) get no frame from period_frame(): loading them would
+pull years of rows in one request, so their sections ask the API for
+grouped totals instead.
+
+Amounts are kept as integer cents, so totals are exact. With NumPy
+installed the columns are NumPy arrays and the group-bys are vectorized;
+without it they're `array.array`s and the same methods loop in Python.
+Either way the results are identical.
+"""
+import threading
+from array import array
+from collections import defaultdict
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ..restapi import get_request
+from .money import Money
+
+UNCATEGORIZED = "Uncategorized"
+
+# Longest period, in days, that the dashboard loads into a frame. A month
+# of rows is small; a year or the whole history is not.
+MAX_FRAME_DAYS = 31
+
+# NumPy datetime64 unit per bucket; truncating a date to it gives the
+# first day of its bucket.
+BUCKET_UNITS = {"day": "D", "month": "M", "year": "Y"}
+
+
+def _iso_date(dt):
+    """Normalize a datetime or date into a plain YYYY-MM-DD string."""
+    return dt.date().isoformat() if hasattr(dt, "date") else dt.isoformat()
+
+
+def _as_date(dt):
+    return dt.date() if hasattr(dt, "date") else dt
+
+
+def _money(cents):
+    return Money(int(cents))
+
+
+class TransactionFetchError(Exception):
+    """A user's transactions couldn't be fetched from the API."""
+
+
+def _bucket_start(day, bucket):
+    if bucket == "month":
+        return day.replace(day=1)
+    if bucket == "year":
+        return day.replace(month=1, day=1)
+    return day
+
+
+class TransactionFrame:
+    """
+    Transactions as three parallel columns.
+
+    - `cents`: amount in integer cents
+    - `days`: the transaction date (datetime64[D] with NumPy, a date
+      ordinal without)
+    - `codes`: index of the transaction's category in `categories`, so
+      each category name is stored once
+
+    Build one with from_rows() or load_transaction_frame().
+    """
+
+    def __init__(self, cents, days, codes, categories):
+        self.cents = cents
+        self.days = days
+        self.codes = codes
+        self.categories = categories
+        self.vectorized = np is not None and isinstance(cents, np.ndarray)
+
+    def __len__(self):
+        return len(self.cents)
+
+    @classmethod
+    def from_rows(cls, rows, vectorized=None):
+        """
+        Build a frame from transaction rows as the Node API returns them.
+
+        Uses NumPy when it's installed, unless `vectorized` says otherwise.
+        A missing category counts as "Uncategorized".
+        """
+        if vectorized is None:
+            vectorized = np is not None
+
+        if vectorized:
+            amounts = np.array([row["amount"] or 0 for row in rows], dtype=np.float64)
+            days = np.array([row["date"][:10] for row in rows], dtype="datetime64[D]")
+            categories, codes = np.unique(
+                np.array([row.get("category") or UNCATEGORIZED for row in rows], dtype=object),
+                return_inverse=True,
+            )
+            return cls(
+                np.rint(amounts * 100).astype(np.int64),
+                days,
+                codes.astype(np.intp),
+                categories.tolist(),
+            )
+
+        cents, days, codes = array("q"), array("q"), array("q")
+        categories, code_of = [], {}
+        for row in rows:
+            cents.append(Money.parse(row["amount"]).cents)
+            days.append(date.fromisoformat(row["date"][:10]).toordinal())
+            category = row.get("category") or UNCATEGORIZED
+            code = code_of.get(category)
+            if code is None:
+                code = code_of[category] = len(categories)
+                categories.append(category)
+            codes.append(code)
+        return cls(cents, days, codes, categories)
+
+    def total(self, start=None, end=None):
+        """Sum of the amounts dated from `start` to `end` inclusive (either may be None)."""
+        start = _as_date(start) if start else None
+        end = _as_date(end) if end else None
+
+        if self.vectorized:
+            cents = self.cents
+            if start or end:
+                mask = np.ones(len(self), dtype=bool)
+                if start:
+                    mask &= self.days >= np.datetime64(start, "D")
+                if end:
+                    mask &= self.days <= np.datetime64(end, "D")
+                cents = cents[mask]
+            return _money(cents.sum())
+
+        if not (start or end):
+            return _money(sum(self.cents))
+        low = start.toordinal() if start else float("-inf")
+        high = end.toordinal() if end else float("inf")
+        return _money(sum(cents for day, cents in zip(self.days, self.cents) if low <= day <= high))
+
+    def totals_by(self, bucket):
+        """
+        Totals per "day", "month" or "year" as {"YYYY-MM-DD": Money}.
+
+        Each key is the first day of its bucket, e.g. "2025-03-01" for
+        March 2025 -- the same shape as the API's transactions/buckets.
+        """
+        unit = BUCKET_UNITS[bucket]
+
+        if self.vectorized:
+            keys, inverse = np.unique(self.days.astype(f"datetime64[{unit}]"), return_inverse=True)
+            sums = np.zeros(len(keys), dtype=np.int64)
+            np.add.at(sums, inverse, self.cents)
+            labels = keys.astype("datetime64[D]").astype(str).tolist()
+            return {label: _money(total) for label, total in zip(labels, sums.tolist())}
+
+        # Sum per day first, so dates are only built once per distinct day
+        by_day = defaultdict(int)
+        for day, cents in zip(self.days, self.cents):
+            by_day[day] += cents
+        totals = defaultdict(int)
+        for day, cents in by_day.items():
+            totals[_bucket_start(date.fromordinal(day), bucket).isoformat()] += cents
+        return {label: _money(totals[label]) for label in sorted(totals)}
+
+    def totals_by_category(self):
+        """Totals per category as {category: Money}."""
+        if self.vectorized:
+            sums = np.zeros(len(self.categories), dtype=np.int64)
+            np.add.at(sums, self.codes, self.cents)
+            sums = sums.tolist()
+        else:
+            sums = [0] * len(self.categories)
+            for code, cents in zip(self.codes, self.cents):
+                sums[code] += cents
+        return {category: _money(total) for category, total in zip(self.categories, sums)}
+
+
+def load_transaction_frame(user, start=None, end=None):
+    """
+    Load a user's transactions dated between `start` and `end` into a
+    frame, in one request. Without bounds, every transaction is loaded.
+    Raises TransactionFetchError if the request fails, rather than
+    passing off an empty frame as a user with no transactions.
+    """
+    params = {"user_id": user.id}
+    if start and end:
+        params["date__gte"] = _iso_date(start)
+        params["date__lte"] = _iso_date(end)
+    rows = get_request("transactions/", **params)
+    if rows is None:
+        raise TransactionFetchError(f"transactions of user {user.id} could not be fetched")
+    return TransactionFrame.from_rows(rows)
+
+
+def period_frame(user, start=None, end=None):
+    """
+    A LazyTransactionFrame of the user's transactions from `start` to
+    `end`, or None if the period is unbounded or longer than
+    MAX_FRAME_DAYS.
+    """
+    if not (start and end) or (_as_date(end) - _as_date(start)).days > MAX_FRAME_DAYS:
+        return None
+    return LazyTransactionFrame(user, start, end)
+
+
+class LazyTransactionFrame:
+    """
+    A TransactionFrame that's only loaded when something first uses it.
+
+    Safe to share between the dashboard's concurrent sections: the first
+    one to touch it loads it and the rest wait for that load.
+    """
+
+    def __init__(self, user, start=None, end=None):
+        self._args = (user, start, end)
+        self._frame = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._frame is not None
+
+    def _load(self):
+        with self._lock:
+            if self._frame is None:
+                self._frame = load_transaction_frame(*self._args)
+        return self._frame
+
+    def __len__(self):
+        return len(self._load())
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
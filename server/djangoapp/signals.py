@@ -0,0 +1,35 @@
+"""
+Keep the shared budget balance ledger in step with ORM writes.
+
+Writes made through the Node API update SharedBudgetBalance
+incrementally (services/balance_ledger.py), but ORM writes -- the admin,
+populate.py, shell sessions -- never reach that code. Saving or deleting
+an expense, split or settlement through the ORM therefore rebuilds its
+budget's ledger once the transaction commits. bulk_create() sends no
+signals, so SharedExpense.create_*_splits() queue the rebuild
+themselves.
+
+Connected in MoneyManagerAppConfig.ready().
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models.models import ExpenseSplit, Settlement, SharedBudgetBalance, SharedExpense
+
+
+@receiver([post_save, post_delete], sender=SharedExpense)
+@receiver([post_save, post_delete], sender=Settlement)
+def rebuild_budget_balances(sender, instance, **kwargs):
+    SharedBudgetBalance.rebuild_on_commit(instance.shared_budget_id)
+
+
+@receiver([post_save, post_delete], sender=ExpenseSplit)
+def rebuild_split_budget_balances(sender, instance, **kwargs):
+    budget_id = (
+        SharedExpense.objects.filter(pk=instance.shared_expense_id)
+        .values_list('shared_budget_id', flat=True)
+        .first()
+    )
+    # None: the expense is being deleted too, and its own signal rebuilds
+    if budget_id is not None:
+        SharedBudgetBalance.rebuild_on_commit(budget_id)
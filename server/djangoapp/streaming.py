@@ -0,0 +1,111 @@
+"""
+Streaming JSON for list endpoints whose size grows with a user's history.
+
+A JsonResponse holds every backend row, every converted dict and the
+whole encoded body in memory at once. StreamingJsonResponse instead
+pulls rows from the Node API one keyset page at a time (iter_rows), and
+each row is converted and encoded as it arrives, so a worker's memory
+stays flat however many transactions a user has. The client receives
+the same JSON document it would get from JsonResponse -- unless the API
+fails part way through, in which case it ends with "complete": false
+(see stream_json).
+
+The body is produced after the view has returned -- outside
+GatewayCacheMiddleware -- so reads made while streaming go straight to
+the API rather than filling the request cache.
+"""
+import logging
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from .restapi import MAX_PAGE_SIZE, page_request
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the API per request while streaming: as many as the
+# list route allows, less the extra row page_request asks for
+PAGE_SIZE = MAX_PAGE_SIZE - 1
+# Items encoded into one chunk of the response body
+CHUNK_ITEMS = 100
+
+_encoder = DjangoJSONEncoder()
+
+
+class PageFetchError(Exception):
+    """A page of a streamed list couldn't be fetched from the API."""
+
+
+def _fetch_page(endpoint, order, page_size, after, filters):
+    rows, next_after = page_request(endpoint, order, page_size, after=after, **filters)
+    if rows is None:
+        raise PageFetchError(f"{endpoint}: page after {after} could not be fetched")
+    return rows, next_after
+
+
+def _pages(rows, after, endpoint, order, page_size, filters):
+    yield from rows
+    while after is not None:
+        rows, after = _fetch_page(endpoint, order, page_size, after, filters)
+        yield from rows
+
+
+def iter_rows(endpoint, order, page_size=None, **filters):
+    """
+    Every row of a list endpoint, fetched lazily one page at a time.
+
+    `order` must end in a unique column (see restapi.page_request);
+    `page_size` defaults to PAGE_SIZE. The first page is fetched right
+    away, so if the API is down this raises PageFetchError while the view
+    can still answer with an error status. A later page failing raises
+    PageFetchError mid-stream, and stream_json() marks the document as
+    incomplete.
+    """
+    page_size = page_size or PAGE_SIZE
+    rows, after = _fetch_page(endpoint, order, page_size, None, filters)
+    return _pages(rows, after, endpoint, order, page_size, filters)
+
+
+def stream_json(items_key, items, tail=None):
+    """
+    Yield the JSON text of {items_key: [*items], **tail()} in chunks.
+
+    `items` is consumed lazily. `tail` is called only once the items are
+    exhausted, so it can report totals that were added up while they
+    streamed past.
+
+    By the time an item or the tail fails, the 200 status has been sent,
+    so the document is closed with "complete": false and an "error"
+    instead of the tail -- still valid JSON, but visibly partial.
+    """
+    yield "{" + _encoder.encode(items_key) + ": ["
+    separator = ""
+    chunk = []
+    try:
+        for item in items:
+            chunk.append(_encoder.encode(item))
+            if len(chunk) >= CHUNK_ITEMS:
+                yield separator + ", ".join(chunk)
+                separator, chunk = ", ", []
+        tail_items = tail() if tail else {}
+    except Exception:
+        logger.exception("Streaming %r failed part way through", items_key)
+        if chunk:
+            yield separator + ", ".join(chunk)
+        yield '], "complete": false, "error": "The list could not be fetched in full"}'
+        return
+
+    if chunk:
+        yield separator + ", ".join(chunk)
+    yield "]"
+    for key, value in tail_items.items():
+        yield ", " + _encoder.encode(key) + ": " + _encoder.encode(value)
+    yield "}"
+
+
+class StreamingJsonResponse(StreamingHttpResponse):
+    """A JSON object streamed from an iterable of items; see stream_json()."""
+
+    def __init__(self, items_key, items, tail=None, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(stream_json(items_key, items, tail), **kwargs)
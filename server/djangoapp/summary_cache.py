@@ -0,0 +1,114 @@
+"""
+Cross-request cache for the per-user dashboard summaries.
+
+The dashboard sections and the income summary are recomputed from the
+same handful of API totals on every load, although a user's data only
+changes when they (or the scheduler) write to it. Their results are kept
+in Django's cache (settings.CACHES: Redis when REDIS_URL is set, a
+process-local LocMemCache otherwise) under a key made of the user, the
+summary's arguments, today's date and the user's data version.
+
+Nothing is ever deleted: every create/update/delete of a transaction,
+income, subscription or budget calls bump_version(), which moves the
+user onto a new version so their old entries are never read again and
+simply expire. Unlike request_cache.py this lives across requests, so
+any view that writes one of those resources must bump the version.
+"""
+import functools
+import logging
+import os
+import time
+
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# How long a summary may be served for. Bumping the version is what keeps
+# it fresh; this only bounds how long an entry lingers (and, with
+# LocMemCache, how stale another worker's copy can get).
+SUMMARY_CACHE_TIMEOUT = int(os.getenv('SUMMARY_CACHE_TIMEOUT', default='300'))
+
+
+def _user_id(user):
+    return getattr(user, "id", user)
+
+
+def _version_key(user_id):
+    return f"summary:version:{user_id}"
+
+
+def _fresh_version():
+    # Not 1: if the version key is evicted while entries remain, starting
+    # over at a small number could bring those stale entries back.
+    return time.time_ns()
+
+
+def get_version(user):
+    """The user's current data version."""
+    key = _version_key(_user_id(user))
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _fresh_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(user):
+    """Invalidate every cached summary of `user` (a User or a user id)."""
+    key = _version_key(_user_id(user))
+    try:
+        cache.incr(key)
+    except ValueError:
+        # No version yet, so nothing was cached under one either
+        cache.add(key, _fresh_version(), timeout=None)
+
+
+def summary_key(name, user, *parts):
+    """
+    Cache key for summary `name` of `user`. Today's date is part of it,
+    since periods like "weekly" are relative to today.
+    """
+    user_id = _user_id(user)
+    return ":".join((
+        "summary", name, str(user_id), str(get_version(user_id)),
+        timezone.localdate().isoformat(), *map(str, parts),
+    ))
+
+
+def get_or_compute(name, user, compute, *parts):
+    """
+    The cached value of summary `name` for `user` and `parts`, or
+    compute() stored for next time. None results aren't cached, nor is
+    anything when compute() raises -- so a compute() built on API reads
+    must raise (see restapi.require()) or return None when one fails,
+    never fall back to zeros that would then be served as real data.
+    """
+    key = summary_key(name, user, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        if value is not None:
+            cache.set(key, value, SUMMARY_CACHE_TIMEOUT)
+    else:
+        logger.debug("Summary cache hit for %s", key)
+    return value
+
+
+def cached_summary(name):
+    """
+    Cache a `func(user, period, ...)` per user and period.
+
+    Any further arguments (like the dashboard's shared TransactionFrame)
+    only change how a miss is computed, not the result, so they're left
+    out of the key. The undecorated function is kept as `.uncached`.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(user, period, *args, **kwargs):
+            return get_or_compute(
+                name, user, lambda: func(user, period, *args, **kwargs), period
+            )
+        wrapper.uncached = func
+        return wrapper
+    return decorator
@@ -0,0 +1,126 @@
+"""
+Tests for the slotted row adapters in services/api_adapters.py.
+"""
+import random
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from djangoapp.services.api_adapters import (
+    _parse_date,
+    _parse_decimal,
+    friendship_from_row,
+    subscription_from_row,
+    transaction_from_row,
+)
+
+
+def namespace_transaction_from_row(row):
+    """The old adapter: a SimpleNamespace, with a __dict__ per row."""
+    return SimpleNamespace(
+        id=row["id"],
+        user_id=row["user_id"],
+        amount=_parse_decimal(row["amount"]),
+        description=row["description"],
+        category=row.get("category"),
+        date=_parse_date(row["date"]),
+    )
+
+
+def sample_transaction_rows(count, seed=0):
+    """`count` transaction rows shaped like the Node API's, spread over five years."""
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    categories = ("Food", "Rent", "Transport", "Entertainment", "Utilities")
+    return [
+        {
+            "id": i,
+            "user_id": 1,
+            "amount": f"{rng.randint(100, 50000) / 100:.2f}",
+            "description": f"Transaction {i}",
+            "category": rng.choice(categories),
+            "date": (start + timedelta(days=rng.randint(0, 5 * 365))).isoformat(),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def adapted_size(adapter, rows):
+    """Bytes held by the adapted objects (and what they created) for `rows`."""
+    tracemalloc.start()
+    try:
+        adapted = list(map(adapter, rows))
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del adapted
+    return size
+
+
+def subscription_row(**overrides):
+    row = {
+        "id": 1, "user_id": 1, "name": "Netflix", "amount": "15.99", "category": "Entertainment",
+        "billing_cycle": "monthly", "billing_day": 5, "start_date": "2025-01-05",
+        "status": "active", "description": "", "created_at": "2025-01-05",
+    }
+    row.update(overrides)
+    return row
+
+
+class RowAdapterTests(SimpleTestCase):
+    def test_fields_match_the_namespace_adapter(self):
+        for row in sample_transaction_rows(50):
+            adapted = transaction_from_row(row)
+            self.assertEqual(
+                {name: getattr(adapted, name) for name in adapted._fields},
+                vars(namespace_transaction_from_row(row)),
+            )
+
+    def test_no_instance_dict(self):
+        transaction = transaction_from_row(sample_transaction_rows(1)[0])
+        self.assertFalse(hasattr(transaction, "__dict__"))
+        with self.assertRaises(AttributeError):
+            transaction.spent = Decimal("1")
+
+    def test_optional_keys(self):
+        transaction = transaction_from_row({
+            "id": 1, "user_id": 1, "amount": None, "description": "", "date": "2025-01-01",
+        })
+        self.assertIsNone(transaction.category)
+        self.assertEqual(transaction.amount, Decimal("0"))
+        self.assertIsNone(subscription_from_row(subscription_row()).end_date)
+
+    def test_equality_and_repr(self):
+        row = sample_transaction_rows(1)[0]
+        self.assertEqual(transaction_from_row(row), transaction_from_row(dict(row)))
+        self.assertNotEqual(transaction_from_row(row), transaction_from_row(dict(row, amount="0.01")))
+        self.assertIn("amount=Money(", repr(transaction_from_row(row)))
+
+    def test_timestamps_are_parsed_when_read(self):
+        row = subscription_row()
+        subscription = subscription_from_row(row)
+        row["created_at"] = "2025-02-01"
+        self.assertEqual(subscription.created_at, date(2025, 2, 1))
+
+        # Parsed once, then cached
+        row["created_at"] = "2025-03-01"
+        self.assertEqual(subscription.created_at, date(2025, 2, 1))
+        self.assertIsNone(subscription.updated_at)
+
+    def test_unparseable_timestamp_only_fails_when_read(self):
+        friendship = friendship_from_row({
+            "id": 1, "sender": 1, "receiver": 2, "status": "pending", "created_at": "not a date",
+        })
+        self.assertEqual(friendship.status, "pending")
+        with self.assertRaises(ValueError):
+            friendship.created_at
+
+    def test_smaller_than_namespaces(self):
+        rows = sample_transaction_rows(2000)
+        self.assertLess(
+            adapted_size(transaction_from_row, rows),
+            adapted_size(namespace_transaction_from_row, rows) * 0.75,
+        )
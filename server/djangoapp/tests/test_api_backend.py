@@ -10,7 +10,7 @@ Usage in a test's setUp():
     
     self.test_api = TestApiBackend()
     for verb in ("ger", "post", "patch", "delete"):
-        patcher = patch(f"djangoapp.restapi.requests.{verb}",
+        patcher = patch(f"djangoapp.restapi.requests.Session.{verb}",
                         side_effect=getattr(self.test_api, verb))
         patcher.start()
         self.addCleanup(patcher.stop)
@@ -24,9 +24,15 @@ ISO strings, decimal fields as strings or numbers -- sine that's what the
 adapters in djangoapp/services/api_adapters.py expect to parse.
 """
 from collections import defaultdict
+from decimal import Decimal
 
 import requests
 
+from djangoapp.services.category_keys import category_key
+
+# The list route's cap on ?limit (MAX_PAGE_SIZE in routes/crud.js)
+MAX_PAGE_SIZE = 500
+
 
 class TestResponse:
     """Mimics just enough of requests.Response for restapi.py's usage."""
@@ -50,7 +56,7 @@ class TestApiBackend:
 
     # ---- test setup helpers ----
     def seed(self, resource, row):
-        row = dict(row)
+        row = self._with_category_key(dict(row))
         if row.get("id") is None:
             row["id"] = self._next_id[resource]
         self._next_id[resource] = max(self._next_id[resource], row["id"] + 1)
@@ -58,6 +64,12 @@ class TestApiBackend:
         return row
 
     # ---- internal helpers ----
+    def _with_category_key(self, row):
+        # database/models/categoryKey.js fills category_key on every write
+        if "category" in row:
+            row["category_key"] = category_key(row["category"])
+        return row
+
 
     def _parse_path(self, url):
         # Everything after "/api/" is "<resource>" or "<resource>/<id>",
@@ -75,6 +87,138 @@ class TestApiBackend:
                 item_id = None
         return resource, item_id
 
+    def _action(self, url):
+        # "<resource>/buckets" and friends: a named route on the resource
+        # rather than a row id.
+        path = url.split("/api/", 1)[1] if "/api/" in url else url
+        parts = path.strip("/").split("/")
+        return parts[1] if len(parts) > 1 and not parts[1].isdigit() else None
+
+    # Same (date column, summed column) pairs routes/index.js configures.
+    BUCKET_COLUMNS = {"transactions": ("date", "amount")}
+    BUCKET_KEYS = {
+        "day": lambda d: d[:10],
+        "month": lambda d: d[:7] + "-01",
+        "year": lambda d: d[:4] + "-01-01",
+    }
+
+    def _buckets(self, resource, params):
+        params = dict(params or {})
+        bucket_key = self.BUCKET_KEYS.get(params.pop("bucket", "day"))
+        if bucket_key is None or resource not in self.BUCKET_COLUMNS:
+            return TestResponse({"error": "bad request"}, 400)
+        date_field, sum_field = self.BUCKET_COLUMNS[resource]
+        groups = defaultdict(lambda: {"total": Decimal("0"), "count": 0})
+        for row in self.resources[resource]:
+            if self._matches(row, params):
+                group = groups[bucket_key(str(row[date_field]))]
+                group["total"] += Decimal(str(row[sum_field]))
+                group["count"] += 1
+        return TestResponse([
+            {"bucket": key, "total": str(group["total"]), "count": group["count"]}
+            for key, group in sorted(groups.items())
+        ], 200)
+
+    AGGREGATES = {
+        "sum": lambda values: str(sum((Decimal(str(v)) for v in values), Decimal("0"))) if values else None,
+        "min": lambda values: min(values) if values else None,
+        "max": lambda values: max(values) if values else None,
+    }
+
+    def _aggregate(self, resource, params):
+        params = dict(params or {})
+        group_by = [c for c in params.pop("group_by", "").split(",") if c]
+        count = params.pop("count", None)
+        wanted = [
+            (name, column)
+            for name in self.AGGREGATES
+            for column in params.pop(name, "").split(",") if column
+        ]
+
+        groups = defaultdict(list)
+        for row in self.resources[resource]:
+            if self._matches(row, params):
+                groups[tuple(row.get(c) for c in group_by)].append(row)
+        if not group_by and not groups:
+            groups[()] = []
+
+        results = []
+        for key, rows in groups.items():
+            result = dict(zip(group_by, key))
+            for name, column in wanted:
+                values = [r[column] for r in rows if r.get(column) is not None]
+                result[f"{column}__{name}"] = self.AGGREGATES[name](values)
+            if count:
+                result["count"] = len(rows)
+            results.append(result)
+        return TestResponse(results if group_by else results[0], 200)
+
+    LEDGER_COLUMNS = ("total_paid", "total_owed", "settlements_in", "settlements_out")
+
+    def _adjust(self, resource, body):
+        # routes/balances.js: add each member's deltas to their ledger row,
+        # creating it on first use, and answer with the budget's rows.
+        budget_id = body["shared_budget_id"]
+        rows = self.resources[resource]
+        for adjustment in body.get("adjustments", []):
+            row = next((r for r in rows
+                        if r["shared_budget_id"] == budget_id and r["user_id"] == adjustment["user_id"]), None)
+            if row is None:
+                row = self.seed(resource, {
+                    "shared_budget_id": budget_id, "user_id": adjustment["user_id"],
+                    **dict.fromkeys(self.LEDGER_COLUMNS, "0.00"),
+                })
+            for column in self.LEDGER_COLUMNS:
+                if adjustment.get(column):
+                    row[column] = str(Decimal(str(row[column])) + Decimal(str(adjustment[column])))
+        return TestResponse([r for r in rows if r["shared_budget_id"] == budget_id], 200)
+
+    def _rollover(self, resource, body):
+        # routes/budgets.js: retire budgets that are still active and still
+        # end where the caller thinks they do, and create their successors.
+        rows = self.resources[resource]
+        deactivated, created = [], []
+        for rollover in body.get("rollovers", []):
+            row = next((r for r in rows if r["id"] == rollover["id"]), None)
+            if not row or not row["is_active"] or str(row["period_end"]) != str(rollover["period_end"]):
+                continue
+            rows[rows.index(row)] = {**row, "is_active": False}
+            deactivated.append(row["id"])
+            if rollover.get("successor"):
+                created.append(self.seed(resource, rollover["successor"]))
+        return TestResponse({"deactivated": deactivated, "created": created}, 200)
+
+    def _sort_key(self, value):
+        # Numbers compare as numbers, everything else (ISO dates) as text
+        try:
+            return (0, float(value), "")
+        except (TypeError, ValueError):
+            return (1, 0.0, str(value))
+
+    def _list(self, resource, params):
+        # routes/crud.js list route, including ?order/&limit/&after keyset paging
+        order = [term for term in str(params.pop("order", "")).split(",") if term]
+        limit = params.pop("limit", None)
+        after = params.pop("after", None)
+        rows = [r for r in self.resources[resource] if self._matches(r, params)]
+
+        columns = [(term.lstrip("-"), term.startswith("-")) for term in order]
+        for column, descending in reversed(columns):
+            rows.sort(key=lambda r: self._sort_key(r.get(column)), reverse=descending)
+        if after is not None:
+            cursor = [self._sort_key(value) for value in str(after).split(",")]
+
+            def is_after(row):
+                for (column, descending), bound in zip(columns, cursor):
+                    value = self._sort_key(row.get(column))
+                    if value != bound:
+                        return value < bound if descending else value > bound
+                return False
+            rows = [r for r in rows if is_after(r)]
+        if limit is not None:
+            rows = rows[:min(int(limit), MAX_PAGE_SIZE)]
+        return TestResponse(rows, 200)
+
     def _compare(self, row_value, op, value):
         if op == "in":
             return str(row_value) in value.split(",")
@@ -82,7 +226,11 @@ class TestApiBackend:
             return str(value).lower() in str(row_value).lower()
         if op == "ne":
             return str(row_value) != str(value)
+        if op == "gte_or_null":
+            return row_value is None or self._compare(row_value, "gte", value)
         if op in ("gte", "lte", "gt", "lt"):
+            if row_value is None:
+                return False # like SQL, NULL compares as neither
             try:
                 a, b = float(row_value), float(value)
             except (TypeError, ValueError):
@@ -101,14 +249,23 @@ class TestApiBackend:
 
     def get(self, url, params=None, headers=None, timeout=None, **kwargs):
         resource, item_id = self._parse_path(url)
+        if self._action(url) == "buckets":
+            return self._buckets(resource, params)
+        if self._action(url) == "aggregate":
+            return self._aggregate(resource, params)
         if item_id is not None:
             row = next((r for r in self.resources[resource] if r["id"] == item_id), None)
             return TestResponse(row, 200 if row else 404)
-        rows = [r for r in self.resources[resource] if self._matches(r, params or {})]
-        return TestResponse(rows, 200)
+        return self._list(resource, dict(params or {}))
 
     def post(self, url, json=None, headers=None, timeout=None, **kwargs):
         resource, item_id = self._parse_path(url)
+        if self._action(url) == "adjust":
+            return self._adjust(resource, json or {})
+        if self._action(url) == "bulk":
+            return TestResponse([self.seed(resource, row) for row in json or []], 201)
+        if self._action(url) == "rollover":
+            return self._rollover(resource, json or {})
         row = self.seed(resource, json or {})
         return TestResponse(row, 201)
 
@@ -117,8 +274,12 @@ class TestApiBackend:
         row = next((r for r in self.resources[resource] if r["id"] == item_id), None)
         if not row:
             return TestResponse({"error": "not found"}, 404)
-        row.update(json or {})
-        return TestResponse(row, 200)
+        # Replace rather than mutate, so rows handed out earlier keep their
+        # old values -- just like JSON that came over the wire.
+        updated = self._with_category_key({**row, **(json or {})})
+        rows = self.resources[resource]
+        rows[rows.index(row)] = updated
+        return TestResponse(updated, 200)
 
     def delete(self, url, headers=None, timeout=None, **kwargs):
         resource, item_id = self._parse_path(url)
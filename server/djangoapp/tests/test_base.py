@@ -1,3 +1,6 @@
+import json
+
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -11,6 +14,9 @@ from djangoapp.models.friendship import FriendshipNotification, Friendship
 
 class BaseTestCase(TestCase):
     def setUp(self):
+        # Cached summaries would otherwise leak between tests that reuse user ids
+        cache.clear()
+
         # Create test users
         self.user1 = User.objects.create_user(username='user1', password='password1')
         self.user2 = User.objects.create_user(username='user2', password='password2')
@@ -18,6 +24,12 @@ class BaseTestCase(TestCase):
 
         self.today = timezone.now().date()
 
+    def response_json(self, response):
+        """The decoded JSON body of `response`, whether it was streamed or not."""
+        if response.streaming:
+            return json.loads(b"".join(response.streaming_content))
+        return response.json()
+
     def create_transaction(self):
         """Helper to create a Transacion with default values."""
         
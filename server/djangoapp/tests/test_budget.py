@@ -1,4 +1,5 @@
 import json
+from datetime import date
 from decimal import Decimal
 from unittest.mock import patch
 
@@ -6,6 +7,13 @@ from django.urls import reverse
 from django.utils import timezone
 
 from djangoapp.models.models import Budget
+from djangoapp.restapi import post_request
+from djangoapp.services.api_adapters import budget_from_row
+from djangoapp.services.budgets_service import (
+    compute_budget_spent,
+    compute_budgets_spent,
+    reset_expired_budgets,
+)
 
 from .test_base import BaseTestCase
 from .test_api_backend import TestApiBackend
@@ -32,6 +40,16 @@ class BudgetModelTests(BaseTestCase):
                     period_end=self.today + timezone.timedelta(days=10)
                 )
 
+    def test_same_category_next_period_allowed(self):
+        self.create_budget()
+        successor = Budget.objects.create(
+            user=self.user1, category='Entertainment', amount=Decimal('1000'),
+            period_start=self.today + timezone.timedelta(days=31),
+            period_end=self.today + timezone.timedelta(days=61)
+        )
+        self.assertEqual(Budget.objects.filter(user=self.user1, category='Entertainment').count(), 2)
+        self.assertEqual(successor.category, 'Entertainment')
+
     def test_same_category_different_users_allowed(self):
         self.create_budget()
         budget2 = Budget.objects.create(
@@ -86,7 +104,7 @@ class BudgetAPITests(BaseTestCase):
         self.test_api = TestApiBackend()
         for verb in ("get", "post", "patch", "delete"):
             patcher = patch(
-                f"djangoapp.restapi.requests.{verb}",
+                f"djangoapp.restapi.requests.Session.{verb}",
                 side_effect=getattr(self.test_api, verb),
             )
             patcher.start()
@@ -159,6 +177,20 @@ class BudgetAPITests(BaseTestCase):
             any(b['category'] == 'Food' and b['user_id'] == self.user1.id for b in created)
         )
 
+    def test_budget_create_endpoint_rejects_active_duplicate(self):
+        self._seed_budget(category='Food')
+        payload = {
+            'category': 'Food',
+            'amount': 300,
+            'period_start': self.today.isoformat(),
+            'period_end': (self.today + timezone.timedelta(days=30)).isoformat(),
+        }
+        response = self.client.post(
+            reverse('djangoapp:budget_create'), data=json.dumps(payload), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(self.test_api.resources['budgets']), 1)
+
     def test_budget_create_endpoint_missing_field(self):
         payload = {'category': 'Food'}
         response = self.client.post(
@@ -203,3 +235,157 @@ class BudgetAPITests(BaseTestCase):
     def test_budget_delete_endpoint_not_found(self):
         response = self.client.delete(reverse('djangoapp:budget_delete', kwargs={'budget_id': 9999}))
         self.assertEqual(response.status_code, 404)
+
+
+class BudgetRolloverTests(BaseTestCase):
+    """reset_expired_budgets() against the fake API's budgets/rollover route."""
+
+    def setUp(self):
+        super().setUp()
+        self.test_api = TestApiBackend()
+        self.mocks = {}
+        for verb in ("get", "post", "patch", "delete"):
+            patcher = patch(
+                f"djangoapp.restapi.requests.Session.{verb}",
+                side_effect=getattr(self.test_api, verb),
+            )
+            self.mocks[verb] = patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _seed_budget(self, period_start, period_end, **overrides):
+        row = {
+            "user_id": self.user1.id,
+            "category": "Food",
+            "amount": "50.00",
+            "period_start": period_start.isoformat(),
+            "period_end": period_end.isoformat(),
+            "recurrence": "monthly",
+            "is_active": True,
+            "is_recurring": True,
+            "is_shared": False,
+        }
+        row.update(overrides)
+        return self.test_api.seed("budgets", row)
+
+    def _active(self):
+        return [r for r in self.test_api.resources["budgets"] if r["is_active"]]
+
+    def test_stale_daily_budget_catches_up_in_one_call(self):
+        today = date(2025, 6, 15)
+        self._seed_budget(date(2024, 6, 1), date(2024, 6, 1), recurrence="daily")
+
+        created = reset_expired_budgets(self.user1, today=today)
+
+        self.assertEqual(len(created), 1)
+        self.assertEqual(created[0].period_start, today)
+        self.assertEqual(created[0].period_end, today)
+        self.assertEqual(self.mocks["post"].call_count, 1)
+        self.mocks["patch"].assert_not_called()
+
+    def test_monthly_chain_lands_on_current_period(self):
+        self._seed_budget(date(2025, 1, 1), date(2025, 1, 31))
+
+        created = reset_expired_budgets(self.user1, today=date(2025, 4, 10))
+
+        self.assertEqual((created[0].period_start, created[0].period_end), (date(2025, 4, 1), date(2025, 4, 30)))
+
+    def test_many_budgets_are_one_write(self):
+        for category in ("Food", "Rent", "Travel"):
+            self._seed_budget(date(2025, 1, 1), date(2025, 1, 31), category=category)
+        self._seed_budget(date(2025, 1, 1), date(2025, 1, 31), category="Gifts", is_recurring=False)
+
+        created = reset_expired_budgets(self.user1, today=date(2025, 2, 1))
+
+        self.assertEqual(sorted(b.category for b in created), ["Food", "Rent", "Travel"])
+        self.assertEqual(self.mocks["post"].call_count, 1)
+        self.assertEqual(len(self._active()), 3)
+
+    def test_budget_ending_today_is_not_expired(self):
+        self._seed_budget(date(2025, 1, 1), date(2025, 1, 31))
+        self.assertEqual(reset_expired_budgets(self.user1, today=date(2025, 1, 31)), [])
+        self.mocks["post"].assert_not_called()
+
+    def test_running_twice_creates_one_successor(self):
+        self._seed_budget(date(2025, 1, 1), date(2025, 1, 31))
+
+        reset_expired_budgets(self.user1, today=date(2025, 2, 1))
+        self.assertEqual(reset_expired_budgets(self.user1, today=date(2025, 2, 1)), [])
+        self.assertEqual(len(self._active()), 1)
+
+    def test_stale_rollover_is_skipped(self):
+        # Another worker rolled the budget over between our read and write:
+        # its period_end no longer matches, so nothing is created.
+        budget = self._seed_budget(date(2025, 1, 1), date(2025, 1, 31))
+        result = post_request("budgets/rollover", {"rollovers": [{
+            "id": budget["id"], "period_end": "2024-12-31", "successor": {"category": "Food"},
+        }]})
+        self.assertEqual(result, {"deactivated": [], "created": []})
+        self.assertEqual(len(self.test_api.resources["budgets"]), 1)
+
+
+class BatchBudgetSpendTests(BaseTestCase):
+    """compute_budgets_spent() must agree with compute_budget_spent(), in two reads."""
+
+    def setUp(self):
+        super().setUp()
+        self.test_api = TestApiBackend()
+        patcher = patch("djangoapp.restapi.requests.Session.get", side_effect=self.test_api.get)
+        self.mock_get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.budgets = []
+        for category, start, end in (
+            ("Food", date(2025, 1, 1), date(2025, 1, 31)),
+            ("Food", date(2025, 2, 1), date(2025, 2, 28)),
+            ("Rent", date(2025, 1, 15), date(2025, 2, 14)),
+            ("Travel", date(2025, 3, 1), date(2025, 3, 31)),
+        ):
+            self.budgets.append(budget_from_row(self.test_api.seed("budgets", {
+                "user_id": self.user1.id, "category": category, "amount": "100.00",
+                "period_start": start.isoformat(), "period_end": end.isoformat(),
+                "recurrence": "monthly", "is_active": True, "is_recurring": True, "is_shared": False,
+            })))
+
+        user1, user2 = self.user1.id, self.user2.id
+        for user_id, category, day, amount in (
+            (user1, "Food", date(2024, 12, 31), "99.00"),  # before every window
+            (user1, "Food", date(2025, 1, 1), "10.00"),    # first day of a window
+            (user1, "Food", date(2025, 1, 31), "2.50"),    # last day of a window
+            (user1, "Food", date(2025, 2, 10), "7.25"),
+            (user1, "Rent", date(2025, 2, 1), "500.00"),
+            (user1, "Rent", date(2025, 2, 15), "1.00"),    # the day after Rent's window
+            (user1, "Gifts", date(2025, 1, 20), "30.00"),  # no budget for this category
+            (user2, "Food", date(2025, 1, 20), "4.00"),    # someone else's
+        ):
+            self.test_api.seed("transactions", {
+                "user_id": user_id, "category": category, "date": day.isoformat(),
+                "amount": amount, "description": category,
+            })
+
+    def test_matches_per_budget_computation(self):
+        spent = compute_budgets_spent(self.user1, self.budgets)
+        for budget in self.budgets:
+            self.assertEqual(spent[budget.id], compute_budget_spent(budget))
+
+    def test_window_boundaries_are_inclusive(self):
+        spent = compute_budgets_spent(self.user1, self.budgets)
+        self.assertEqual(spent[self.budgets[0].id]["transactions"], 12.5)
+        self.assertEqual(spent[self.budgets[2].id]["transactions"], 500.0)
+        self.assertEqual(spent[self.budgets[3].id]["transactions"], 0.0)
+
+    def test_two_reads_for_any_number_of_budgets(self):
+        compute_budgets_spent(self.user1, self.budgets)
+        self.assertEqual(self.mock_get.call_count, 2)
+
+    def test_categories_match_case_insensitively(self):
+        self.test_api.seed("transactions", {
+            "user_id": self.user1.id, "category": "food ", "date": "2025-01-10",
+            "amount": "1.00", "description": "lowercase",
+        })
+        spent = compute_budgets_spent(self.user1, self.budgets)
+        self.assertEqual(spent[self.budgets[0].id]["transactions"], 13.5)
+        self.assertEqual(spent[self.budgets[0].id], compute_budget_spent(self.budgets[0]))
+
+    def test_no_budgets_makes_no_requests(self):
+        self.assertEqual(compute_budgets_spent(self.user1, []), {})
+        self.mock_get.assert_not_called()
@@ -0,0 +1,208 @@
+"""
+Tests for the dashboard API endpoint.
+"""
+
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.utils import timezone
+
+from djangoapp.views.dashboard_views import (
+    compute_spending_by_category,
+    get_active_subscriptions,
+    get_transactions_chart_data,
+)
+
+from .test_base import BaseTestCase
+from .test_api_backend import TestApiBackend, TestResponse
+
+
+class DashboardAPITests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user1)
+        # Set up mock API backend
+        self.test_api = TestApiBackend()
+        self.get_patcher = patch('djangoapp.restapi.requests.Session.get', side_effect=self.test_api.get)
+        # The dashboard only reads; any POST would show up on this mock.
+        self.post_patcher = patch(
+            'djangoapp.restapi.requests.Session.post',
+            return_value=TestResponse({"generated": 0}, 200),
+        )
+        self.mock_get = self.get_patcher.start()
+        self.mock_post = self.post_patcher.start()
+
+    def tearDown(self):
+        self.get_patcher.stop()
+        self.post_patcher.stop()
+        super().tearDown()
+
+    def test_dashboard_has_no_write_side_effects(self):
+        response = self.client.get(reverse('djangoapp:dashboard'), {"period": "monthly"})
+        self.assertEqual(response.status_code, 200)
+        # Payment generation now happens in the background scheduler
+        self.mock_post.assert_not_called()
+
+    def test_dashboard_requires_auth(self):
+        self.client.logout()
+        response = self.client.get(reverse('djangoapp:dashboard'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_dashboard_assembles_every_section(self):
+        self.test_api.seed("transactions", {
+            "user_id": self.user1.id,
+            "amount": "25.00",
+            "category": "Food",
+            "date": self.today.isoformat(),
+        })
+        self.test_api.seed("budgets", {
+            "user_id": self.user1.id,
+            "amount": "100.00",
+            "category": "Food",
+            "period_start": self.today.replace(day=1).isoformat(),
+        })
+
+        response = self.client.get(reverse('djangoapp:dashboard'), {"period": "monthly"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["dashboard"]
+
+        self.assertEqual(data["categories"]["total"], 25.0)
+        self.assertEqual(data["budgets"]["total_budgeted"], 100.0)
+        self.assertEqual(data["budgets"]["total_spent"], 25.0)
+        self.assertEqual(data["income"]["total_spent"], 25.0)
+        self.assertEqual(data["subscriptions"], [])
+        self.assertEqual(sum(day["total"] for day in data["transactions"]), 25.0)
+        self.assertEqual(data["period"]["value"], "monthly")
+
+    def test_active_subscriptions_include_open_ended_ones(self):
+        for name, end_date in (
+            ("Open-ended", None),
+            ("Ends later", self.today + timezone.timedelta(days=30)),
+            ("Ended long ago", self.today - timezone.timedelta(days=400)),
+        ):
+            self.test_api.seed("subscriptions", {
+                "user_id": self.user1.id, "name": name, "amount": "10.00", "status": "active",
+                "start_date": (self.today - timezone.timedelta(days=500)).isoformat(),
+                "end_date": end_date.isoformat() if end_date else None,
+            })
+
+        subscriptions = get_active_subscriptions.uncached(self.user1, "monthly")
+        self.assertEqual({row["name"] for row in subscriptions}, {"Open-ended", "Ends later"})
+
+    def test_failing_section_returns_500(self):
+        with patch(
+            'djangoapp.views.dashboard_views.get_budgets_data',
+            side_effect=RuntimeError("backend down"),
+        ):
+            response = self.client.get(reverse('djangoapp:dashboard'))
+        self.assertEqual(response.status_code, 500)
+
+
+class TransactionsChartDataTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.test_api = TestApiBackend()
+        self.get_patcher = patch('djangoapp.restapi.requests.Session.get', side_effect=self.test_api.get)
+        self.mock_get = self.get_patcher.start()
+        self.addCleanup(self.get_patcher.stop)
+
+        for days_ago, amount in ((0, "10.00"), (0, "5.50"), (2, "20.00"), (800, "99.00")):
+            self.test_api.seed("transactions", {
+                "user_id": self.user1.id,
+                "amount": amount,
+                "category": "Food",
+                "date": (self.today - timezone.timedelta(days=days_ago)).isoformat(),
+            })
+        self.test_api.seed("transactions", {
+            "user_id": self.user2.id,
+            "amount": "1000.00",
+            "category": "Food",
+            "date": self.today.isoformat(),
+        })
+
+    def test_bounds_and_bucket_are_sent_to_the_backend(self):
+        get_transactions_chart_data(self.user1, "weekly")
+
+        self.mock_get.assert_called_once()
+        url = self.mock_get.call_args.args[0]
+        params = self.mock_get.call_args.kwargs["params"]
+        self.assertTrue(url.endswith("transactions/buckets"))
+        self.assertEqual(params["bucket"], "day")
+        self.assertIn("date__gte", params)
+        self.assertIn("date__lte", params)
+
+    def test_daily(self):
+        data = get_transactions_chart_data(self.user1, "daily")
+        self.assertEqual(data, [{"label": "Today", "date": self.today.isoformat(), "total": 15.5}])
+
+    def test_weekly_fills_empty_days(self):
+        data = get_transactions_chart_data(self.user1, "weekly")
+        self.assertEqual(len(data), 7)
+        self.assertEqual(data[-1]["total"], 15.5)
+        self.assertEqual(data[-3]["total"], 20.0)
+        self.assertEqual(sum(day["total"] for day in data), 35.5)
+
+    def test_yearly_is_grouped_by_month(self):
+        data = get_transactions_chart_data(self.user1, "yearly")
+        self.assertEqual(len(data), 12)
+        self.assertEqual(data[-1]["date"], self.today.replace(day=1).isoformat())
+        self.assertEqual(sum(month["total"] for month in data), 35.5)
+
+    def test_total_is_grouped_by_year(self):
+        data = get_transactions_chart_data(self.user1, "total")
+        self.assertEqual(sum(year["total"] for year in data), 134.5)
+        self.assertEqual(data[0]["label"], str(self.today.year))
+        self.assertIsNone(self.mock_get.call_args.kwargs["params"].get("date__gte"))
+
+
+class SpendingByCategoryTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.test_api = TestApiBackend()
+        self.get_patcher = patch('djangoapp.restapi.requests.Session.get', side_effect=self.test_api.get)
+        self.mock_get = self.get_patcher.start()
+        self.addCleanup(self.get_patcher.stop)
+
+    def _seed_subscription(self, category, amount, payments, user=None):
+        subscription = self.test_api.seed("subscriptions", {
+            "user_id": (user or self.user1).id,
+            "name": f"{category} plan",
+            "amount": amount,
+            "category": category,
+        })
+        for days_ago in range(payments):
+            self.test_api.seed("subscription-payments", {
+                "subscription_id": subscription["id"],
+                "amount": amount,
+                "due_date": (self.today - timezone.timedelta(days=days_ago)).isoformat(),
+            })
+        return subscription
+
+    def test_payments_are_categorized_without_per_payment_lookups(self):
+        self._seed_subscription("Streaming", "10.00", payments=12)
+        self._seed_subscription("Fitness", "30.00", payments=12)
+        self._seed_subscription("Streaming", "5.00", payments=12)
+        self._seed_subscription("Other", "99.00", payments=3, user=self.user2)
+        self.test_api.seed("transactions", {
+            "user_id": self.user1.id,
+            "amount": "40.00",
+            "category": "Streaming",
+            "date": self.today.isoformat(),
+        })
+
+        data = compute_spending_by_category(self.user1, "total")
+
+        self.assertEqual(self.mock_get.call_count, 3)
+        by_category = {c["category"]: c for c in data["categories"]}
+        self.assertEqual(set(by_category), {"Streaming", "Fitness"})
+        self.assertEqual(by_category["Streaming"]["subscriptions"], 180.0)
+        self.assertEqual(by_category["Streaming"]["transactions"], 40.0)
+        self.assertEqual(by_category["Fitness"]["total"], 360.0)
+        self.assertEqual(data["total"], 580.0)
+
+    def test_payments_outside_the_period_are_ignored(self):
+        self._seed_subscription("Streaming", "10.00", payments=40)
+
+        data = compute_spending_by_category(self.user1, "weekly")
+
+        self.assertEqual(data["subscription_total"], 80.0)
@@ -0,0 +1,321 @@
+"""
+Tests for the shared-budget balance engine in djangoapp/services/debts.py,
+the maintained balance ledger (services/balance_ledger.py and the
+SharedBudgetBalance model) and the views that read them
+(get_budget_debts_data, get_budget_members).
+"""
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from djangoapp.models.models import (
+    ExpenseSplit,
+    Settlement,
+    SharedBudgetBalance,
+    SharedBudgetMember,
+    SharedExpense,
+)
+from djangoapp.services import balance_ledger
+from djangoapp.services.debts import compute_balances, fetch_budget_ledger, simplify_debts
+from djangoapp.views.shared_budget_views import get_budget_debts_data, get_budget_members
+
+from .test_base import BaseTestCase
+from .test_api_backend import TestApiBackend
+
+
+def ledger(expenses=(), splits=(), settlements=()):
+    return SimpleNamespace(expenses=list(expenses), splits=list(splits), settlements=list(settlements))
+
+
+def expense(expense_id, paid_by, amount):
+    return {"id": expense_id, "paid_by": paid_by, "amount": amount}
+
+
+def split(expense_id, user_id, amount_owed, is_settled=False):
+    return {"shared_expense": expense_id, "user_id": user_id, "amount_owed": amount_owed, "is_settled": is_settled}
+
+
+def settlement(payer, receiver, amount):
+    return {"payer": payer, "receiver": receiver, "amount": amount}
+
+
+class ComputeBalancesTests(SimpleTestCase):
+    def test_paid_minus_owed(self):
+        balances = compute_balances(ledger(
+            expenses=[expense(1, 1, "90.00")],
+            splits=[split(1, 1, "30.00"), split(1, 2, "30.00"), split(1, 3, "30.00")],
+        ))
+        self.assertEqual(balances[1]["balance"], Decimal("60.00"))
+        self.assertEqual(balances[2]["balance"], Decimal("-30.00"))
+        self.assertEqual(balances[1]["total_paid"], Decimal("90.00"))
+        self.assertEqual(balances[1]["total_owed"], Decimal("30.00"))
+
+    def test_settled_splits_are_ignored(self):
+        balances = compute_balances(ledger(
+            expenses=[expense(1, 1, "50.00")],
+            splits=[split(1, 2, "50.00", is_settled=True)],
+        ))
+        self.assertEqual(balances[2]["balance"], Decimal("0"))
+
+    def test_settlements_move_balances_back_towards_zero(self):
+        balances = compute_balances(ledger(
+            expenses=[expense(1, 1, "100.00")],
+            splits=[split(1, 2, "100.00")],
+            settlements=[settlement(2, 1, "40.00")],
+        ))
+        self.assertEqual(balances[1]["balance"], Decimal("60.00"))
+        self.assertEqual(balances[2]["balance"], Decimal("-60.00"))
+
+    def test_members_without_activity_are_included(self):
+        balances = compute_balances(ledger(), member_ids=[7])
+        self.assertEqual(balances[7]["balance"], Decimal("0"))
+
+    def test_amounts_are_exact_decimals(self):
+        balances = compute_balances(ledger(
+            expenses=[expense(i, 1, "0.10") for i in range(3)],
+        ))
+        self.assertEqual(balances[1]["total_paid"], Decimal("0.30"))
+
+
+class SimplifyDebtsTests(SimpleTestCase):
+    def _balances(self, **by_user):
+        return {int(user_id[1:]): {"balance": Decimal(amount)} for user_id, amount in by_user.items()}
+
+    def test_largest_debtor_pays_largest_creditor(self):
+        debts = simplify_debts(self._balances(u1="70", u2="-50", u3="-20"))
+        self.assertEqual(debts, [
+            {"from_user_id": 2, "to_user_id": 1, "amount": Decimal("50")},
+            {"from_user_id": 3, "to_user_id": 1, "amount": Decimal("20")},
+        ])
+
+    def test_debts_settle_every_balance(self):
+        balances = self._balances(u1="120.50", u2="-33.17", u3="-40.00", u4="10.00", u5="-57.33")
+        remaining = {user_id: entry["balance"] for user_id, entry in balances.items()}
+        for debt in simplify_debts(balances):
+            remaining[debt["from_user_id"]] += debt["amount"]
+            remaining[debt["to_user_id"]] -= debt["amount"]
+        self.assertTrue(all(value == 0 for value in remaining.values()))
+
+    def test_at_most_n_minus_one_payments(self):
+        balances = self._balances(u1="30", u2="30", u3="-20", u4="-20", u5="-20")
+        self.assertLessEqual(len(simplify_debts(balances)), 4)
+
+    def test_sub_cent_balances_are_settled(self):
+        self.assertEqual(simplify_debts(self._balances(u1="0.004", u2="-0.004")), [])
+
+
+class BudgetDebtsViewTests(SimpleTestCase):
+    def setUp(self):
+        self.test_api = TestApiBackend()
+        self.mocks = {}
+        for verb in ("get", "post"):
+            patcher = patch(f'djangoapp.restapi.requests.Session.{verb}', side_effect=getattr(self.test_api, verb))
+            self.mocks[verb] = patcher.start()
+            self.addCleanup(patcher.stop)
+        self.mock_get = self.mocks["get"]
+
+        self.budget_row = self.test_api.seed("shared-budgets", {"name": "Trip", "total_amount": "600.00"})
+        budget_id = self.budget_row["id"]
+        users = [self.test_api.seed("users", {
+            "username": f"member{i}", "email": "", "first_name": "", "last_name": "",
+        }) for i in range(4)]
+        for user_row in users:
+            self.test_api.seed("shared-budget-members", {
+                "shared_budget": budget_id, "user_id": user_row["id"],
+                "role": "editor", "contribution_percentage": "0",
+            })
+
+        # member0 pays 400 split four ways; member1 already paid back 100
+        expense_row = self.test_api.seed("shared-expenses", {
+            "shared_budget": budget_id, "paid_by": users[0]["id"], "amount": "400.00",
+        })
+        split_rows = [self.test_api.seed("expense-splits", {
+            "shared_expense": expense_row["id"], "user_id": user_row["id"],
+            "amount_owed": "100.00", "is_settled": False,
+        }) for user_row in users]
+        settlement_row = self.test_api.seed("settlements", {
+            "shared_budget": budget_id, "payer": users[1]["id"], "receiver": users[0]["id"], "amount": "100.00",
+        })
+        self.users = users
+
+        # Record them in the ledger the way the expense/settlement views do
+        balance_ledger.record_expense(budget_id, expense_row, split_rows)
+        balance_ledger.record_settlement(budget_id, settlement_row)
+        self.mock_get.reset_mock()
+
+    def test_debts_cost_a_fixed_number_of_requests(self):
+        debts = get_budget_debts_data(self.budget_row["id"])
+
+        self.assertEqual(self.mock_get.call_count, 2)  # ledger, users
+        self.assertEqual(
+            sorted((d["from_user"]["username"], d["to_user"]["username"], d["amount"]) for d in debts),
+            [("member2", "member0", 100.0), ("member3", "member0", 100.0)],
+        )
+
+    def test_member_balances_come_from_the_same_ledger(self):
+        members = {m["user"]["username"]: m for m in get_budget_members(self.budget_row["id"])}
+
+        self.assertEqual(members["member0"]["total_paid"], 400.0)
+        self.assertEqual(members["member0"]["balance"], 200.0)
+        self.assertEqual(members["member1"]["balance"], 0.0)
+        self.assertEqual(members["member3"]["balance"], -100.0)
+        # members, users, ledger
+        self.assertEqual(self.mock_get.call_count, 3)
+
+    def test_ledger_matches_a_full_recompute(self):
+        ledger_balances = balance_ledger.get_ledger_balances(self.budget_row["id"])
+        recomputed = compute_balances(fetch_budget_ledger(self.budget_row["id"]))
+        self.assertEqual(ledger_balances, recomputed)
+
+
+class BalanceLedgerServiceTests(SimpleTestCase):
+    def setUp(self):
+        self.test_api = TestApiBackend()
+        self.mocks = {}
+        for verb in ("get", "post"):
+            patcher = patch(f'djangoapp.restapi.requests.Session.{verb}', side_effect=getattr(self.test_api, verb))
+            self.mocks[verb] = patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.budget_id = self.test_api.seed("shared-budgets", {"name": "Flat"})["id"]
+        self.expense_row = expense(1, 1, "90.00")
+        self.split_rows = [split(1, user_id, "30.00") for user_id in (1, 2, 3)]
+        balance_ledger.record_expense(self.budget_id, self.expense_row, self.split_rows)
+
+    def _balance(self, user_id):
+        return balance_ledger.get_ledger_balances(self.budget_id)[user_id]["balance"]
+
+    def test_adding_an_expense_is_one_request(self):
+        self.assertEqual(self.mocks["post"].call_count, 1)
+        self.assertTrue(self.mocks["post"].call_args.args[0].endswith("shared-budget-balances/adjust"))
+        self.assertEqual(self._balance(1), Decimal("60.00"))
+        self.assertEqual(self._balance(2), Decimal("-30.00"))
+
+    def test_changing_an_expense_swaps_old_amounts_for_new(self):
+        new_expense_row = expense(1, 1, "120.00")
+        new_split_rows = [split(1, user_id, "40.00") for user_id in (1, 2, 3)]
+        balance_ledger.record_expense_changed(
+            self.budget_id, self.expense_row, self.split_rows, new_expense_row, new_split_rows
+        )
+        self.assertEqual(self._balance(1), Decimal("80.00"))
+        self.assertEqual(self._balance(3), Decimal("-40.00"))
+
+    def test_removing_an_expense_returns_balances_to_zero(self):
+        balance_ledger.record_expense_removed(self.budget_id, self.expense_row, self.split_rows)
+        balances = balance_ledger.get_ledger_balances(self.budget_id)
+        self.assertTrue(all(entry["balance"] == 0 for entry in balances.values()))
+
+    def test_settlements(self):
+        balance_ledger.record_settlement(self.budget_id, settlement(2, 1, "30.00"))
+        balances = balance_ledger.get_ledger_balances(self.budget_id)
+        self.assertEqual(balances[1]["balance"], Decimal("30.00"))
+        self.assertEqual(balances[2]["balance"], Decimal("0.00"))
+        self.assertEqual(balances[2]["settlements_paid"], Decimal("30.00"))
+
+    def test_nothing_to_change_sends_nothing(self):
+        self.assertEqual(balance_ledger.apply_deltas(self.budget_id, {}), [])
+        self.assertEqual(self.mocks["post"].call_count, 1)
+
+    def test_total_paid_is_total_spent(self):
+        balance_ledger.record_expense(self.budget_id, expense(2, 2, "10.00"), [])
+        balances = balance_ledger.get_ledger_balances(self.budget_id)
+        self.assertEqual(balance_ledger.total_paid(balances), Decimal("100.00"))
+
+    def test_falls_back_to_recompute_when_ledger_is_unavailable(self):
+        self.test_api.seed("shared-expenses", {"shared_budget": self.budget_id, "paid_by": 1, "amount": "50.00"})
+        with patch("djangoapp.services.balance_ledger.get_request", return_value=None):
+            balances = balance_ledger.get_ledger_balances(self.budget_id, [4])
+        self.assertEqual(balances[1]["total_paid"], Decimal("50.00"))
+        self.assertEqual(balances[4]["balance"], 0)
+
+    def test_failed_update_rebuilds_the_ledger(self):
+        with patch("djangoapp.services.balance_ledger.post_request", return_value=None), \
+                patch("djangoapp.services.balance_ledger.rebuild_ledger") as rebuild:
+            rows = balance_ledger.record_settlement(self.budget_id, settlement(2, 1, "30.00"))
+        self.assertIsNone(rows)
+        rebuild.assert_called_once_with(self.budget_id)
+
+    def test_successful_update_does_not_rebuild(self):
+        with patch("djangoapp.services.balance_ledger.rebuild_ledger") as rebuild:
+            balance_ledger.record_settlement(self.budget_id, settlement(2, 1, "30.00"))
+        rebuild.assert_not_called()
+
+
+class SharedBudgetBalanceModelTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.budget = self.create_shared_budget()
+        self.member1 = SharedBudgetMember.objects.create(shared_budget=self.budget, user=self.user1, role='owner')
+        self.member2 = SharedBudgetMember.objects.create(shared_budget=self.budget, user=self.user2, role='editor')
+
+        expense_obj = SharedExpense.objects.create(
+            shared_budget=self.budget, description='Groceries', amount=Decimal('80'),
+            paid_by=self.user1, date=self.today, created_by=self.user1
+        )
+        ExpenseSplit.objects.create(shared_expense=expense_obj, user=self.user1, amount_owed=Decimal('40'))
+        ExpenseSplit.objects.create(shared_expense=expense_obj, user=self.user2, amount_owed=Decimal('40'))
+        Settlement.objects.create(
+            shared_budget=self.budget, payer=self.user2, receiver=self.user1,
+            amount=Decimal('15'), date=self.today
+        )
+
+    def test_rebuild_recomputes_every_member(self):
+        SharedBudgetBalance.rebuild(self.budget)
+        row1 = SharedBudgetBalance.objects.get(shared_budget=self.budget, user=self.user1)
+        row2 = SharedBudgetBalance.objects.get(shared_budget=self.budget, user=self.user2)
+        self.assertEqual((row1.total_paid, row1.total_owed, row1.settlements_in), (80, 40, 15))
+        self.assertEqual(row1.balance, Decimal('25'))
+        self.assertEqual(row2.balance, Decimal('-25'))
+
+    def test_rebuild_replaces_stale_rows(self):
+        SharedBudgetBalance.objects.create(shared_budget=self.budget, user=self.user1, total_paid=Decimal('999'))
+        SharedBudgetBalance.rebuild(self.budget)
+        self.assertEqual(SharedBudgetBalance.objects.filter(shared_budget=self.budget).count(), 2)
+        self.assertEqual(self.member1.get_total_paid(), Decimal('80'))
+
+    def test_member_methods_read_the_ledger_row(self):
+        SharedBudgetBalance.objects.create(
+            shared_budget=self.budget, user=self.user2, total_paid=Decimal('5'), total_owed=Decimal('7')
+        )
+        self.assertEqual(self.member2.get_total_paid(), Decimal('5'))
+        self.assertEqual(self.member2.get_balance(), Decimal('-2'))
+
+    def test_member_methods_without_a_ledger_row_include_settlements(self):
+        self.assertEqual(self.member2.get_total_owed(), Decimal('40'))
+        self.assertEqual(self.member2.get_balance(), Decimal('-25'))
+
+    def test_reconcile_command(self):
+        out = StringIO()
+        call_command('reconcile_shared_budget_balances', stdout=out)
+        self.assertEqual(self.member1.get_balance(), Decimal('25'))
+        self.assertIn('Total balance rows written: 2', out.getvalue())
+
+    def test_rebuild_ledger_of_a_missing_budget_is_none(self):
+        self.assertIsNone(balance_ledger.rebuild_ledger(self.budget.id + 1000))
+
+    def test_reconcile_ledger_reports_drift(self):
+        SharedBudgetBalance.rebuild(self.budget)
+        self.assertFalse(balance_ledger.reconcile_ledger(self.budget))
+
+        SharedBudgetBalance.objects.filter(shared_budget=self.budget, user=self.user1).update(total_paid=Decimal('1'))
+        self.assertTrue(balance_ledger.reconcile_ledger(self.budget))
+        self.assertEqual(self.member1.get_balance(), Decimal('25'))
+
+    def test_orm_writes_rebuild_the_ledger_on_commit(self):
+        expense_obj = SharedExpense.objects.create(
+            shared_budget=self.budget, description='Power', amount=Decimal('20'),
+            paid_by=self.user2, date=self.today, created_by=self.user2
+        )
+        # bulk_create() sends no signals; the split helper queues the rebuild itself
+        with self.captureOnCommitCallbacks(execute=True):
+            expense_obj.create_equal_splits()
+        self.assertEqual(self.member1.get_balance(), Decimal('15'))
+        self.assertEqual(self.member2.get_balance(), Decimal('-15'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            expense_obj.delete()
+        self.assertEqual(self.member1.get_balance(), Decimal('25'))
@@ -88,10 +88,10 @@ class FriendshipAPITests(BaseTestCase):
         self.client.force_login(self.user1)
         # Set up mock API
         self.test_api = TestApiBackend()
-        self.get_patcher = patch('djangoapp.restapi.requests.get', side_effect=self.test_api.get)
-        self.post_patcher = patch('djangoapp.restapi.requests.post', side_effect=self.test_api.post)
-        self.patch_patcher = patch('djangoapp.restapi.requests.patch', side_effect=self.test_api.patch)
-        self.delete_patcher = patch('djangoapp.restapi.requests.delete', side_effect=self.test_api.delete)
+        self.get_patcher = patch('djangoapp.restapi.requests.Session.get', side_effect=self.test_api.get)
+        self.post_patcher = patch('djangoapp.restapi.requests.Session.post', side_effect=self.test_api.post)
+        self.patch_patcher = patch('djangoapp.restapi.requests.Session.patch', side_effect=self.test_api.patch)
+        self.delete_patcher = patch('djangoapp.restapi.requests.Session.delete', side_effect=self.test_api.delete)
         self.get_patcher.start()
         self.post_patcher.start()
         self.patch_patcher.start()
@@ -292,10 +292,10 @@ class FriendshipNotificationAPITests(BaseTestCase):
         self.client.force_login(self.user1)
         # Set up mock API backend
         self.test_api = TestApiBackend()
-        self.get_patcher = patch('djangoapp.restapi.requests.get', side_effect=self.test_api.get)
-        self.post_patcher = patch('djangoapp.restapi.requests.post', side_effect=self.test_api.post)
-        self.patch_patcher = patch('djangoapp.restapi.requests.patch', side_effect=self.test_api.patch)
-        self.delete_patcher = patch('djangoapp.restapi.requests.delete', side_effect=self.test_api.delete)
+        self.get_patcher = patch('djangoapp.restapi.requests.Session.get', side_effect=self.test_api.get)
+        self.post_patcher = patch('djangoapp.restapi.requests.Session.post', side_effect=self.test_api.post)
+        self.patch_patcher = patch('djangoapp.restapi.requests.Session.patch', side_effect=self.test_api.patch)
+        self.delete_patcher = patch('djangoapp.restapi.requests.Session.delete', side_effect=self.test_api.delete)
         self.get_patcher.start()
         self.post_patcher.start()
         self.patch_patcher.start()
@@ -350,6 +350,20 @@ class FriendshipNotificationAPITests(BaseTestCase):
         self.assertEqual(data['notifications'][0]['type'], 'friend_request')
         self.assertEqual(data['unread_count'], 1)
 
+    def test_get_notifications_resolves_senders_in_one_request(self):
+        senders = [self._seed_user(str(i)) for i in range(3)]
+        for sender in senders:
+            self._seed_friendship_notification(from_user_id=sender["id"])
+
+        with patch('djangoapp.restapi.requests.Session.get', side_effect=self.test_api.get) as mock_get:
+            response = self.client.get(reverse('djangoapp:get_notifications'))
+
+        self.assertEqual(response.status_code, 200)
+        usernames = {n['from_user']['username'] for n in response.json()['notifications']}
+        self.assertEqual(usernames, {sender["username"] for sender in senders})
+        user_calls = [c for c in mock_get.call_args_list if "/users" in c.args[0]]
+        self.assertEqual(len(user_calls), 1)
+
     def test_get_notifications_filter_unread_only(self):
         # Seed users
         self._seed_user("2")
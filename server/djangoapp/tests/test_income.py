@@ -9,6 +9,7 @@ from django.urls import reverse
 from django.utils import timezone
 
 from djangoapp.models.models import Income
+from djangoapp.views.incomes_views import get_income_data
 
 from .test_base import BaseTestCase
 from .test_api_backend import TestApiBackend
@@ -62,11 +63,11 @@ class IncomeAPITests(BaseTestCase):
         self.client.force_login(self.user1)
         # Set up mock API backend
         self.test_api = TestApiBackend()
-        self.get_patcher = patch('djangoapp.restapi.requests.get', side_effect=self.test_api.get)
-        self.post_patcher = patch('djangoapp.restapi.requests.post', side_effect=self.test_api.post)
-        self.patch_patcher = patch('djangoapp.restapi.requests.patch', side_effect=self.test_api.patch)
-        self.delete_patcher = patch('djangoapp.restapi.requests.delete', side_effect=self.test_api.delete)
-        self.get_patcher.start()
+        self.get_patcher = patch('djangoapp.restapi.requests.Session.get', side_effect=self.test_api.get)
+        self.post_patcher = patch('djangoapp.restapi.requests.Session.post', side_effect=self.test_api.post)
+        self.patch_patcher = patch('djangoapp.restapi.requests.Session.patch', side_effect=self.test_api.patch)
+        self.delete_patcher = patch('djangoapp.restapi.requests.Session.delete', side_effect=self.test_api.delete)
+        self.mock_get = self.get_patcher.start()
         self.post_patcher.start()
         self.patch_patcher.start()
         self.delete_patcher.start()
@@ -95,11 +96,49 @@ class IncomeAPITests(BaseTestCase):
         row.update(overrides)
         return self.test_api.seed("incomes", row)
 
+    def test_income_data_totals_come_from_the_api(self):
+        self._seed_income()
+        self.test_api.seed("transactions", {
+            "user_id": self.user1.id, "amount": "1200.00", "date": self.today.isoformat(),
+        })
+        subscription = self.test_api.seed("subscriptions", {"user_id": self.user1.id, "amount": "300.00"})
+        self.test_api.seed("subscription-payments", {
+            "subscription_id": subscription["id"], "amount": "300.00", "due_date": self.today.isoformat(),
+        })
+        # Another user's payment must not be counted
+        other = self.test_api.seed("subscriptions", {"user_id": self.user2.id, "amount": "50.00"})
+        self.test_api.seed("subscription-payments", {
+            "subscription_id": other["id"], "amount": "50.00", "due_date": self.today.isoformat(),
+        })
+
+        data = get_income_data(self.user1, "total")
+
+        self.assertEqual(data["total_income"], 5000.0)
+        self.assertEqual(data["total_spent"], 1500.0)
+        self.assertEqual(data["percent_remaining"], Decimal("70.0"))
+        urls = [call.args[0] for call in self.mock_get.call_args_list]
+        self.assertTrue(all(url.endswith("/aggregate") for url in urls))
+
+    def test_get_incomes_summary_counts_subscription_payments(self):
+        self._seed_income()
+        subscription = self.test_api.seed("subscriptions", {"user_id": self.user1.id, "amount": "20.00"})
+        for days_ago in range(2):
+            self.test_api.seed("subscription-payments", {
+                "subscription_id": subscription["id"], "amount": "20.00",
+                "due_date": (self.today - timezone.timedelta(days=days_ago)).isoformat(),
+            })
+
+        response = self.client.get(reverse('djangoapp:get_incomes'))
+        summary = self.response_json(response)["summary"]
+
+        self.assertEqual(summary["subscription_spent"], 40.0)
+        self.assertEqual(summary["total_spent"], 40.0)
+
     def test_get_incomes_returns_data(self):
         self._seed_income()
         response = self.client.get(reverse('djangoapp:get_incomes'))
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = self.response_json(response)
         self.assertEqual(len(data['incomes']), 1)
         self.assertEqual(data['incomes'][0]['source'], 'Salary')
         self.assertEqual(float(data['incomes'][0]['amount']), 5000.00)
@@ -0,0 +1,152 @@
+"""
+Tests for the integer-cents Money type in services/money.py.
+"""
+import random
+from decimal import Decimal, ROUND_DOWN
+
+from django.test import SimpleTestCase
+
+from djangoapp.services.money import CENT, ZERO, Money
+
+
+def decimal_allocate(amount, weights):
+    """The Decimal largest-remainder split Money.allocate() replaced."""
+    cent = Decimal("0.01")
+    amount = Decimal(str(amount)).quantize(cent)
+    weights = [Decimal(str(weight)) for weight in weights]
+    total_weight = sum(weights)
+    if total_weight <= 0:
+        weights = [Decimal(1)] * len(weights)
+        total_weight = Decimal(len(weights))
+    cents = int(amount / cent)
+    exact = [cents * weight / total_weight for weight in weights]
+    shares = [int(share.to_integral_value(rounding=ROUND_DOWN)) for share in exact]
+    leftover = cents - sum(shares)
+    for i in sorted(range(len(exact)), key=lambda i: exact[i] - shares[i], reverse=True)[:leftover]:
+        shares[i] += 1
+    return [share * cent for share in shares]
+
+
+class MoneyParseTests(SimpleTestCase):
+    def test_api_strings(self):
+        self.assertEqual(Money.parse("12.50").cents, 1250)
+        self.assertEqual(Money.parse("0.29").cents, 29)
+        self.assertEqual(Money.parse("-0.05").cents, -5)
+        self.assertEqual(Money.parse("99999999.99").cents, 9999999999)
+
+    def test_other_inputs(self):
+        self.assertEqual(Money.parse(None), ZERO)
+        self.assertEqual(Money.parse(12).cents, 1200)
+        self.assertEqual(Money.parse("7").cents, 700)
+        self.assertEqual(Money.parse("7.5").cents, 750)
+        self.assertEqual(Money.parse(Decimal("3.10")).cents, 310)
+        self.assertEqual(Money.parse(0.1).cents, 10)
+        self.assertEqual(Money.parse("123456789012345.67").cents, 12345678901234567)
+
+    def test_sub_cent_rounds_half_up(self):
+        self.assertEqual(Money.parse("1.005").cents, 101)
+        self.assertEqual(Money.parse(Decimal("2.344")).cents, 234)
+        self.assertEqual(Money.parse("-1.005").cents, -101)
+
+    def test_every_two_decimal_string_is_exact(self):
+        rng = random.Random(0)
+        for _ in range(5000):
+            cents = rng.randint(-10**10, 10**10)
+            text = str(Decimal(cents).scaleb(-2))
+            self.assertEqual(Money.parse(text).cents, cents, text)
+
+
+class MoneyArithmeticTests(SimpleTestCase):
+    def test_add_and_subtract(self):
+        self.assertEqual(Money.parse("1.10") + Money.parse("2.25"), Money(335))
+        self.assertEqual(Money.parse("1.10") - Money.parse("2.25"), Money(-115))
+        self.assertEqual(Money(100) + 0, Money(100))
+        self.assertEqual(0 + Money(100), Money(100))
+        self.assertEqual(Decimal("0.50") + Money(100), Money(150))
+        self.assertEqual(Decimal("5") - Money(150), Money(350))
+        with self.assertRaises(TypeError):
+            Money(100) + 0.5
+        with self.assertRaises(TypeError):
+            Money(100) + Decimal("0.001")
+
+    def test_multiply_and_divide(self):
+        self.assertEqual(Money.parse("15.99") * 12, Money.parse("191.88"))
+        self.assertEqual(3 * Money(5), Money(15))
+        self.assertEqual(Money(100) * Decimal("0.125"), Money(13))
+        self.assertEqual(Money(250) / Money(1000), Decimal("0.25"))
+        with self.assertRaises(TypeError):
+            Money(100) * 1.5
+
+    def test_exact_where_floats_drift(self):
+        amounts = [Money.parse("0.10")] * 10
+        self.assertEqual(Money.total(amounts), Money.parse("1.00"))
+        self.assertNotEqual(sum(float(amount) for amount in amounts), 1.0)
+
+    def test_total(self):
+        self.assertEqual(Money.total([]), ZERO)
+        self.assertEqual(Money.total(Money(c) for c in (1, 2, 3)), Money(6))
+
+    def test_sign_and_truth(self):
+        self.assertEqual(-Money(5), Money(-5))
+        self.assertEqual(abs(Money(-5)), Money(5))
+        self.assertFalse(ZERO)
+        self.assertTrue(CENT)
+
+
+class MoneyComparisonTests(SimpleTestCase):
+    def test_compares_like_a_decimal(self):
+        amount = Money.parse("12.50")
+        self.assertEqual(amount, Decimal("12.50"))
+        self.assertEqual(Decimal("12.5"), amount)
+        self.assertEqual(amount, 12.5)
+        self.assertEqual(Money(1200), 12)
+        self.assertNotEqual(Money.parse("0.30"), 0.3)
+        self.assertLess(Money(5), Decimal("0.06"))
+        self.assertGreater(Money(5), 0)
+        self.assertLessEqual(Decimal("-0.01"), -CENT)
+
+    def test_hash_matches_equal_values(self):
+        self.assertEqual(hash(Money(1250)), hash(Decimal("12.50")))
+        self.assertEqual(hash(Money(1200)), hash(12))
+        self.assertEqual(len({Money(100), Money.parse("1.00")}), 1)
+
+    def test_sorting(self):
+        amounts = [Money(c) for c in (300, -5, 0, 120)]
+        self.assertEqual([a.cents for a in sorted(amounts)], [-5, 0, 120, 300])
+
+
+class MoneyFormattingTests(SimpleTestCase):
+    def test_str_and_repr(self):
+        self.assertEqual(str(Money(1250)), "12.50")
+        self.assertEqual(str(Money(-5)), "-0.05")
+        self.assertEqual(str(ZERO), "0.00")
+        self.assertEqual(repr(Money(7)), "Money('0.07')")
+
+    def test_conversions(self):
+        self.assertEqual(float(Money(1250)), 12.5)
+        self.assertEqual(Money(1250).to_decimal(), Decimal("12.50"))
+        self.assertEqual(str(Money(1250).to_decimal()), "12.50")
+        self.assertEqual(f"{Money(1250):.1f}", "12.5")
+        self.assertEqual(f"{Money(1250)}", "12.50")
+
+
+class MoneyAllocateTests(SimpleTestCase):
+    def test_shares_add_up(self):
+        self.assertEqual(
+            Money.parse("10.00").allocate([1, 1, 1]),
+            [Money(334), Money(333), Money(333)],
+        )
+        self.assertEqual(Money.parse("9.00").allocate([0, 0, 0]), [Money(300)] * 3)
+        self.assertEqual(Money(100).allocate([]), [])
+
+    def test_negative_amounts_mirror_positive(self):
+        self.assertEqual(Money(-1000).allocate([1, 1, 1]), [Money(-334), Money(-333), Money(-333)])
+
+    def test_matches_the_decimal_split(self):
+        rng = random.Random(1)
+        for _ in range(500):
+            amount = Decimal(rng.randint(0, 10**7)).scaleb(-2)
+            weights = [Decimal(rng.randint(0, 10000)).scaleb(-2) for _ in range(rng.randint(1, 8))]
+            shares = Money.parse(amount).allocate(weights)
+            self.assertEqual(Money.total(shares), amount)
+            self.assertEqual([share.to_decimal() for share in shares], decimal_allocate(amount, weights))
@@ -0,0 +1,249 @@
+"""
+Tests for the pooled gateway session and concurrent fan-out in
+djangoapp/restapi.py and the request-scoped read cache in
+djangoapp/request_cache.py.
+"""
+import threading
+from unittest.mock import patch
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from djangoapp import restapi, request_cache
+from djangoapp.middleware import GatewayCacheMiddleware
+
+from .test_api_backend import TestApiBackend
+
+
+class GatewaySessionTests(SimpleTestCase):
+    def setUp(self):
+        restapi.close_session()
+        self.addCleanup(restapi.close_session)
+
+    def test_session_is_reused_across_calls(self):
+        self.assertIs(restapi.get_session(), restapi.get_session())
+
+    def test_session_is_rebuilt_after_fork(self):
+        parent_session = restapi.get_session()
+        with patch("djangoapp.restapi.os.getpid", return_value=-1):
+            child_session = restapi.get_session()
+        self.assertIsNot(parent_session, child_session)
+
+    def test_session_sends_internal_api_key(self):
+        session = restapi.get_session()
+        self.assertEqual(
+            session.headers["x-internal-api-key"], restapi.INTERNAL_API_KEY
+        )
+
+    def test_adapter_pool_and_retry_settings(self):
+        adapter = restapi.get_session().get_adapter(restapi.BACKEND_URL)
+        self.assertEqual(adapter._pool_maxsize, restapi.POOL_MAXSIZE)
+        self.assertEqual(adapter.max_retries.total, restapi.MAX_RETRIES)
+        self.assertNotIn("POST", adapter.max_retries.allowed_methods)
+        self.assertNotIn("PATCH", adapter.max_retries.allowed_methods)
+
+    def test_get_request_goes_through_pooled_session(self):
+        with patch("djangoapp.restapi.requests.Session.get") as mock_get:
+            mock_get.return_value.json.return_value = [{"id": 1}]
+            rows = restapi.get_request("transactions/", user_id=1)
+        self.assertEqual(rows, [{"id": 1}])
+        mock_get.assert_called_once()
+
+
+class RunConcurrentlyTests(SimpleTestCase):
+    def test_results_are_keyed_by_name(self):
+        results = restapi.run_concurrently({
+            "double": (lambda x: x * 2, 4),
+            "total": (sum, [1, 2, 3]),
+        })
+        self.assertEqual(results, {"double": 8, "total": 6})
+
+    def test_calls_overlap(self):
+        # Each call waits until all three are running at once; run one
+        # after another, the barrier would time out and break.
+        barrier = threading.Barrier(3, timeout=5)
+        results = restapi.run_concurrently({
+            name: (barrier.wait,) for name in ("a", "b", "c")
+        })
+        self.assertEqual(sorted(results.values()), [0, 1, 2])
+
+    def test_worker_threads_share_the_request_cache(self):
+        cache, token = request_cache.activate()
+        self.addCleanup(request_cache.deactivate, token)
+        results = restapi.run_concurrently({
+            "a": (request_cache.get_current_cache,),
+            "b": (request_cache.get_current_cache,),
+        })
+        self.assertIs(results["a"], cache)
+        self.assertIs(results["b"], cache)
+
+    def test_exceptions_are_reraised(self):
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            restapi.run_concurrently({"ok": (int, "1"), "bad": (fail,)})
+
+    def test_no_calls(self):
+        self.assertEqual(restapi.run_concurrently({}), {})
+
+
+class RequestCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.test_api = TestApiBackend()
+        self.mocks = {}
+        for verb in ("get", "post", "patch", "delete"):
+            patcher = patch(
+                f"djangoapp.restapi.requests.Session.{verb}",
+                side_effect=getattr(self.test_api, verb),
+            )
+            self.mocks[verb] = patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.cache, token = request_cache.activate()
+        self.addCleanup(request_cache.deactivate, token)
+
+        self.budget = self.test_api.seed("budgets", {"user_id": 1, "category": "Food"})
+
+    def test_repeat_read_is_served_from_cache(self):
+        first = restapi.get_request(f"budgets/{self.budget['id']}")
+        second = restapi.get_request(f"budgets/{self.budget['id']}/")
+        self.assertEqual(first, second)
+        self.assertEqual(self.mocks["get"].call_count, 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_params_are_normalized(self):
+        restapi.get_request("budgets/", user_id=1, category="Food")
+        restapi.get_request("budgets/", category="Food", user_id="1")
+        self.assertEqual(self.mocks["get"].call_count, 1)
+
+    def test_cached_rows_are_copies(self):
+        rows = restapi.get_request("budgets/", user_id=1)
+        rows[0]["category"] = "Changed"
+        self.assertEqual(restapi.get_request("budgets/", user_id=1)[0]["category"], "Food")
+
+    def test_write_invalidates_same_resource_only(self):
+        restapi.get_request("budgets/", user_id=1)
+        restapi.get_request("transactions/", user_id=1)
+        restapi.patch_request(f"budgets/{self.budget['id']}", {"category": "Rent"})
+
+        rows = restapi.get_request("budgets/", user_id=1)
+        restapi.get_request("transactions/", user_id=1)
+        self.assertEqual(rows[0]["category"], "Rent")
+        self.assertEqual(self.mocks["get"].call_count, 3)
+
+    def test_delete_flushes_everything(self):
+        restapi.get_request("transactions/", user_id=1)
+        restapi.delete_request(f"budgets/{self.budget['id']}")
+        restapi.get_request("transactions/", user_id=1)
+        self.assertEqual(self.mocks["get"].call_count, 2)
+
+    def test_failed_reads_are_not_cached(self):
+        self.assertIsNone(restapi.get_request("budgets/999"))
+        self.assertIsNone(restapi.get_request("budgets/999"))
+        self.assertEqual(self.mocks["get"].call_count, 2)
+
+    def test_no_caching_outside_a_request(self):
+        with patch("djangoapp.restapi.get_current_cache", return_value=None):
+            restapi.get_request("budgets/", user_id=1)
+            restapi.get_request("budgets/", user_id=1)
+        self.assertEqual(self.mocks["get"].call_count, 2)
+
+
+class AggregateRequestTests(SimpleTestCase):
+    def setUp(self):
+        self.test_api = TestApiBackend()
+        patcher = patch("djangoapp.restapi.requests.Session.get", side_effect=self.test_api.get)
+        self.mock_get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        for category, amount, day in (("Food", "10.00", 1), ("Food", "2.50", 3), ("Rent", "500.00", 2)):
+            self.test_api.seed("transactions", {
+                "user_id": 1, "category": category, "amount": amount, "date": f"2025-01-0{day}",
+            })
+
+    def test_params_are_sent_to_the_aggregate_route(self):
+        restapi.aggregate_request(
+            "transactions/", sum="amount", max=["date", "amount"], count=True, user_id=1
+        )
+        url = self.mock_get.call_args.args[0]
+        params = self.mock_get.call_args.kwargs["params"]
+        self.assertTrue(url.endswith("transactions/aggregate"))
+        self.assertEqual(
+            params, {"sum": "amount", "max": "date,amount", "count": 1, "user_id": 1}
+        )
+
+    def test_ungrouped_returns_one_row(self):
+        row = restapi.aggregate_request("transactions/", sum="amount", count=True, user_id=1)
+        self.assertEqual(row, {"amount__sum": "512.50", "count": 3})
+
+    def test_group_by(self):
+        rows = restapi.aggregate_request("transactions/", group_by="category", sum="amount", user_id=1)
+        self.assertEqual(
+            sorted(rows, key=lambda r: r["category"]),
+            [{"category": "Food", "amount__sum": "12.50"}, {"category": "Rent", "amount__sum": "500.00"}],
+        )
+
+    def test_sum_over_no_rows_is_none(self):
+        row = restapi.aggregate_request("transactions/", sum="amount", user_id=2)
+        self.assertIsNone(row["amount__sum"])
+
+
+class PageRequestTests(SimpleTestCase):
+    def setUp(self):
+        self.test_api = TestApiBackend()
+        patcher = patch("djangoapp.restapi.requests.Session.get", side_effect=self.test_api.get)
+        self.mock_get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        for day in (1, 1, 2, 3):
+            self.test_api.seed("transactions", {"user_id": 1, "date": f"2025-01-0{day}"})
+
+    def test_asks_for_one_extra_row(self):
+        restapi.page_request("transactions/", ("-date", "-id"), 2, after="2025-01-03,4", user_id=1)
+        self.assertEqual(self.mock_get.call_args.kwargs["params"], {
+            "user_id": 1, "order": "-date,-id", "limit": 3, "after": "2025-01-03,4",
+        })
+
+    def test_limit_stays_below_the_api_cap(self):
+        restapi.page_request("transactions/", ("-id",), 5000, user_id=1)
+        self.assertEqual(self.mock_get.call_args.kwargs["params"]["limit"], restapi.MAX_PAGE_SIZE)
+
+    def test_cursor_is_the_last_rows_sort_values(self):
+        rows, cursor = restapi.page_request("transactions/", ("-date", "-id"), 2, user_id=1)
+        self.assertEqual([r["id"] for r in rows], [4, 3])
+        self.assertEqual(cursor, "2025-01-02,3")
+
+        rows, cursor = restapi.page_request("transactions/", ("-date", "-id"), 2, after=cursor, user_id=1)
+        self.assertEqual([r["id"] for r in rows], [2, 1])
+        self.assertIsNone(cursor)
+
+
+class GatewayCacheMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.test_api = TestApiBackend()
+        self.test_api.seed("users", {"username": "user1"})
+        patcher = patch("djangoapp.restapi.requests.Session.get", side_effect=self.test_api.get)
+        self.mock_get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _view(self, request):
+        restapi.get_request("users/1")
+        restapi.get_request("users/1")
+        return HttpResponse("ok")
+
+    @override_settings(DEBUG=True)
+    def test_cache_is_request_scoped_and_reports_counters(self):
+        middleware = GatewayCacheMiddleware(self._view)
+        request = RequestFactory().get("/")
+
+        response = middleware(request)
+        self.assertEqual(response["X-Gateway-Cache-Hits"], "1")
+        self.assertEqual(response["X-Gateway-Cache-Misses"], "1")
+        self.assertEqual(request.gateway_cache.stats()["hits"], 1)
+
+        # A second request starts with an empty cache
+        middleware(RequestFactory().get("/"))
+        self.assertEqual(self.mock_get.call_count, 2)
+        self.assertIsNone(request_cache.get_current_cache())
@@ -0,0 +1,141 @@
+"""
+Tests for the background job runner in djangoapp/scheduler.py and the
+run_scheduled_jobs command.
+"""
+import importlib
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from djangoapp import scheduler
+from djangoapp.apps import is_web_process
+from djangoapp.models.models import (
+    ScheduledJob,
+    SharedBudgetBalance,
+    Subscription,
+    SubscriptionPayment,
+)
+
+from .test_base import BaseTestCase
+
+
+class JobLockTests(BaseTestCase):
+    def test_only_one_caller_wins(self):
+        self.assertTrue(scheduler.acquire('job', 'worker-1'))
+        self.assertFalse(scheduler.acquire('job', 'worker-2'))
+        self.assertFalse(scheduler.acquire('job', 'worker-2', force=True))
+        self.assertEqual(ScheduledJob.objects.get(name='job').locked_by, 'worker-1')
+
+    def test_expired_lock_can_be_taken_over(self):
+        scheduler.acquire('job', 'worker-1')
+        ScheduledJob.objects.filter(name='job').update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(scheduler.acquire('job', 'worker-2'))
+
+    def test_job_is_not_claimed_before_it_is_due(self):
+        ScheduledJob.objects.create(name='job', next_run_at=timezone.now() + timedelta(hours=1))
+        self.assertFalse(scheduler.acquire('job', 'worker-1'))
+        self.assertTrue(scheduler.acquire('job', 'worker-1', force=True))
+
+    def test_next_window_start(self):
+        tz = timezone.get_current_timezone()
+        before = datetime(2026, 3, 10, 1, 30, tzinfo=tz)
+        after = datetime(2026, 3, 10, 14, 0, tzinfo=tz)
+        self.assertEqual(timezone.localtime(scheduler.next_window_start(before)).date(), date(2026, 3, 10))
+        self.assertEqual(timezone.localtime(scheduler.next_window_start(after)).date(), date(2026, 3, 11))
+        self.assertEqual(timezone.localtime(scheduler.next_window_start(after)).hour, scheduler.WINDOW_START_HOUR)
+
+
+class RunJobTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seen = []
+
+        def record(user):
+            self.seen.append(user.username)
+            if user == self.user2:
+                raise ValueError("boom")
+            return 1
+
+        patcher = patch.dict(scheduler.JOBS, {'record': record})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_runs_for_every_active_user_in_batches(self):
+        self.user3.is_active = False
+        self.user3.save()
+
+        changed, failed = scheduler.run_job('record', batch_size=1)
+
+        self.assertEqual(self.seen, ['user1', 'user2'])
+        self.assertEqual((changed, failed), (1, 1))
+
+    def test_run_releases_the_lock_and_schedules_the_next_window(self):
+        scheduler.run_job('record')
+        job = ScheduledJob.objects.get(name='record')
+        self.assertIsNone(job.locked_until)
+        self.assertEqual(job.next_run_at, scheduler.next_window_start(job.last_finished_at))
+
+        # Not due again until then
+        self.assertIsNone(scheduler.run_job('record'))
+
+    def test_job_held_elsewhere_does_not_run(self):
+        scheduler.acquire('record', 'another-worker')
+        self.assertIsNone(scheduler.run_job('record', force=True))
+        self.assertEqual(self.seen, [])
+
+    def test_generates_subscription_payments(self):
+        subscription = Subscription.objects.create(
+            user=self.user1, name='Gym', amount=Decimal('30'), category='Health',
+            billing_cycle='weekly', start_date=self.today - timedelta(days=14), status='active'
+        )
+        scheduler.run_job('generate_subscription_payments')
+        self.assertEqual(SubscriptionPayment.objects.filter(subscription=subscription).count(), 3)
+
+    def test_reconciles_shared_budget_balances(self):
+        budget = self.create_shared_budget()
+        SharedBudgetBalance.objects.create(shared_budget=budget, user=self.user1, total_paid=Decimal('50'))
+
+        changed, failed = scheduler.run_job('reconcile_shared_budget_balances')
+
+        self.assertEqual((changed, failed), (1, 0))
+        self.assertFalse(SharedBudgetBalance.objects.filter(shared_budget=budget, total_paid__gt=0).exists())
+
+
+class RunScheduledJobsCommandTests(BaseTestCase):
+    def test_command_runs_due_jobs_once(self):
+        calls = []
+        jobs = {'one': lambda user: calls.append(user.id) or 0}
+        out = StringIO()
+        with patch.dict(scheduler.JOBS, jobs, clear=True):
+            call_command('run_scheduled_jobs', stdout=out)
+            call_command('run_scheduled_jobs', stdout=out)
+
+        self.assertEqual(len(calls), 3)
+        self.assertIn('one: 0 changed', out.getvalue())
+        self.assertIn('one: not due', out.getvalue())
+
+
+class WebProcessTests(SimpleTestCase):
+    def test_web_servers_run_the_scheduler(self):
+        self.assertTrue(is_web_process(["/usr/local/bin/gunicorn", "djangoproj.wsgi:application"]))
+        self.assertTrue(is_web_process(["/usr/lib/python3/site-packages/gunicorn/__main__.py"]))
+        self.assertTrue(is_web_process(["manage.py", "runserver"]))
+
+    def test_commands_and_tests_do_not(self):
+        self.assertFalse(is_web_process(["manage.py", "migrate"]))
+        self.assertFalse(is_web_process(["manage.py", "test"]))
+        self.assertFalse(is_web_process(["/usr/local/bin/pytest"]))
+        self.assertFalse(is_web_process([]))
+
+    def test_enabled_by_default(self):
+        self.addCleanup(importlib.reload, scheduler)
+        with patch.dict("os.environ"):
+            os.environ.pop("SCHEDULER_ENABLED", None)
+            importlib.reload(scheduler)
+        self.assertTrue(scheduler.SCHEDULER_ENABLED)
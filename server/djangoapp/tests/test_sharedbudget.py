@@ -84,10 +84,10 @@ class SharedBudgetAPITests(BaseTestCase):
         self.client.force_login(self.user1)
         # Set up mock API backend
         self.test_api = TestApiBackend()
-        self.get_patcher = patch('djangoapp.restapi.requests.get', side_effects=self.test_api.get)
-        self.post_patcher = patch('djangoapp.restapi.requests.post', side_effects=self.test_api.post)
-        self.patch_patcher = patch('djangoapp.restapi.requests.patch', side_effects=self.test_api.patch)
-        self.delete_patcher = patch('djangoapp.restapi.requests.delete', side_effects=self.test_api.delete)
+        self.get_patcher = patch('djangoapp.restapi.requests.Session.get', side_effects=self.test_api.get)
+        self.post_patcher = patch('djangoapp.restapi.requests.Session.post', side_effects=self.test_api.post)
+        self.patch_patcher = patch('djangoapp.restapi.requests.Session.patch', side_effects=self.test_api.patch)
+        self.delete_patcher = patch('djangoapp.restapi.requests.Session.delete', side_effects=self.test_api.delete)
         self.get_patcher.start()
         self.post_patcher.start()
         self.patch_patcher.start()
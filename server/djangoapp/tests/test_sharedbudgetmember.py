@@ -4,12 +4,15 @@ Tests for the SharedBudgetMember model and its API endpoints.
 
 import json
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.urls import reverse
 
 from djangoapp.models.models import SharedBudgetMember
+from djangoapp.views.shared_budget_views import get_budget_members
 
 from .test_base import BaseTestCase
+from .test_api_backend import TestApiBackend
 
 
 class SharedBudgetMemberModelTests(BaseTestCase):
@@ -123,4 +126,45 @@ class SharedBudgetMemberAPITests(BaseTestCase):
         response = self.client.delete(
             reverse('djangoapp:remove_member', kwargs={'budget_id': self.budget.id, 'member_id': owner_member.id})
         )
-        self.assertEqual(response.status_code, 403)
\ No newline at end of file
+        self.assertEqual(response.status_code, 403)
+
+
+class SharedBudgetMemberUserLookupTests(BaseTestCase):
+    """Members should be serialized with one batched users/ request."""
+
+    def setUp(self):
+        super().setUp()
+        self.test_api = TestApiBackend()
+        patcher = patch('djangoapp.restapi.requests.Session.get', side_effect=self.test_api.get)
+        self.mock_get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.budget_row = self.test_api.seed("shared-budgets", {"name": "Trip", "total_amount": "600.00"})
+        for i in range(6):
+            user_row = self.test_api.seed("users", {
+                "username": f"member{i}", "email": f"member{i}@example.com",
+                "first_name": f"First{i}", "last_name": f"Last{i}",
+            })
+            self.test_api.seed("shared-budget-members", {
+                "shared_budget": self.budget_row["id"], "user_id": user_row["id"],
+                "role": "editor", "contribution_percentage": "0",
+            })
+
+    def _user_requests(self):
+        return [c for c in self.mock_get.call_args_list if "/users" in c.args[0]]
+
+    def test_six_members_cost_one_user_fetch(self):
+        members = get_budget_members(self.budget_row["id"])
+        self.assertEqual(len(members), 6)
+        self.assertEqual(len(self._user_requests()), 1)
+        self.assertEqual(members[0]['user']['username'], 'member0')
+        self.assertEqual(members[0]['user']['email'], 'member0@example.com')
+
+    def test_unknown_user_falls_back_to_placeholder(self):
+        self.test_api.seed("shared-budget-members", {
+            "shared_budget": self.budget_row["id"], "user_id": 999,
+            "role": "viewer", "contribution_percentage": "0",
+        })
+        members = get_budget_members(self.budget_row["id"])
+        self.assertEqual(members[-1]['user']['username'], 'user_999')
+        self.assertEqual(len(self._user_requests()), 1)
@@ -3,12 +3,18 @@ Tests for the SharedExpense model and its API endpoints.
 """
 import json
 from decimal import Decimal
+from unittest.mock import patch
 
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
 from django.urls import reverse
 
 from djangoapp.models.models import SharedBudgetMember, SharedExpense
+from djangoapp.services.splits import allocate, split_evenly
+from djangoapp.views.shared_budget_views import create_expense_splits
 
 from .test_base import BaseTestCase
+from .test_api_backend import TestApiBackend
 
 
 class SharedExpenseModelTests(BaseTestCase):
@@ -106,6 +112,91 @@ class SharedExpenseModelTests(BaseTestCase):
         self.assertEqual(splits[0].user, self.user1)
         self.assertEqual(splits[0].shared_expense, expense)
 
+class SharedExpenseBulkSplitTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.budget = self.create_shared_budget()
+        for user in (self.user1, self.user2, self.user3):
+            SharedBudgetMember.objects.create(shared_budget=self.budget, user=user, role='editor')
+        self.expense = SharedExpense.objects.create(
+            shared_budget=self.budget, description='Taxi', amount=Decimal('100'),
+            paid_by=self.user1, date=self.today, created_by=self.user1
+        )
+
+    def test_equal_splits_sum_to_the_amount(self):
+        splits = self.expense.create_equal_splits()
+        self.assertEqual(
+            sorted(split.amount_owed for split in splits),
+            [Decimal('33.33'), Decimal('33.33'), Decimal('33.34')],
+        )
+        self.assertEqual(sum(split.amount_owed for split in self.expense.splits.all()), Decimal('100'))
+
+    def test_equal_splits_are_one_insert(self):
+        # One query for the members, one for the insert
+        with self.assertNumQueries(2):
+            self.expense.create_equal_splits()
+
+    def test_percentage_splits_sum_to_the_amount(self):
+        SharedBudgetMember.objects.filter(shared_budget=self.budget).update(contribution_percentage=Decimal('33.33'))
+        self.expense.create_percentage_splits()
+        self.assertEqual(sum(split.amount_owed for split in self.expense.splits.all()), Decimal('100'))
+
+    def test_custom_splits_are_one_lookup_and_one_insert(self):
+        with self.assertNumQueries(2):
+            self.expense.create_custom_splits([
+                {'user_id': user.id, 'amount': 25} for user in (self.user1, self.user2, self.user3)
+            ])
+
+    def test_custom_splits_for_unknown_user_raise(self):
+        with self.assertRaises(User.DoesNotExist):
+            self.expense.create_custom_splits([{'user_id': 9999, 'amount': 25}])
+        self.assertEqual(self.expense.splits.count(), 0)
+
+
+class SplitAllocationTests(SimpleTestCase):
+    def test_remainder_cents_go_to_the_largest_remainders(self):
+        self.assertEqual(allocate('10.00', [1, 1, 1]), [Decimal('3.34'), Decimal('3.33'), Decimal('3.33')])
+        self.assertEqual(allocate('1.00', [1, 2]), [Decimal('0.33'), Decimal('0.67')])
+
+    def test_shares_always_sum_to_the_amount(self):
+        for amount in ('0.01', '0.05', '99.99', '1234.57'):
+            for weights in ([1] * 7, [70, 30], [33.3, 33.3, 33.4], [1, 0, 5]):
+                self.assertEqual(sum(allocate(amount, weights)), Decimal(amount))
+
+    def test_zero_weights_split_evenly(self):
+        self.assertEqual(allocate('9.00', [0, 0, 0]), [Decimal('3.00')] * 3)
+
+    def test_split_evenly(self):
+        self.assertEqual(split_evenly('0.20', 2), [Decimal('0.10'), Decimal('0.10')])
+        self.assertEqual(split_evenly('5', 0), [])
+
+
+class CreateExpenseSplitsGatewayTests(SimpleTestCase):
+    def setUp(self):
+        self.test_api = TestApiBackend()
+        patcher = patch('djangoapp.restapi.requests.Session.post', side_effect=self.test_api.post)
+        self.mock_post = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.member_rows = [
+            {"user_id": user_id, "contribution_percentage": "10"} for user_id in range(1, 11)
+        ]
+
+    def test_ten_members_take_one_write(self):
+        split_rows = create_expense_splits(7, "100.01", "equal", None, self.member_rows)
+
+        self.assertEqual(self.mock_post.call_count, 1)
+        self.assertTrue(self.mock_post.call_args.args[0].endswith("expense-splits/bulk"))
+        self.assertEqual(len(split_rows), 10)
+        self.assertEqual(sum(Decimal(row["amount_owed"]) for row in split_rows), Decimal("100.01"))
+
+    def test_custom_splits_are_sent_as_given(self):
+        split_rows = create_expense_splits(7, "30", "custom", [
+            {"user_id": 1, "amount_owed": "20"}, {"user_id": 2, "amount_owed": "10"},
+        ], self.member_rows)
+        self.assertEqual([row["amount_owed"] for row in split_rows], ["20", "10"])
+        self.assertEqual(self.mock_post.call_count, 1)
+
+
 class SharedExpenseAPITests(BaseTestCase):
     def setUp(self):
         super().setUp()
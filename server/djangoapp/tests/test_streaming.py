@@ -0,0 +1,177 @@
+"""
+Tests for the streamed list responses (djangoapp/streaming.py) and the
+views that use them.
+"""
+import json
+from datetime import date
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from djangoapp import streaming
+
+from .test_base import BaseTestCase
+from .test_api_backend import TestApiBackend
+
+
+class StreamJsonTests(SimpleTestCase):
+    def _decode(self, chunks):
+        return json.loads("".join(chunks))
+
+    def test_matches_the_whole_document(self):
+        items = [{"id": n, "date": date(2025, 1, n)} for n in range(1, 6)]
+        body = self._decode(streaming.stream_json("rows", iter(items), tail=lambda: {"count": 5}))
+        self.assertEqual(body, {
+            "rows": [{"id": n, "date": f"2025-01-0{n}"} for n in range(1, 6)],
+            "count": 5,
+        })
+
+    def test_empty_list(self):
+        self.assertEqual(self._decode(streaming.stream_json("rows", iter([]))), {"rows": []})
+
+    def test_items_are_chunked(self):
+        with patch.object(streaming, "CHUNK_ITEMS", 2):
+            chunks = list(streaming.stream_json("rows", iter(range(5))))
+        # "{...: [", three chunks of at most two items, "]", "}"
+        self.assertEqual(len(chunks), 6)
+        self.assertEqual(self._decode(chunks), {"rows": [0, 1, 2, 3, 4]})
+
+    def test_items_are_consumed_lazily(self):
+        consumed = []
+
+        def items():
+            for n in range(3):
+                consumed.append(n)
+                yield n
+
+        stream = streaming.stream_json("rows", items())
+        next(stream)
+        self.assertEqual(consumed, [])
+
+    def test_tail_runs_after_the_items(self):
+        seen = []
+
+        def items():
+            for n in range(3):
+                seen.append(n)
+                yield n
+
+        body = self._decode(streaming.stream_json("rows", items(), tail=lambda: {"seen": len(seen)}))
+        self.assertEqual(body["seen"], 3)
+
+    def test_failure_mid_stream_marks_the_document_incomplete(self):
+        def items():
+            yield from range(3)
+            raise streaming.PageFetchError("transactions/: page after 3 could not be fetched")
+
+        with self.assertLogs("djangoapp.streaming", "ERROR"):
+            body = self._decode(streaming.stream_json("rows", items(), tail=lambda: {"count": 3}))
+        self.assertEqual(body["rows"], [0, 1, 2])
+        self.assertIs(body["complete"], False)
+        self.assertIn("error", body)
+        self.assertNotIn("count", body)
+
+    def test_failing_tail_marks_the_document_incomplete(self):
+        def tail():
+            raise RuntimeError("backend down")
+
+        with self.assertLogs("djangoapp.streaming", "ERROR"):
+            body = self._decode(streaming.stream_json("rows", iter([1]), tail=tail))
+        self.assertEqual(body["rows"], [1])
+        self.assertIs(body["complete"], False)
+
+
+class IterRowsTests(SimpleTestCase):
+    def setUp(self):
+        self.test_api = TestApiBackend()
+        patcher = patch("djangoapp.restapi.requests.Session.get", side_effect=self.test_api.get)
+        self.mock_get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        for day in range(1, 8):
+            self.test_api.seed("transactions", {"user_id": 1, "date": f"2025-01-0{day}"})
+
+    def test_walks_every_page(self):
+        rows = list(streaming.iter_rows("transactions/", ("-date", "-id"), page_size=3, user_id=1))
+        self.assertEqual([r["id"] for r in rows], [7, 6, 5, 4, 3, 2, 1])
+        self.assertEqual(self.mock_get.call_count, 3)
+
+    def test_fetches_pages_on_demand(self):
+        rows = streaming.iter_rows("transactions/", ("-date", "-id"), page_size=3, user_id=1)
+        next(rows)
+        self.assertEqual(self.mock_get.call_count, 1)
+
+    def test_streams_past_the_api_page_cap(self):
+        for _ in range(1200):
+            self.test_api.seed("transactions", {"user_id": 2, "date": "2025-02-01"})
+        rows = list(streaming.iter_rows("transactions/", ("-date", "-id"), user_id=2))
+        self.assertEqual(len(rows), 1200)
+        self.assertEqual(len({r["id"] for r in rows}), 1200)
+
+    def test_failed_first_page_raises_before_streaming(self):
+        with patch("djangoapp.streaming.page_request", return_value=(None, None)):
+            with self.assertRaises(streaming.PageFetchError):
+                streaming.iter_rows("transactions/", ("-id",))
+
+    def test_failed_later_page_raises_mid_stream(self):
+        rows = streaming.iter_rows("transactions/", ("-date", "-id"), page_size=3, user_id=1)
+        with patch("djangoapp.streaming.page_request", return_value=(None, None)):
+            with self.assertRaises(streaming.PageFetchError):
+                list(rows)
+
+
+class StreamedIncomeListTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user1)
+        self.test_api = TestApiBackend()
+        patcher = patch("djangoapp.restapi.requests.Session.get", side_effect=self.test_api.get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        for day, source, amount in ((1, "Salary", "3000.00"), (2, "Freelance", "500.00"), (3, "Salary", "3000.00")):
+            self.test_api.seed("incomes", {
+                "user_id": self.user1.id, "amount": amount, "source": source,
+                "date_received": f"2025-01-0{day}", "period_start": "2025-01-01", "period_end": "2025-01-31",
+            })
+
+    def test_summary_is_totalled_from_the_streamed_rows(self):
+        with patch.object(streaming, "PAGE_SIZE", 2):
+            response = self.client.get(reverse("djangoapp:get_incomes"))
+        self.assertTrue(response.streaming)
+        data = self.response_json(response)
+
+        self.assertEqual([i["date_received"] for i in data["incomes"]], ["2025-01-03", "2025-01-02", "2025-01-01"])
+        self.assertEqual(data["count"], 3)
+        self.assertEqual(data["summary"]["total_income"], 6500.0)
+        self.assertEqual(data["by_source"], [
+            {"source": "Salary", "total": 6000.0}, {"source": "Freelance", "total": 500.0},
+        ])
+
+    def test_unreachable_api_is_a_500(self):
+        with patch("djangoapp.streaming.page_request", return_value=(None, None)):
+            response = self.client.get(reverse("djangoapp:get_incomes"))
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.status_code, 500)
+
+    def test_later_page_failure_is_reported_in_the_body(self):
+        real_page_request = streaming.page_request
+        pages = []
+
+        def flaky_page_request(*args, **kwargs):
+            pages.append(kwargs.get("after"))
+            if len(pages) > 1:
+                return None, None
+            return real_page_request(*args, **kwargs)
+
+        with patch.object(streaming, "PAGE_SIZE", 2), \
+                patch("djangoapp.streaming.page_request", side_effect=flaky_page_request), \
+                self.assertLogs("djangoapp.streaming", "ERROR"):
+            response = self.client.get(reverse("djangoapp:get_incomes"))
+            data = self.response_json(response)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(data["incomes"]), 2)
+        self.assertIs(data["complete"], False)
+        self.assertNotIn("summary", data)
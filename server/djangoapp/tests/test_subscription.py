@@ -2,13 +2,19 @@
 Tests for the Subscription model and its API endpoints.
 """
 
+import calendar
 import json
+import random
 from decimal import Decimal
-from datetime import timezone, timedelta
+from datetime import date, timezone, timedelta
+from types import SimpleNamespace
 
+from django.test import SimpleTestCase
 from django.urls import reverse
 
 from djangoapp.models.models import Subscription
+from djangoapp.services.spending_calculations import get_subscription_amount_for_period
+from djangoapp.views.subscriptions_views import get_subscriptions_data
 
 from .test_base import BaseTestCase
 from .test_api_backend import TestApiBackend
@@ -61,10 +67,10 @@ class SubscriptionAPITests(BaseTestCase):
         self.client.force_login(self.user1)
         # Set up mock API backend
         self.test_api = TestApiBackend()
-        self.get_patcher = patch('djangoapp.restapi.requests.get', side_effect=self.test_api.get)
-        self.post_patcher = patch('djangoapp.restapi.requests.post', side_effect=self.test_api.post)
-        self.patch_patcher = patch('djangoapp.restapi.requests.patch', side_effect=self.test_api.patch)
-        self.delete_patcher = patch('djangoapp.restapi.requests.delete', side_effect=self.test_api.delete)
+        self.get_patcher = patch('djangoapp.restapi.requests.Session.get', side_effect=self.test_api.get)
+        self.post_patcher = patch('djangoapp.restapi.requests.Session.post', side_effect=self.test_api.post)
+        self.patch_patcher = patch('djangoapp.restapi.requests.Session.patch', side_effect=self.test_api.patch)
+        self.delete_patcher = patch('djangoapp.restapi.requests.Session.delete', side_effect=self.test_api.delete)
         self.get_patcher.start()
         self.post_patcher.start()
         self.patch_patcher.start()
@@ -95,6 +101,15 @@ class SubscriptionAPITests(BaseTestCase):
         row.update(overrides)
         return self.test_api.seed("subscriptions", row)
 
+    def test_summary_counts_open_ended_subscriptions(self):
+        self._seed_subscription(end_date=None)
+        self._seed_subscription(name="Gym", amount="10.00")
+        self._seed_subscription(name="Old", end_date=(self.today - timedelta(days=400)).isoformat())
+
+        data = get_subscriptions_data(self.user1, "monthly")
+        self.assertEqual(data["subscription_count"], 2)
+        self.assertEqual(data["subscription_total"], 10000.0)
+
     def test_list_requires_auth(self):
         self.client.logout()
         response = self.client.get(reverse('djangoapp:subscriptions'))
@@ -105,7 +120,7 @@ class SubscriptionAPITests(BaseTestCase):
         self._seed_subscription()
         response = self.client.get(reverse('djangoapp:subscriptions'))
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = self.response_json(response)
         self.assertEqual(len(data['subscriptions']), 1)
         self.assertEqual(data['subscriptions'][0]['name'], 'Netflix')
         self.assertEqual(data['subscriptions'][0]['created_at'], self.today.isoformat())
@@ -192,4 +207,98 @@ class SubscriptionAPITests(BaseTestCase):
             reverse('djangoapp:subscription_status', kwargs={'subscription_id': sub['id']}),
             data=json.dumps({'status': 'not_a_real_status'}), content_type='application/json'
         )
-        self.assertEqual(response.status_code, 400)
\ No newline at end of file
+        self.assertEqual(response.status_code, 400)
+
+
+def _bills_on(subscription, day):
+    """Brute-force oracle: does `subscription` charge on `day`? Straight from the definition."""
+    start = subscription.start_date
+    if day < start or (subscription.end_date and day > subscription.end_date):
+        return False
+    if day == start:
+        return True
+    cycle = subscription.billing_cycle
+    if cycle in ('daily', 'weekly'):
+        return (day - start).days % (1 if cycle == 'daily' else 7) == 0
+    # Calendar cycles bill on start_date, then once per later month (or year)
+    months = (day.year - start.year) * 12 + day.month - start.month
+    if months == 0:
+        return False
+    wanted = subscription.billing_day if cycle == 'monthly' else start.day
+    if cycle == 'yearly' and months % 12:
+        return False
+    return day.day == min(wanted, calendar.monthrange(day.year, day.month)[1])
+
+
+class SubscriptionPeriodAmountTests(SimpleTestCase):
+    """get_subscription_amount_for_period against a day-by-day oracle."""
+
+    def _subscription(self, **overrides):
+        values = {
+            "amount": Decimal("9.99"), "billing_cycle": "monthly", "billing_day": 1,
+            "start_date": date(2025, 1, 1), "end_date": None, "status": "active",
+        }
+        values.update(overrides)
+        return SimpleNamespace(**values)
+
+    def _oracle(self, subscription, period_start, period_end):
+        days = (period_end - period_start).days + 1
+        charges = sum(
+            _bills_on(subscription, period_start + timedelta(days=offset)) for offset in range(days)
+        )
+        return subscription.amount * charges
+
+    def test_matches_oracle_on_random_cases(self):
+        rng = random.Random(1234)
+        origin = date(2023, 1, 1)
+        for _ in range(1500):
+            start = origin + timedelta(days=rng.randrange(1100))
+            subscription = self._subscription(
+                billing_cycle=rng.choice(('daily', 'weekly', 'monthly', 'yearly')),
+                billing_day=rng.randint(1, 31),
+                start_date=start,
+                end_date=rng.choice((None, start + timedelta(days=rng.randrange(900)))),
+            )
+            period_start = origin + timedelta(days=rng.randrange(1400))
+            period_end = period_start + timedelta(days=rng.randrange(500))
+            self.assertEqual(
+                get_subscription_amount_for_period(subscription, period_start, period_end),
+                self._oracle(subscription, period_start, period_end),
+                (subscription, period_start, period_end),
+            )
+
+    def test_inactive_subscription_costs_nothing(self):
+        subscription = self._subscription(status='cancelled')
+        self.assertEqual(get_subscription_amount_for_period(subscription, date(2025, 1, 1), date(2025, 12, 31)), 0)
+
+    def test_active_subscription_is_charged(self):
+        subscription = self._subscription(billing_day=15)
+        self.assertEqual(
+            get_subscription_amount_for_period(subscription, date(2025, 3, 1), date(2025, 5, 31)),
+            Decimal("29.97"),
+        )
+
+    def test_period_without_a_billing_date_costs_nothing(self):
+        subscription = self._subscription(billing_day=20)
+        self.assertEqual(get_subscription_amount_for_period(subscription, date(2025, 3, 1), date(2025, 3, 10)), 0)
+
+    def test_billing_day_clamps_to_short_months(self):
+        subscription = self._subscription(billing_day=31)
+        self.assertEqual(
+            get_subscription_amount_for_period(subscription, date(2025, 2, 1), date(2025, 2, 28)),
+            Decimal("9.99"),
+        )
+
+    def test_weekly_counts_whole_charges(self):
+        subscription = self._subscription(billing_cycle='weekly', start_date=date(2025, 1, 6))
+        self.assertEqual(
+            get_subscription_amount_for_period(subscription, date(2025, 1, 1), date(2025, 1, 31)),
+            Decimal("9.99") * 4,
+        )
+
+    def test_decades_long_period(self):
+        subscription = self._subscription(billing_cycle='daily', start_date=date(2000, 1, 1))
+        self.assertEqual(
+            get_subscription_amount_for_period(subscription, date(2000, 1, 1), date(2099, 12, 31)),
+            Decimal("9.99") * ((date(2099, 12, 31) - date(2000, 1, 1)).days + 1),
+        )
@@ -1,18 +1,39 @@
 """
-Tests for the SubscriptionPayment model and payment_toggle_paid endpoint.
+Tests for the SubscriptionPayment model, the billing schedule that
+generates payments, and the payment_toggle_paid endpoint.
 """
 
 import json
+from datetime import date, timedelta
 from decimal import Decimal
 
+from django.test import SimpleTestCase
 from django.urls import reverse
 from django.utils import timezone
 
 from djangoapp.models.models import Subscription, SubscriptionPayment
+from djangoapp.services.spending_calculations import compute_subscription_total
+from djangoapp.services.subscription_service import (
+    generate_payments_for_subscription,
+    get_billing_dates,
+    get_next_billing_date,
+)
 
 from .test_base import BaseTestCase
 
 
+def stepwise_billing_dates(start_date, end_date, billing_cycle, billing_day=1):
+    """The old generator: walk forward one billing date at a time, capped at 1000."""
+    dates = []
+    current = start_date
+    while current <= end_date:
+        dates.append(current)
+        current = get_next_billing_date(current, billing_cycle, billing_day)
+        if len(dates) > 1000:
+            break
+    return dates
+
+
 class SusbcriptionPaymentModelTests(BaseTestCase):
     def test_create_payment_usual(self):
         payment = self.create_subscription_payment()
@@ -80,6 +101,147 @@ class SusbcriptionPaymentModelTests(BaseTestCase):
         payment = self.create_subscription_payment()
         self.assertIsNone(payment.paid_date)
 
+class BillingScheduleTests(SimpleTestCase):
+    def test_matches_the_stepwise_loop(self):
+        for start in (date(2025, 1, 31), date(2025, 3, 15), date(2024, 12, 1)):
+            end = start + timedelta(days=800)
+            for cycle in ('daily', 'weekly', 'monthly', 'yearly', 'quarterly'):
+                for billing_day in (1, 15, 29, 31):
+                    self.assertEqual(
+                        get_billing_dates(start, end, cycle, billing_day),
+                        stepwise_billing_dates(start, end, cycle, billing_day),
+                        (start, cycle, billing_day),
+                    )
+
+    def test_no_iteration_cap(self):
+        start = date(2020, 1, 1)
+        dates = get_billing_dates(start, date(2025, 12, 31), 'daily')
+        self.assertEqual(len(dates), (date(2025, 12, 31) - start).days + 1)
+        self.assertEqual(dates[-1], date(2025, 12, 31))
+
+    def test_monthly_billing_day_is_clamped_each_month(self):
+        dates = get_billing_dates(date(2026, 1, 31), date(2026, 5, 31), 'monthly', billing_day=31)
+        self.assertEqual(dates, [
+            date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30), date(2026, 5, 31),
+        ])
+
+    def test_yearly_leap_day_returns_in_leap_years(self):
+        dates = get_billing_dates(date(2024, 2, 29), date(2028, 12, 31), 'yearly')
+        self.assertEqual(dates[1], date(2025, 2, 28))
+        self.assertEqual(dates[-1], date(2028, 2, 29))
+
+    def test_window_start_skips_earlier_dates(self):
+        start = date(2025, 1, 10)
+        self.assertEqual(
+            get_billing_dates(start, date(2025, 2, 1), 'weekly', window_start=date(2025, 1, 20)),
+            [date(2025, 1, 24), date(2025, 1, 31)],
+        )
+        self.assertEqual(
+            get_billing_dates(start, date(2025, 6, 30), 'monthly', billing_day=10, window_start=date(2025, 5, 11)),
+            [date(2025, 6, 10)],
+        )
+
+    def test_window_after_end_is_empty(self):
+        self.assertEqual(get_billing_dates(date(2025, 1, 1), date(2025, 2, 1), 'daily', window_start=date(2025, 3, 1)), [])
+
+
+class IncrementalPaymentGenerationTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.start = date(2022, 1, 1)
+        self.subscription = Subscription.objects.create(
+            user=self.user1, name='Coffee', amount=Decimal('3.50'), category='Food',
+            billing_cycle='daily', start_date=self.start, status='active'
+        )
+
+    def test_first_run_creates_every_payment_and_sets_the_mark(self):
+        up_to = date(2025, 12, 31)
+        created = generate_payments_for_subscription(self.subscription, up_to)
+
+        expected = (up_to - self.start).days + 1
+        self.assertEqual(len(created), expected)
+        self.assertEqual(SubscriptionPayment.objects.filter(subscription=self.subscription).count(), expected)
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.materialized_through, up_to)
+
+    def test_later_runs_only_add_new_dates(self):
+        generate_payments_for_subscription(self.subscription, date(2025, 12, 29))
+
+        # Load the existing due dates, then one bulk insert and the mark update
+        with self.assertNumQueries(3):
+            created = generate_payments_for_subscription(self.subscription, date(2025, 12, 31))
+        self.assertEqual([p.due_date for p in created], [date(2025, 12, 30), date(2025, 12, 31)])
+
+    def test_rerun_for_the_same_day_does_nothing(self):
+        generate_payments_for_subscription(self.subscription, date(2025, 1, 31))
+        with self.assertNumQueries(0):
+            self.assertEqual(generate_payments_for_subscription(self.subscription, date(2025, 1, 31)), [])
+
+    def test_existing_payments_are_kept(self):
+        paid = SubscriptionPayment.objects.create(
+            subscription=self.subscription, due_date=self.start, amount=Decimal('3.50'),
+            is_paid=True, paid_date=self.start
+        )
+        created = generate_payments_for_subscription(self.subscription, date(2022, 1, 3))
+
+        self.assertEqual(len(created), 2)
+        paid.refresh_from_db()
+        self.assertTrue(paid.is_paid)
+
+    def test_end_date_caps_generation(self):
+        self.subscription.end_date = date(2022, 1, 10)
+        self.subscription.save()
+        created = generate_payments_for_subscription(self.subscription, date(2022, 3, 1))
+        self.assertEqual(len(created), 10)
+        self.assertEqual(self.subscription.materialized_through, date(2022, 1, 10))
+
+    def test_clearing_the_mark_fills_gaps(self):
+        generate_payments_for_subscription(self.subscription, date(2022, 1, 10))
+        SubscriptionPayment.objects.filter(subscription=self.subscription, due_date=date(2022, 1, 5)).delete()
+
+        Subscription.objects.filter(pk=self.subscription.pk).update(materialized_through=None)
+        self.subscription.refresh_from_db()
+        created = generate_payments_for_subscription(self.subscription, date(2022, 1, 10))
+        self.assertEqual([p.due_date for p in created], [date(2022, 1, 5)])
+
+
+class SubscriptionTotalTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.netflix = self.create_subscription()
+        self.gym = Subscription.objects.create(
+            user=self.user1, name='Gym', amount=Decimal('40'), category='Health',
+            billing_cycle='monthly', billing_day=1, start_date=date(2025, 1, 1), status='active',
+        )
+        for subscription, due_date, amount in (
+            (self.netflix, date(2025, 1, 5), '10.00'),
+            (self.netflix, date(2025, 2, 5), '10.00'),
+            (self.gym, date(2025, 1, 1), '40.00'),
+            (self.gym, date(2025, 2, 1), '40.00'),
+        ):
+            SubscriptionPayment.objects.create(subscription=subscription, due_date=due_date, amount=Decimal(amount))
+
+    def test_filters_by_due_date_window(self):
+        self.assertEqual(compute_subscription_total(self.user1, date(2025, 1, 1), date(2025, 1, 31)), 50.0)
+
+    def test_window_is_inclusive(self):
+        self.assertEqual(compute_subscription_total(self.user1, date(2025, 1, 5), date(2025, 2, 1)), 50.0)
+
+    def test_filters_by_category_case_insensitively(self):
+        self.assertEqual(compute_subscription_total(self.user1, category='health'), 80.0)
+
+    def test_no_window_is_lifetime_total(self):
+        self.assertEqual(compute_subscription_total(self.user1), 100.0)
+
+    def test_inactive_subscriptions_are_excluded(self):
+        Subscription.objects.filter(pk=self.gym.pk).update(status='cancelled')
+        self.assertEqual(compute_subscription_total(self.user1), 20.0)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            compute_subscription_total(self.user1, date(2025, 1, 1), date(2025, 1, 31), 'Entertainment')
+
+
 class SubscriptionPaymentAPITests(BaseTestCase):
     def setUp(self):
         super().setUp()
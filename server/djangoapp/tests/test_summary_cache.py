@@ -0,0 +1,225 @@
+"""
+Tests for the per-user summary cache in djangoapp/summary_cache.py and
+the dashboard loads it serves.
+"""
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+import requests
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase
+from django.urls import reverse
+
+from djangoapp import summary_cache
+from djangoapp.restapi import ApiReadError
+from djangoapp.services.transaction_frame import LazyTransactionFrame
+from djangoapp.views.incomes_views import get_income_summary
+
+from .test_base import BaseTestCase
+from .test_api_backend import TestApiBackend
+
+
+class SummaryCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return {"total": self.calls}
+
+    def test_repeat_reads_are_served_from_cache(self):
+        first = summary_cache.get_or_compute("totals", 1, self.compute, "monthly")
+        second = summary_cache.get_or_compute("totals", 1, self.compute, "monthly")
+        self.assertEqual(first, second)
+        self.assertEqual(self.calls, 1)
+
+    def test_key_includes_user_and_parts(self):
+        summary_cache.get_or_compute("totals", 1, self.compute, "monthly")
+        summary_cache.get_or_compute("totals", 1, self.compute, "weekly")
+        summary_cache.get_or_compute("totals", 2, self.compute, "monthly")
+        self.assertEqual(self.calls, 3)
+
+    def test_bump_invalidates_only_that_user(self):
+        summary_cache.get_or_compute("totals", 1, self.compute)
+        summary_cache.get_or_compute("totals", 2, self.compute)
+        summary_cache.bump_version(1)
+
+        self.assertEqual(summary_cache.get_or_compute("totals", 1, self.compute), {"total": 3})
+        self.assertEqual(summary_cache.get_or_compute("totals", 2, self.compute), {"total": 2})
+
+    def test_evicted_version_does_not_revive_old_entries(self):
+        summary_cache.get_or_compute("totals", 1, self.compute)
+        cache.delete(summary_cache._version_key(1))
+        summary_cache.get_or_compute("totals", 1, self.compute)
+        self.assertEqual(self.calls, 2)
+
+    def test_none_is_not_cached(self):
+        summary_cache.get_or_compute("totals", 1, lambda: None)
+        self.assertEqual(summary_cache.get_or_compute("totals", 1, self.compute), {"total": 1})
+
+    def test_failed_compute_is_not_cached(self):
+        def fail():
+            raise ApiReadError("GET transactions/ failed")
+
+        with self.assertRaises(ApiReadError):
+            summary_cache.get_or_compute("totals", 1, fail)
+        self.assertEqual(summary_cache.get_or_compute("totals", 1, self.compute), {"total": 1})
+
+    def test_decorator_keys_on_user_and_period_only(self):
+        @summary_cache.cached_summary("section")
+        def section(user, period, frame=None):
+            return self.compute()
+
+        section(1, "monthly", frame=object())
+        section(1, "monthly", frame=object())
+        section(1, "yearly")
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(section.uncached(1, "monthly"), {"total": 3})
+
+
+class DashboardSummaryCacheTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user1)
+        self.test_api = TestApiBackend()
+        self.mocks = {}
+        for verb in ("get", "post", "patch", "delete"):
+            patcher = patch(
+                f"djangoapp.restapi.requests.Session.{verb}",
+                side_effect=getattr(self.test_api, verb),
+            )
+            self.mocks[verb] = patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.test_api.seed("transactions", {
+            "user_id": self.user1.id, "amount": "25.00", "category": "Food", "date": self.today.isoformat(),
+        })
+
+    def dashboard(self, period="monthly"):
+        response = self.client.get(reverse("djangoapp:dashboard"), {"period": period})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["dashboard"]
+
+    def test_repeat_load_makes_no_api_calls(self):
+        first = self.dashboard()
+        calls = self.mocks["get"].call_count
+        self.assertGreater(calls, 0)
+
+        self.assertEqual(self.dashboard(), first)
+        self.assertEqual(self.mocks["get"].call_count, calls)
+
+    def test_periods_are_cached_separately(self):
+        self.dashboard("monthly")
+        calls = self.mocks["get"].call_count
+        self.dashboard("yearly")
+        self.assertGreater(self.mocks["get"].call_count, calls)
+
+    def test_creating_a_transaction_refreshes_the_dashboard(self):
+        self.assertEqual(self.dashboard()["categories"]["total"], 25.0)
+
+        response = self.client.post(
+            reverse("djangoapp:transaction_create"),
+            json.dumps({
+                "amount": "15.00", "description": "Lunch", "category": "Food",
+                "date": (self.today - timedelta(days=1)).isoformat(),
+            }),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+
+        data = self.dashboard()
+        self.assertEqual(data["categories"]["total"], 40.0)
+        self.assertEqual(data["budgets"]["total_spent"], 40.0)
+
+    def test_deleting_a_transaction_refreshes_the_dashboard(self):
+        row = self.test_api.seed("transactions", {
+            "user_id": self.user1.id, "amount": "5.00", "category": "Food", "date": self.today.isoformat(),
+        })
+        self.assertEqual(self.dashboard()["income"]["total_spent"], 30.0)
+
+        response = self.client.delete(
+            reverse("djangoapp:transaction_delete"),
+            json.dumps({"ids": [row["id"]]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.dashboard()["income"]["total_spent"], 25.0)
+
+    def test_creating_an_income_refreshes_the_dashboard(self):
+        self.assertEqual(self.dashboard()["income"]["total_income"], 0.0)
+
+        response = self.client.post(
+            reverse("djangoapp:income_create"),
+            json.dumps({
+                "amount": "1000.00", "source": "Salary", "date_received": self.today.isoformat(),
+                "period_start": self.today.isoformat(), "period_end": self.today.isoformat(),
+            }),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.dashboard()["income"]["total_income"], 1000.0)
+
+    def test_other_users_writes_keep_the_cache(self):
+        self.dashboard()
+        calls = self.mocks["get"].call_count
+        summary_cache.bump_version(self.user2)
+        self.dashboard()
+        self.assertEqual(self.mocks["get"].call_count, calls)
+
+    def test_failed_load_is_recomputed_next_time(self):
+        self.mocks["get"].side_effect = requests.ConnectionError("API down")
+        # Yearly has no transaction frame, so every section reads the API itself
+        response = self.client.get(reverse("djangoapp:dashboard"), {"period": "yearly"})
+        self.assertEqual(response.status_code, 500)
+
+        self.mocks["get"].side_effect = self.test_api.get
+        data = self.dashboard("yearly")
+        self.assertEqual(data["categories"]["total"], 25.0)
+        self.assertEqual(data["income"]["total_spent"], 25.0)
+
+    def test_failed_income_summary_is_recomputed_next_time(self):
+        self.test_api.seed("incomes", {"user_id": self.user1.id, "amount": "1000.00", "source": "Salary"})
+        request = RequestFactory().get("/")
+        request.user = self.user1
+
+        self.mocks["get"].side_effect = requests.ConnectionError("API down")
+        self.assertEqual(get_income_summary(request).status_code, 500)
+
+        self.mocks["get"].side_effect = self.test_api.get
+        response = get_income_summary(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content)["summary"]), 1)
+
+    def test_income_summary_is_cached(self):
+        request = RequestFactory().get("/")
+        request.user = self.user1
+        self.assertEqual(get_income_summary(request).status_code, 200)
+        calls = self.mocks["get"].call_count
+
+        self.assertEqual(get_income_summary(request).status_code, 200)
+        self.assertEqual(self.mocks["get"].call_count, calls)
+
+
+class LazyTransactionFrameTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.test_api = TestApiBackend()
+        patcher = patch("djangoapp.restapi.requests.Session.get", side_effect=self.test_api.get)
+        self.mock_get = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.test_api.seed("transactions", {
+            "user_id": self.user1.id, "amount": "2.50", "category": "Food", "date": self.today.isoformat(),
+        })
+
+    def test_loads_on_first_use_only(self):
+        frame = LazyTransactionFrame(self.user1)
+        self.assertFalse(frame.loaded)
+        self.mock_get.assert_not_called()
+
+        self.assertEqual(frame.total(), 2.5)
+        self.assertEqual(len(frame), 1)
+        self.assertEqual(frame.totals_by_category(), {"Food": 2.5})
+        self.assertTrue(frame.loaded)
+        self.assertEqual(self.mock_get.call_count, 1)
@@ -34,6 +34,27 @@ class TransactionModelTests(BaseTestCase):
             description='No category', category=None, date=self.today
         )
         self.assertIsNone(tx.category)
+        self.assertIsNone(tx.category_key)
+
+    def test_category_key_is_normalized_on_save(self):
+        tx = Transaction.objects.create(
+            user=self.user1, amount=Decimal('100'),
+            description='Lunch', category='  Eating Out ', date=self.today
+        )
+        self.assertEqual(tx.category_key, 'eating out')
+
+        tx.category = 'Groceries'
+        tx.save(update_fields=['category'])
+        tx.refresh_from_db()
+        self.assertEqual(tx.category_key, 'groceries')
+
+    def test_total_filters_by_category_key(self):
+        from djangoapp.services.spending_calculations import compute_transaction_total
+        for category in ('Food', 'food', 'FOOD ', 'Rent'):
+            Transaction.objects.create(
+                user=self.user1, amount=Decimal('10'), description='x', category=category, date=self.today
+            )
+        self.assertEqual(compute_transaction_total(self.user1, category='Food'), 30.0)
 
     def test_negative_amount_fails_validation(self):
         tx = Transaction(
@@ -65,10 +86,10 @@ class TransactionAPITests(BaseTestCase):
         self.client.force_login(self.user1)
         # Set up mock API backend
         self.test_api = TestApiBackend()
-        self.get_patcher = patch('djangoapp.restapi.requests.get', side_effect=self.test_api.get)
-        self.post_patcher = patch('djangoapp.restapi.requests.post', side_effect=self.test_api.post)
-        self.patch_patcher = patch('djangoapp.restapi.requests.patch', side_effect=self.test_api.patch)
-        self.delete_patcher = patch('djangoapp.restapi.requests.delete', side_effect=self.test_api.delete)
+        self.get_patcher = patch('djangoapp.restapi.requests.Session.get', side_effect=self.test_api.get)
+        self.post_patcher = patch('djangoapp.restapi.requests.Session.post', side_effect=self.test_api.post)
+        self.patch_patcher = patch('djangoapp.restapi.requests.Session.patch', side_effect=self.test_api.patch)
+        self.delete_patcher = patch('djangoapp.restapi.requests.Session.delete', side_effect=self.test_api.delete)
         self.get_patcher.start()
         self.post_patcher.start()
         self.patch_patcher.start()
@@ -109,7 +130,7 @@ class TransactionAPITests(BaseTestCase):
         })
         response = self.client.get(reverse('djangoapp:transactions'))
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = self.response_json(response)
         self.assertEqual(len(data['transactions']), 1)
 
     def test_list_filters_by_category(self):
@@ -122,10 +143,65 @@ class TransactionAPITests(BaseTestCase):
             "date": self.today.isoformat(),
         })
         response = self.client.get(reverse('djangoapp:transactions'), {'category': 'Food'})
-        data = response.json()
+        data = self.response_json(response)
         self.assertEqual(len(data['transactions']), 1)
         self.assertEqual(data['transactions'][0]['category'], 'Food')
+
+    def test_list_category_filter_ignores_case(self):
+        self._seed_transaction(description='A', category='Food')
+        response = self.client.get(reverse('djangoapp:transactions'), {'category': 'food'})
+        self.assertEqual(len(self.response_json(response)['transactions']), 1)
         
+    def _seed_days(self):
+        # Two transactions per day over five days, so pages split ties
+        for offset in range(5):
+            for n in range(2):
+                self._seed_transaction(
+                    description=f"day {offset} #{n}",
+                    date=(self.today - timezone.timedelta(days=offset)).isoformat(),
+                )
+
+    def test_list_is_newest_first(self):
+        self._seed_days()
+        data = self.response_json(self.client.get(reverse('djangoapp:transactions')))
+        keys = [(t['date'], t['id']) for t in data['transactions']]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+        self.assertIsNone(data['next_cursor'])
+
+    def test_pages_cover_every_transaction_once(self):
+        self._seed_days()
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.response_json(self.client.get(reverse('djangoapp:transactions'), params))
+            seen += [(t['date'], t['id']) for t in data['transactions']]
+            pages += 1
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(pages, 4)
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(seen, sorted(set(seen), reverse=True))
+
+    def test_page_size_is_capped(self):
+        with patch('djangoapp.views.transactions_views.page_request', return_value=([], None)) as page:
+            self.client.get(reverse('djangoapp:transactions'), {'limit': 10000})
+        self.assertEqual(page.call_args.args[2], 200)
+
+    def test_failed_page_is_an_error_not_an_empty_history(self):
+        self._seed_transaction()
+        with patch('djangoapp.views.transactions_views.page_request', return_value=(None, None)):
+            response = self.client.get(reverse('djangoapp:transactions'), {'limit': 3})
+        self.assertEqual(response.status_code, 500)
+        self.assertNotIn('transactions', self.response_json(response))
+
+    def test_invalid_page_params_are_rejected(self):
+        for params in ({'limit': 0}, {'limit': 'ten'}, {'cursor': 'nope'}, {'cursor': '2025-01-01,x'}):
+            response = self.client.get(reverse('djangoapp:transactions'), params)
+            self.assertEqual(response.status_code, 400, params)
+
     def test_post_via_transactions_endpoint_creates_transaction(self):
         payload = {
             'amount': 1500,
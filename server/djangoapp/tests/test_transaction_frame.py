@@ -0,0 +1,190 @@
+"""
+Tests for the columnar TransactionFrame in services/transaction_frame.py
+and the dashboard sections computed from it.
+"""
+import random
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from djangoapp.services import transaction_frame
+from djangoapp.services.transaction_frame import TransactionFrame
+
+from .test_base import BaseTestCase
+from .test_api_backend import TestApiBackend, TestResponse
+
+
+def sample_rows(count, seed=0):
+    rng = random.Random(seed)
+    start = date(2022, 11, 20)
+    return [
+        {
+            "id": i,
+            "user_id": 1,
+            "amount": f"{rng.randint(1, 200000) / 100:.2f}",
+            "category": rng.choice(("Food", "Rent", "Transport", None, "")),
+            "date": (start + timedelta(days=rng.randint(0, 800))).isoformat(),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def bucket_start(value, bucket):
+    day = date.fromisoformat(value)
+    return {
+        "day": day,
+        "month": day.replace(day=1),
+        "year": day.replace(month=1, day=1),
+    }[bucket].isoformat()
+
+
+class PythonFrameTests(SimpleTestCase):
+    """The pure-Python columns, used when NumPy isn't installed."""
+    vectorized = False
+
+    def frame(self, rows):
+        return TransactionFrame.from_rows(rows, vectorized=self.vectorized)
+
+    def test_columns(self):
+        frame = self.frame([
+            {"amount": "12.34", "category": "Food", "date": "2025-01-02"},
+            {"amount": "0.29", "category": None, "date": "2025-01-03"},
+            {"amount": "5", "category": "Food", "date": "2025-01-03"},
+        ])
+        self.assertEqual(frame.vectorized, self.vectorized)
+        self.assertEqual(len(frame), 3)
+        self.assertEqual(list(frame.cents), [1234, 29, 500])
+        self.assertEqual(
+            [frame.categories[code] for code in frame.codes],
+            ["Food", "Uncategorized", "Food"],
+        )
+
+    def test_empty(self):
+        frame = self.frame([])
+        self.assertEqual(frame.total(), Decimal("0.00"))
+        self.assertEqual(frame.totals_by("month"), {})
+        self.assertEqual(frame.totals_by_category(), {})
+
+    def test_totals_match_summing_rows(self):
+        rows = sample_rows(500)
+        frame = self.frame(rows)
+
+        for bucket in ("day", "month", "year"):
+            expected = {}
+            for row in rows:
+                key = bucket_start(row["date"], bucket)
+                expected[key] = expected.get(key, Decimal("0")) + Decimal(row["amount"])
+            self.assertEqual(frame.totals_by(bucket), expected)
+            self.assertEqual(list(frame.totals_by(bucket)), sorted(expected))
+
+        by_category = {}
+        for row in rows:
+            category = row["category"] or "Uncategorized"
+            by_category[category] = by_category.get(category, Decimal("0")) + Decimal(row["amount"])
+        self.assertEqual(frame.totals_by_category(), by_category)
+
+        self.assertEqual(frame.total(), sum(Decimal(row["amount"]) for row in rows))
+
+    def test_window_total_is_inclusive(self):
+        rows = sample_rows(300, seed=1)
+        frame = self.frame(rows)
+        start, end = date(2023, 3, 1), date(2023, 9, 30)
+
+        self.assertEqual(
+            frame.total(start, end),
+            sum(Decimal(r["amount"]) for r in rows if start.isoformat() <= r["date"] <= end.isoformat()),
+        )
+        self.assertEqual(
+            frame.total(start=start),
+            sum(Decimal(r["amount"]) for r in rows if r["date"] >= start.isoformat()),
+        )
+        self.assertEqual(frame.total(start, start), frame.totals_by("day").get(start.isoformat(), 0))
+
+
+@unittest.skipUnless(transaction_frame.np is not None, "NumPy is not installed")
+class NumpyFrameTests(PythonFrameTests):
+    """The same checks against the NumPy columns."""
+    vectorized = True
+
+    def test_backends_agree(self):
+        rows = sample_rows(2000, seed=2)
+        vectorized = TransactionFrame.from_rows(rows, vectorized=True)
+        python = TransactionFrame.from_rows(rows, vectorized=False)
+        for bucket in ("day", "month", "year"):
+            self.assertEqual(vectorized.totals_by(bucket), python.totals_by(bucket))
+        self.assertEqual(vectorized.totals_by_category(), python.totals_by_category())
+
+
+class DashboardFrameTests(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user1)
+        self.test_api = TestApiBackend()
+        patcher = patch('djangoapp.restapi.requests.Session.get', side_effect=self.test_api.get)
+        self.mock_get = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch(
+            'djangoapp.restapi.requests.Session.post',
+            return_value=TestResponse({"generated": 0}, 200),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        for days_ago, amount, category in ((0, "10.00", "Food"), (1, "2.50", "Food"), (2, "40.00", "Rent")):
+            self.test_api.seed("transactions", {
+                "user_id": self.user1.id,
+                "amount": amount,
+                "category": category,
+                "date": (self.today - timedelta(days=days_ago)).isoformat(),
+            })
+
+    def transaction_urls(self):
+        return [
+            call.args[0].split("/api/", 1)[1]
+            for call in self.mock_get.call_args_list
+            if "transactions" in call.args[0]
+        ]
+
+    def test_transactions_are_loaded_once(self):
+        response = self.client.get(reverse('djangoapp:dashboard'), {"period": "monthly"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.transaction_urls(), ["transactions/"])
+
+        data = response.json()["dashboard"]
+        self.assertEqual(sum(day["total"] for day in data["transactions"]), 52.5)
+        by_category = {c["category"]: c["transactions"] for c in data["categories"]["categories"]}
+        self.assertEqual(by_category, {"Food": 12.5, "Rent": 40.0})
+        self.assertEqual(data["budgets"]["total_spent"], 52.5)
+        self.assertEqual(data["income"]["total_spent"], 52.5)
+
+    def test_long_periods_use_grouped_totals(self):
+        for period in ("yearly", "total"):
+            self.mock_get.reset_mock()
+            response = self.client.get(reverse('djangoapp:dashboard'), {"period": period})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("transactions/", self.transaction_urls(), period)
+            self.assertIn("transactions/buckets", self.transaction_urls(), period)
+
+            data = response.json()["dashboard"]
+            self.assertEqual(sum(bucket["total"] for bucket in data["transactions"]), 52.5)
+            self.assertEqual(data["categories"]["transaction_total"], 52.5)
+            self.assertEqual(data["budgets"]["total_spent"], 52.5)
+
+    def test_failed_load_is_an_error(self):
+        with patch("djangoapp.services.transaction_frame.get_request", return_value=None):
+            with self.assertRaises(transaction_frame.TransactionFetchError):
+                transaction_frame.load_transaction_frame(self.user1)
+            response = self.client.get(reverse('djangoapp:dashboard'), {"period": "weekly"})
+        self.assertEqual(response.status_code, 500)
+
+
+class PeriodFrameTests(SimpleTestCase):
+    def test_only_short_bounded_periods_get_a_frame(self):
+        end = date(2025, 3, 31)
+        self.assertIsNotNone(transaction_frame.period_frame(None, end - timedelta(days=30), end))
+        self.assertIsNone(transaction_frame.period_frame(None, end - timedelta(days=365), end))
+        self.assertIsNone(transaction_frame.period_frame(None))
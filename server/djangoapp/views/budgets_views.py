@@ -7,11 +7,13 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
 from ..restapi import get_request, post_request, patch_request, delete_request
-from ..services.api_adapters import budget_from_row
+from ..services.api_adapters import budget_from_row, get_total
 from ..services.date_filter import get_date_bounds
+from ..services.category_keys import category_key
+from ..summary_cache import bump_version, cached_summary
 from ..services.budgets_service import (
-    reset_expired_budgets,
     compute_budget_spent,
+    compute_budgets_spent,
     get_transactions_for_budget,
     get_subscriptions_for_budget,
     update_budget,
@@ -24,8 +26,12 @@ def _iso_date(dt):
     return dt.date().isoformat() if hasattr(dt, "date") else dt.isoformat()
 
 
-def get_budgets_data(user, period):
-    """Get budget summary for dashboard."""
+@cached_summary("budgets")
+def get_budgets_data(user, period, frame=None):
+    """
+    Get budget summary for dashboard. Spending comes from `frame` (the
+    period's TransactionFrame) when given, otherwise from the API.
+    """
     start, end = get_date_bounds(period)
 
     budget_params = {"user_id": user.id}
@@ -36,12 +42,12 @@ def get_budgets_data(user, period):
         budget_params["period_start__lte"] = _iso_date(end)
         transaction_params["date__gte"] = _iso_date(start)
         transaction_params["date__lte"] = _iso_date(end)
-    # Get budgets for the period
-    budgets = get_request("budgets/", **budget_params) or []
-    transactions = get_request("transactions/", **transaction_params) or []
-
-    total_budgeted = sum((Decimal(str(b["amount"])) for b in budgets), Decimal("0"))
-    total_spent = sum((Decimal(str(t["amount"])) for t in transactions), Decimal("0"))
+    # Totals for the period, summed by the API
+    total_budgeted = get_total("budgets/", **budget_params)
+    if frame is not None:
+        total_spent = frame.total()
+    else:
+        total_spent = get_total("transactions/", **transaction_params)
     remaining = total_budgeted - total_spent
     percent_used = round(float(total_spent / total_budgeted) * 100, 1) if total_budgeted > 0 else 0
 
@@ -64,17 +70,20 @@ def get_budgets(request):
         return JsonResponse(
             {"error": "Method Not Allowed"}, status=405
         )
-    
-    reset_expired_budgets(request.user)
 
+    # Expired budgets are rolled over by the background scheduler
+    # (djangoapp/scheduler.py), not on this request.
     try:
         rows = get_request("budgets/", user_id=request.user.id) or []
         budgets = [budget_from_row(r) for r in rows if r["is_active"]]
         budgets.sort(key=lambda b: b.period_start, reverse=True)
 
+        # Two gateway reads for the whole list, not two per budget
+        spent_by_budget = compute_budgets_spent(request.user, budgets)
+
         budgets_data = []
         for budget in budgets:
-            spent_breakdown = compute_budget_spent(budget)
+            spent_breakdown = spent_by_budget[budget.id]
             spent = spent_breakdown["total"]
 
             budgets_data.append({
@@ -198,7 +207,14 @@ def budget_create(request):
     for field in required_fields:
         if field not in data:
             return JsonResponse({"error":f"Missing field: {field}"}, status=400)
-        
+
+    # The table allows one row per category per period (old periods stay
+    # as inactive history), so an active budget for the category is what
+    # counts as a duplicate.
+    existing = get_request("budgets/", user_id=request.user.id, category_key=category_key(data["category"])) or []
+    if any(r["is_active"] for r in existing):
+        return JsonResponse({"error": "A budget for this category already exists"}, status=400)
+
     row = post_request("budgets/", {
         "user_id": request.user.id,
         "category": data["category"],
@@ -213,6 +229,7 @@ def budget_create(request):
 
     if not row:
         return JsonResponse({"error": "Failed to create budget"}, status=500)
+    bump_version(request.user)
 
     return JsonResponse({
         "message": "Budget created successfully",
@@ -240,6 +257,7 @@ def update_budget_view(request, budget_id):
 
     if not result["success"]:
         return JsonResponse({"error": result["error"]}, status=404)
+    bump_version(request.user)
 
     budget = result["budget"]
     spent = compute_budget_spent(budget)["total"]
@@ -287,6 +305,7 @@ def toggle_recurring(request, budget_id):
     updated = patch_request(f"budgets/{budget_id}", payload)
     if not updated:
         return JsonResponse({"error": "Failed to update budget"}, status=500)
+    bump_version(request.user)
 
     return JsonResponse({
         "message": "Budget recurring status updated",
@@ -311,4 +330,5 @@ def budget_delete(request, budget_id):
         return JsonResponse({"error": "Budget not found"}, status=404)
 
     delete_request(f"budgets/{budget_id}")
+    bump_version(request.user)
     return JsonResponse({"message": "Budget deleted successfully"})
\ No newline at end of file
@@ -4,7 +4,6 @@ import json
 import logging
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from decimal import Decimal
 from datetime import datetime, timedelta
 from django.utils import timezone
 from collections import defaultdict
@@ -12,8 +11,18 @@ from collections import defaultdict
 from .budgets_views import get_budgets_data
 from .incomes_views import get_income_data
 
-from ..restapi import get_request, post_request, patch_request, delete_request
+from ..restapi import (
+    get_request,
+    post_request,
+    patch_request,
+    delete_request,
+    aggregate_request,
+    require,
+    run_concurrently,
+)
 from ..services.date_filter import get_date_bounds, get_period_label, get_period_display_dates
+from ..services.money import ZERO, Money
+from ..services.transaction_frame import period_frame
 from ..services.api_adapters import (
     transaction_from_row,
     subscription_from_row,
@@ -24,6 +33,7 @@ from ..services.api_adapters import (
     get_user_email,
     get_user_data
 )
+from ..summary_cache import cached_summary
 
 logger = logging.getLogger(__name__)
 
@@ -31,27 +41,21 @@ def _iso_date(dt):
     """Normalize a datetime or date into a plain YYYY-MM-DD string."""
     return dt.date().isoformat() if hasattr(dt, "date") else dt.isoformat()
 
-def _group_daily(transactions):
+def _group_daily(totals):
     """Single bar for today"""
     today = timezone.now().date()
-    total = sum((Decimal(str(t["amount"])) for t in transactions if t["date"] == today.isoformat()), Decimal('0'))
+    total = totals.get(today.isoformat(), ZERO)
     return [{
         "label": "Today",
         "date": today.isoformat(),
         "total": float(total)
     }]
 
-def _group_by_day(transactions, days: int):
+def _group_by_day(totals, days: int):
     """Group by each day for the last N days"""
     today = timezone.now().date()
     start_date = today - timedelta(days=days - 1)
 
-    # Create lookup dict for totals by date
-    data_by_date = defaultdict(Decimal)
-    for t in transactions:
-        if t["date"]:
-            data_by_date[t["date"]] += Decimal(str(t["amount"]))
-
     result = []
     current = start_date
     while current <= today:
@@ -59,27 +63,16 @@ def _group_by_day(transactions, days: int):
         result.append({
             "label": current.strftime("%b %d"),
             "date": date_str,
-            "total": float(data_by_date.get(date_str, 0))
+            "total": float(totals.get(date_str, 0))
         })
         current += timedelta(days=1)
 
     return result
 
-def _group_by_month(transactions):
+def _group_by_month(totals):
     """Group by each month for the last 12 months"""
     today = timezone.now().date()
 
-    # Create lookup dict for totals by month (year-month)
-    data_by_month = defaultdict(Decimal)
-    for t in transactions:
-        if t["date"]:
-            try:
-                date_obj = datetime.fromisoformat(t["date"]).date()
-                month_key = (date_obj.year, date_obj.month)
-                data_by_month[month_key] += Decimal(str(t["amount"]))
-            except ValueError:
-                pass
-
     result = []
     for i in range(11, -1, -1):
         year = today.year
@@ -90,8 +83,7 @@ def _group_by_month(transactions):
             year -= 1
 
         month_date = datetime(year, month, 1).date()
-        month_key = (year, month)
-        total = data_by_month.get(month_key, 0)
+        total = totals.get(month_date.isoformat(), 0)
 
         result.append({
             "label": month_date.strftime("%b"),
@@ -101,59 +93,71 @@ def _group_by_month(transactions):
 
     return result
 
-def _group_by_year(transactions):
+def _group_by_year(totals):
     """Group by each year"""
-    # Create lookup dict for totals by year
-    data_by_year = defaultdict(Decimal)
-    for t in transactions:
-        if t["date"]:
-            try:
-                date_obj = datetime.fromisoformat(t["date"]).date()
-                year_key = date_obj.year
-                data_by_year[year_key] += Decimal(str(t["amount"]))
-            except ValueError:
-                pass
-
     result = []
-    for year, total in sorted(data_by_year.items(), reverse=True):
+    for bucket, total in sorted(totals.items(), reverse=True):
         result.append({
-            "label": str(year),
-            "date": f"{year}-01-01",
+            "label": bucket[:4],
+            "date": bucket,
             "total": float(total)
         })
 
     return result
 
-def get_transactions_chart_data(user, period: str):
+# Chart granularity per period: (backend bucket, grouping helper)
+CHART_BUCKETS = {
+    "daily": ("day", _group_daily),
+    "weekly": ("day", lambda totals: _group_by_day(totals, days=7)),
+    "monthly": ("day", lambda totals: _group_by_day(totals, days=30)),
+    "yearly": ("month", _group_by_month),
+    "total": ("year", _group_by_year),
+}
+
+def get_transaction_totals(user, bucket: str, start=None, end=None):
+    """
+    Per-bucket transaction totals as {"YYYY-MM-DD": Money}.
+
+    The Node API sums and groups the rows (GET transactions/buckets), so
+    only one small row per day/month/year comes back. Each key is the
+    first day of its bucket, e.g. "2025-03-01" for March 2025. Raises
+    ApiReadError if the request fails.
+    """
+    params = {"user_id": user.id, "bucket": bucket}
+    if start and end:
+        params["date__gte"] = _iso_date(start)
+        params["date__lte"] = _iso_date(end)
+    rows = require(get_request("transactions/buckets", **params), "transactions/buckets")
+    return {row["bucket"]: Money.parse(row["total"]) for row in rows}
+
+@cached_summary("transactions_chart")
+def get_transactions_chart_data(user, period: str, frame=None):
     """
     Returns transactions grouped by appropriate time granularity (chart data).
-    Mirrors the logic from the original service but uses API calls.
+
+    - daily: single total for today
+    - weekly: 7 days, daily totals
+    - monthly: ~30 days, daily totals
+    - yearly: 12 months, monthly totals
+    - total: all years, yearly totals
+
+    Pass the period's TransactionFrame as `frame` to bucket it in memory
+    instead of asking the API.
     """
-    # Get raw transactions data from API
-    transaction_params = {"user_id": user.id}
-
-    # We'll get all transactions and filter by period in Python for simplicity
-    # In a production app, you might want to add date filtering to the API call
-    transactions = get_request("transactions/", **transaction_params) or []
-
-    if period == "daily":
-        return _group_daily(transactions)
-    elif period == "weekly":
-        return _group_by_day(transactions, days=7)
-    elif period == "monthly":
-        return _group_by_day(transactions, days=30)  # Approximate month
-    elif period == "yearly":
-        return _group_by_year(transactions)
-    elif period == "total":
-        return _group_by_year(transactions)  # Group by year for total view
-    else:
-        # Default to monthly
-        return _group_by_day(transactions, days=30)
+    bucket, group = CHART_BUCKETS.get(period, CHART_BUCKETS["monthly"])
+    if frame is not None:
+        return group(frame.totals_by(bucket))
+    start, end = get_date_bounds(period)
+    return group(get_transaction_totals(user, bucket, start, end))
 
-def compute_spending_by_category(user, period: str):
+@cached_summary("spending_by_category")
+def compute_spending_by_category(user, period: str, frame=None):
     """
     Combines transactions and subscription payments by category.
-    Mirrors the logic from the original service but uses API calls.
+    Mirrors the logic from the original service but uses API calls: three
+    grouped aggregate requests, however many payments the user has. With
+    the period's TransactionFrame as `frame`, transactions are totalled
+    from it and only the two subscription requests are made.
     """
     # Get date bounds for filtering
     start, end = get_date_bounds(period)
@@ -165,43 +169,48 @@ def compute_spending_by_category(user, period: str):
         "total": 0.0
     })
 
-    # Get transactions for the period
-    transaction_params = {"user_id": user.id}
-    if start and end:
-        transaction_params["date__gte"] = _iso_date(start)
-        transaction_params["date__lte"] = _iso_date(end)
-    transactions = get_request("transactions/", **transaction_params) or []
-
-    # Process transactions by category
-    for t in transactions:
-        category = t.get("category") or "Uncategorized"
-        amount = float(t.get("amount", 0))
+    # Transaction totals per category, from the frame or grouped by the API
+    if frame is not None:
+        transaction_groups = [
+            {"category": category, "amount__sum": total}
+            for category, total in frame.totals_by_category().items()
+        ]
+    else:
+        transaction_params = {"user_id": user.id}
+        if start and end:
+            transaction_params["date__gte"] = _iso_date(start)
+            transaction_params["date__lte"] = _iso_date(end)
+        transaction_groups = require(aggregate_request(
+            "transactions/", group_by="category", sum="amount", **transaction_params
+        ), "transactions/")
+
+    for group in transaction_groups:
+        category = group.get("category") or "Uncategorized"
+        amount = float(group.get("amount__sum") or 0)
         category_totals[category]["transactions"] += amount
         category_totals[category]["total"] += amount
 
-    # Get subscription payments for the period
-    payment_params = {"user_id": user.id}
-    if start and end:
-        payment_params["due_date__gte"] = _iso_date(start)
-        payment_params["due_date__lte"] = _iso_date(end)
-    subscription_payments = get_request("subscription-payments/", **payment_params) or []
-
-    # Process subscription payments by category (need to get subscription details)
-    # For now, we'll use a default category since we don't have easy access to subscription category
-    # In a full implementation, we might need to fetch subscriptions to get their categories
-    for p in subscription_payments:
-        # Try to get subscription details to get category
-        subscription_id = p.get("subscription")
-        if subscription_id:
-            subscription_row = get_request(f"subscriptions/{subscription_id}")
-            if subscription_row:
-                category = subscription_row.get("category") or "Uncategorized"
-            else:
-                category = "Uncategorized"
-        else:
-            category = "Uncategorized"
-
-        amount = float(p.get("amount", 0))
+    # Payments only carry a subscription_id, so map the user's subscriptions
+    # to their categories once and sum payments per subscription, rather
+    # than fetching each payment's subscription separately.
+    subscription_rows = require(aggregate_request(
+        "subscriptions/", group_by=["id", "category"], count=True, user_id=user.id
+    ), "subscriptions/")
+    subscription_categories = {row["id"]: row.get("category") for row in subscription_rows}
+
+    payment_groups = []
+    if subscription_categories:
+        payment_params = {"subscription_id__in": ",".join(str(i) for i in subscription_categories)}
+        if start and end:
+            payment_params["due_date__gte"] = _iso_date(start)
+            payment_params["due_date__lte"] = _iso_date(end)
+        payment_groups = require(aggregate_request(
+            "subscription-payments/", group_by="subscription_id", sum="amount", **payment_params
+        ), "subscription-payments/")
+
+    for group in payment_groups:
+        category = subscription_categories.get(group["subscription_id"]) or "Uncategorized"
+        amount = float(group.get("amount__sum") or 0)
         category_totals[category]["subscriptions"] += amount
         category_totals[category]["total"] += amount
 
@@ -228,6 +237,16 @@ def compute_spending_by_category(user, period: str):
         "subscription_total": sum(cat["subscriptions"] for cat in result)
     }
 
+@cached_summary("active_subscriptions")
+def get_active_subscriptions(user, period: str):
+    """Active subscriptions that overlap the selected period."""
+    subscription_params = {"user_id": user.id, "status": "active"}
+    start, end = get_date_bounds(period)
+    if start and end:
+        subscription_params["start_date__lte"] = _iso_date(end)  # Started before or during period
+        subscription_params["end_date__gte_or_null"] = _iso_date(start)  # Ends after or during period (or NULL)
+    return require(get_request("subscriptions/", **subscription_params), "subscriptions/")
+
 def dashboard(request):
     # print(request.user)
     if not request.user.is_authenticated:
@@ -239,42 +258,32 @@ def dashboard(request):
 
     if request.method == "GET":
         try:
-            # Get transactions chart data via API
-            transactions = get_transactions_chart_data(request.user, period)
-
-            # Get spending by category via API
-            categories = compute_spending_by_category(request.user, period)
-
-            # Generate subscription payments (side effect to keep data current)
-            # Try to call via API if endpoint exists, otherwise skip
-            try:
-                post_request("subscription-payments/generate", {"user_id": request.user.id})
-            except Exception:
-                # If API endpoint doesn't exist, continue without generating payments
-                # This maintains backward compatibility
-                pass
-
-            # Get subscriptions data via API
-            subscription_params = {"user_id": request.user.id, "status": "active"}
-            start, end = get_date_bounds(period)
-            if start and end:
-                subscription_params["start_date__lte"] = _iso_date(end)  # Started before or during period
-                subscription_params["end_date__gte"] = _iso_date(start)  # Ends after or during period (or NULL)
-            subscriptions = get_request("subscriptions/", **subscription_params) or []
-
-            # Get budgets data (already API-based via local view)
-            budgets = get_budgets_data(request.user, period)
-
-            # Get income data (already API-based via local view)
-            income = get_income_data(request.user, period)
+            # Subscription payments are generated by the background
+            # scheduler (djangoapp/scheduler.py), not on this request.
+
+            # Every transaction figure below (chart, categories, budget and
+            # income spending) is computed from this one load -- made only
+            # if one of them isn't in the summary cache already. Long
+            # periods get no frame; their sections ask the API for totals.
+            frame = period_frame(request.user, *get_date_bounds(period))
+
+            # The sections don't depend on each other, so fetch them all at
+            # once instead of waiting on each section's round trips in turn.
+            sections = run_concurrently({
+                "transactions": (get_transactions_chart_data, request.user, period, frame),
+                "categories": (compute_spending_by_category, request.user, period, frame),
+                "subscriptions": (get_active_subscriptions, request.user, period),
+                "budgets": (get_budgets_data, request.user, period, frame),
+                "income": (get_income_data, request.user, period, frame),
+            })
 
             return JsonResponse({
                 "dashboard": {
-                    "transactions": transactions,
-                    "categories": categories,
-                    "subscriptions": subscriptions,
-                    "budgets": budgets,
-                    "income": income,
+                    "transactions": sections["transactions"],
+                    "categories": sections["categories"],
+                    "subscriptions": sections["subscriptions"],
+                    "budgets": sections["budgets"],
+                    "income": sections["income"],
                     "period": {
                         "value": period,
                         "label": get_period_label(period),
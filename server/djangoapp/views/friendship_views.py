@@ -8,11 +8,9 @@ from ..restapi import get_request, post_request, patch_request, delete_request
 from ..services.api_adapters import (
     friendship_from_row,
     friendship_notification_from_row,
-    get_username,
-    get_user_first_name,
-    get_user_last_name,
-    get_user_email,
-    get_user_data
+    get_user_data,
+    get_users_by_ids,
+    placeholder_user_data,
 )
 
 
@@ -49,20 +47,23 @@ def get_friends(request):
         friendship_rows_receiver = get_request("friendships/", receiver=user.id, status='accepted') or []
         friendship_rows = friendship_rows_sender + friendship_rows_receiver
 
+        # The friend is the other person in each friendship
+        friend_ids = [
+            friendship_row.get("receiver") if friendship_row.get("sender") == user.id else friendship_row.get("sender")
+            for friendship_row in friendship_rows
+        ]
+        users = get_users_by_ids(friend_ids)
+
         friends_data = []
-        for friendship_row in friendship_rows:
-            # Get the friend user data (the other person in the friendship)
-            friend_id = friendship_row.get("receiver") if friendship_row.get("sender") == user.id else friendship_row.get("sender")
-            if friend_id is not None:
-                friend_row = get_request(f"users/{friend_id}")
-
-                if friend_row:
-                    friends_data.append({
+        for friendship_row, friend_id in zip(friendship_rows, friend_ids):
+            friend = users.get(friend_id)
+            if friend:
+                friends_data.append({
                     'id': friend_id,
-                    'username': get_username(friend_id),
-                    'email': get_user_email(friend_id),
-                    'first_name': get_user_first_name(friend_id),
-                    'last_name': get_user_last_name(friend_id),
+                    'username': friend['username'],
+                    'email': friend['email'],
+                    'first_name': friend['first_name'],
+                    'last_name': friend['last_name'],
                     'friends_since': friendship_row.get("updated_at", ""),
                 })
         return JsonResponse({
@@ -86,33 +87,38 @@ def get_pending_requests(request):
     try:
         # Received requests (where user is receiver)
         received_rows = get_request("friendships/", receiver=user.id, status='pending') or []
+
+        # Sent requests (where user is sender)
+        sent_rows = get_request("friendships/", sender=user.id, status='pending') or []
+
+        # Resolve both sides' users in one lookup
+        users = get_users_by_ids(
+            [req.get("sender") for req in received_rows] + [req.get("receiver") for req in sent_rows]
+        )
+
+        def _user_summary(user_id):
+            user_data = users.get(user_id) or placeholder_user_data(user_id)
+            return {
+                'id': user_id,
+                'username': user_data['username'],
+                'email': user_data['email'],
+                'first_name': user_data['first_name'],
+                'last_name': user_data['last_name'],
+            }
+
         received_data = []
         for req in received_rows:
             received_data.append({
                 'id': req.get("id"),
-                'from_user': {
-                    'id': req.get("sender"),
-                    'username': get_username(req.get("sender")) if req.get("sender") else f"user_{req.get('sender')}",
-                    'email': get_user_email(req.get("sender")) if req.get("sender") else "",
-                    'first_name': get_user_first_name(req.get("sender")) if req.get("sender") else "",
-                    'last_name': get_user_last_name(req.get("sender")) if req.get("sender") else "",
-                },
+                'from_user': _user_summary(req.get("sender")),
                 'created_at': req.get("created_at"),
             })
 
-        # Sent requests (where user is sender)
-        sent_rows = get_request("friendships/", sender=user.id, status='pending') or []
         sent_data = []
         for req in sent_rows:
             sent_data.append({
                 'id': req.get("id"),
-                'to_user': {
-                    'id': req.get("receiver"),
-                    'username': get_username(req.get("receiver")) if req.get("receiver") else f"user_{req.get('receiver')}",
-                    'email': get_user_email(req.get("receiver")) if req.get("receiver") else "",
-                    'first_name': get_user_first_name(req.get("receiver")) if req.get("receiver") else "",
-                    'last_name': get_user_last_name(req.get("receiver")) if req.get("receiver") else "",
-                },
+                'to_user': _user_summary(req.get("receiver")),
                 'created_at': req.get("created_at"),
             })
 
@@ -342,15 +348,14 @@ def respond_to_request(request, friendship_id):
             })
 
             friendship = friendship_from_row(updated_friendship_row)
-            sender_response = get_request(f"users/{friendship_row['sender']}")
-            sender_row = sender_response.json() if hasattr(sender_response, 'json') else sender_response
+            sender = get_user_data(friendship_row["sender"])
 
             return JsonResponse({
                 'message': 'Friend request accepted',
                 'friend': {
-                    'id': sender_row["id"] if sender_row else friendship_row.get("sender"),
-                    'username': sender_row["username"] if sender_row else f"user_{friendship_row.get('sender')}",
-                    'email': sender_row["email"] if sender_row else "",
+                    'id': sender["id"],
+                    'username': sender["username"],
+                    'email': sender["email"],
                 }
             })
         else:
@@ -560,10 +565,11 @@ def get_notifications(request):
         notification_rows.sort(key=lambda x: x.get("created_at") or "", reverse=True)
         notification_rows = notification_rows[:50]
 
+        senders = get_users_by_ids(notification_row["from_user_id"] for notification_row in notification_rows)
+
         notifications_data = []
         for notification_row in notification_rows:
-            from_user_response = get_request(f"users/{notification_row['from_user_id']}")
-            from_user_row = from_user_response.json() if hasattr(from_user_response, 'json') else from_user_response
+            from_user_row = senders.get(notification_row["from_user_id"])
 
             notifications_data.append({
                 'id': notification_row["id"],
@@ -1,4 +1,3 @@
-from decimal import Decimal
 from django.http import JsonResponse
 import json
 import logging
@@ -6,45 +5,56 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from datetime import date, timedelta
 
-from ..restapi import get_request, post_request, patch_request, delete_request
+from ..restapi import ApiReadError, get_request, post_request, patch_request, delete_request, require
 from ..services.date_filter import get_date_bounds
-from ..services.api_adapters import income_from_row
+from ..services.api_adapters import income_from_row, get_payment_total, get_total
+from ..services.money import ZERO, Money
+from ..streaming import StreamingJsonResponse, iter_rows
+from ..summary_cache import bump_version, cached_summary, get_or_compute
 
 logger = logging.getLogger(__name__)
 
+# Newest first, id to break ties (keyset pages need a unique last column)
+INCOME_ORDER = ("-date_received", "-id")
+
 def _iso_date(dt):
     """Normalize a datetime or date into a plain YYYY-MM-DD string."""
     return dt.date().isoformat() if hasattr(dt, "date") else dt.isoformat()
 
 
-def get_income_data(user, period):
-    """Get income vs spending for dashboard."""
+@cached_summary("income")
+def get_income_data(user, period, frame=None):
+    """
+    Get income vs spending for dashboard. Transaction spending comes from
+    `frame` (the period's TransactionFrame) when given, otherwise from
+    the API.
+    """
     start, end = get_date_bounds(period)
 
-    # Get income for the period
+    # Income for the period
     income_params = {"user_id": user.id}
     if start and end:
         income_params["period_start__gte"] = _iso_date(start)
         income_params["period_start__lte"] = _iso_date(end)
-    incomes = get_request("incomes/", **income_params) or []
 
-    # Get all spending (transactions + subscriptions payments)
+    # All spending (transactions + subscriptions payments)
     transaction_params = {"user_id": user.id}
     if start and end:
         transaction_params["date__gte"] = _iso_date(start)
         transaction_params["date__lte"] = _iso_date(end)
-    transactions = get_request("transactions/", **transaction_params) or []
 
-    subscription_payment_params = {"user_id": user.id}
+    subscription_payment_params = {}
     if start and end:
         subscription_payment_params["due_date__gte"] = _iso_date(start)
         subscription_payment_params["due_date__lte"] = _iso_date(end)
-    subscription_payments = get_request("subscription-payments/", **subscription_payment_params) or []
 
-    # Calculate totals
-    total_income = sum((Decimal(str(i.amount)) for i in incomes), Decimal('0'))
-    transaction_spending = sum((Decimal(str(t["amount"])) for t in transactions), Decimal('0'))
-    subscription_spending = sum((Decimal(str(p["amount"])) for p in subscription_payments), Decimal('0'))
+    # Totals, summed by the API
+    total_income = get_total("incomes/", **income_params)
+    if frame is not None:
+        transaction_spending = frame.total()
+    else:
+        transaction_spending = get_total("transactions/", **transaction_params)
+    subscription_spending = get_payment_total(user.id, **subscription_payment_params)
     total_spent = transaction_spending + subscription_spending
     remaining = total_income - total_spent
 
@@ -70,64 +80,62 @@ def get_incomes(request):
         )
 
     try:
-        rows = get_request("incomes/", user_id=request.user.id) or []
-        incomes = [income_from_row(r) for r in rows]
-        incomes.sort(key=lambda i: i.date_received, reverse=True)
-
-        # Get all transactions and subscription payments for the user (for summary calculation)
-        transactions_rows = get_request("transactions/", user_id=request.user.id) or []
-        subscription_payment_rows = get_request("subscription-payments/", user_id=request.user.id) or []
-
-        # Calculate summary (all time)
-        total_income = sum((Decimal(str(i.amount)) for i in incomes), Decimal('0'))
-        total_transaction_spent = sum((Decimal(str(t["amount"])) for t in transactions_rows), Decimal('0'))
-        total_subscription_spent = sum((Decimal(str(p["amount"])) for p in subscription_payment_rows), Decimal('0'))
-        total_spent = total_transaction_spent + total_subscription_spent
-        remaining = total_income - total_spent
-        percent_remaining = round((remaining / total_income) * 100, 1) if total_income > 0 else 0
-        is_negative = remaining < 0
-
-        summary = {
-            "total_income": float(total_income),
-            "total_spent": float(total_spent),
-            "transaction_spent": float(total_transaction_spent),
-            "subscription_spent": float(total_subscription_spent),
-            "remaining": float(remaining),
-            "percent_remaining": percent_remaining,
-            "is_negative": is_negative,
+        user_id = request.user.id
+        user_data = {
+            "id": request.user.id,
+            "username": request.user.username,
+            "is_authenticated": request.user.is_authenticated
         }
-
-        # Calculate income by source (all time)
-        by_source_dict = {}
-        for inc in incomes:
-            source = inc.source
-            amount = Decimal(str(inc.amount))
-            by_source_dict[source] = by_source_dict.get(source, Decimal('0')) + amount
-        by_source = [{"source": source, "total": float(total)} for source, total in by_source_dict.items()]
-        by_source.sort(key=lambda x: x["total"], reverse=True)
-
-        incomes_data = []
-        for inc in incomes:
-            incomes_data.append({
-                "id": inc.id,
-                "amount": float(inc.amount),
-                "source": inc.source,
-                "date_received": inc.date_received,
-                "period_start": inc.period_start,
-                "period_end": inc.period_end or None,
-            })
-
-        return JsonResponse({
-            "incomes": incomes_data,
-            "summary": summary,
-            "by_source": by_source,
-            "count": len(incomes_data),
-            "user": {
-                "id": request.user.id,
-                "username": request.user.username,
-                "is_authenticated": request.user.is_authenticated
+        # Added up while the incomes stream past, for the summary that
+        # follows them
+        totals_by_source = {}
+        income_count = 0
+        # First page now, so an unreachable API is still a 500
+        rows = iter_rows("incomes/", INCOME_ORDER, user_id=user_id)
+
+        def incomes_data():
+            nonlocal income_count
+            for inc in map(income_from_row, rows):
+                income_count += 1
+                totals_by_source[inc.source] = totals_by_source.get(inc.source, ZERO) + inc.amount
+                yield {
+                    "id": inc.id,
+                    "amount": float(inc.amount),
+                    "source": inc.source,
+                    "date_received": inc.date_received,
+                    "period_start": inc.period_start,
+                    "period_end": inc.period_end or None,
+                }
+
+        def summary_data():
+            # Calculate summary (all time). Spending totals are summed by the API
+            total_income = Money.total(totals_by_source.values())
+            total_transaction_spent = get_total("transactions/", user_id=user_id)
+            total_subscription_spent = get_payment_total(user_id)
+            total_spent = total_transaction_spent + total_subscription_spent
+            remaining = total_income - total_spent
+            percent_remaining = round((remaining / total_income) * 100, 1) if total_income > 0 else 0
+
+            # Income by source (all time)
+            by_source = [{"source": source, "total": float(total)} for source, total in totals_by_source.items()]
+            by_source.sort(key=lambda x: x["total"], reverse=True)
+
+            return {
+                "summary": {
+                    "total_income": float(total_income),
+                    "total_spent": float(total_spent),
+                    "transaction_spent": float(total_transaction_spent),
+                    "subscription_spent": float(total_subscription_spent),
+                    "remaining": float(remaining),
+                    "percent_remaining": percent_remaining,
+                    "is_negative": remaining < 0,
+                },
+                "by_source": by_source,
+                "count": income_count,
+                "user": user_data,
             }
-        })
+
+        return StreamingJsonResponse("incomes", incomes_data(), tail=summary_data)
     except Exception as e:
         logger.error(f"Error fetching income: {e}")
         return JsonResponse({"error": "Failed to fetch income"}, status=500)
@@ -251,23 +259,31 @@ def get_income_summary(request):
     if request.method != 'GET':
         return JsonResponse({"error": "Method Not Allowed"}, status=405)
     
-    try:
-        summary = get_request("incomes/summary/", user_id=request.user.id) or []
-        by_source = get_request("incomes/by-source/", user_id=request.user.id) or []
+    def income_summary():
+        # A failed read raises instead of coming back empty, so it isn't cached
+        summary = require(get_request("incomes/summary/", user_id=request.user.id), "incomes/summary/")
+        by_source = require(get_request("incomes/by-source/", user_id=request.user.id), "incomes/by-source/")
 
         current_year = date.today().year
-        monthly = get_request(f"incomes/monthly/?year={current_year}", user_id=request.user.id)
+        monthly = require(
+            get_request(f"incomes/monthly/?year={current_year}", user_id=request.user.id), "incomes/monthly/"
+        )
+        return {"summary": summary, "by_source": by_source, "monthly": monthly}
+
+    try:
+        data = get_or_compute("income_summary", request.user, income_summary)
 
         return JsonResponse({
-            "summary": summary,
-            "by_source": by_source,
-            "monthly": monthly,
+            **data,
             "user": {
                 "id": request.user.id,
                 "username": request.user.username,
                 "is_authenticated": request.user.is_authenticated
             }
         })
+    except ApiReadError as e:
+        logger.error(f"Error fetching income summary: {e}")
+        return JsonResponse({"error": "Failed to fetch income summary"}, status=500)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=400)
 
@@ -310,6 +326,7 @@ def income_create(request):
         return JsonResponse(
             {"error": "Failed to create income"}, status=500
         )
+    bump_version(request.user)
 
     # Get updated summary
     summary = get_request("incomes/summary/", user_id=request.user.id) or {}
@@ -383,6 +400,7 @@ def income_update(request, income_id):
             return JsonResponse(
                 {"error": "Failed to update income"}, status=500
             )
+        bump_version(request.user)
 
         # Get updated summary
         summary = get_request("incomes/summary/", user_id=request.user.id) or {}
@@ -438,6 +456,8 @@ def income_delete(request):
         result = delete_request(f"incomes/{iid}/")
         if result is not None:
             deleted_count += 1
+    if deleted_count:
+        bump_version(request.user)
 
     # Get updated summary
     summary = get_request("incomes/summary/", user_id=request.user.id) or {}
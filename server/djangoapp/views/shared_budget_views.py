@@ -20,12 +20,21 @@ from ..services.api_adapters import (
     subscription_payment_from_row,
     income_from_row,
     get_username,
-    get_user_first_name,
-    get_user_last_name,
-    get_user_email,
-    get_user_data
+    get_users_by_ids,
+    placeholder_user_data,
 )
+from ..services.category_keys import category_key
 from ..services.date_filter import get_date_bounds
+from ..services.balance_ledger import (
+    get_ledger_balances,
+    record_expense,
+    record_expense_changed,
+    record_expense_removed,
+    record_settlement,
+    total_paid,
+)
+from ..services.debts import simplify_debts
+from ..services.splits import custom_split_rows, member_split_rows
 
 
 def login_required_json(view_func):
@@ -42,46 +51,58 @@ def _iso_date(dt):
     return dt.date().isoformat() if hasattr(dt, "date") else dt.isoformat()
 # ===================== HELPER FUNCTIONS FOR API DATA ===================
 
-def get_member_data(member_row, budget_row=None):
-    """Get member data from API rows."""
-    budget = budget_row or get_budget_by_id(member_row["shared_budget"])
-
-    # Get total paid by calculating expenses where this member paid
-    total_paid = get_total_paid_by_member(member_row["user_id"], member_row["shared_budget"])
+def get_member_data(member_row, budget_row=None, users=None, balances=None):
+    """
+    Get member data from API rows.
 
-    # Get total owed by calculating splits for this member
-    total_owed = get_total_owed_by_member(member_row["user_id"], member_row["shared_budget"])
+    `users` is a {user_id: user_data} map from get_users_by_ids(), and
+    `balances` the output of balance_ledger.get_ledger_balances() for the
+    member's budget; pass them when serializing several members so they
+    share one user lookup and one ledger read.
+    """
+    if users is None:
+        users = get_users_by_ids([member_row["user_id"]])
+    user_data = users.get(member_row["user_id"]) or placeholder_user_data(member_row["user_id"])
 
-    balance = total_paid - total_owed
+    if balances is None:
+        balances = get_ledger_balances(member_row["shared_budget"])
+    member_balance = balances.get(member_row["user_id"])
 
     return {
         'id': member_row["id"],
         'user': {
             'id': member_row["user_id"],
-            'username': get_username(member_row["user_id"]),
-            'email': get_user_email(member_row["user_id"]),
-            'first_name': get_user_first_name(member_row["user_id"]),
-            'last_name': get_user_last_name(member_row["user_id"]),
+            'username': user_data['username'],
+            'email': user_data['email'],
+            'first_name': user_data['first_name'],
+            'last_name': user_data['last_name'],
         },
         'role': member_row["role"],
         'contribution_percentage': float(member_row["contribution_percentage"]),
         'joined_at': member_row.get("joined_at"),
-        'total_paid': total_paid,
-        'total_owed': total_owed,
-        'balance': balance,
+        'total_paid': float(member_balance["total_paid"]) if member_balance else 0.0,
+        'total_owed': float(member_balance["total_owed"]) if member_balance else 0.0,
+        'balance': float(member_balance["balance"]) if member_balance else 0.0,
     }
 
 
 def get_budget_data(budget_row, user_id=None):
     """Get budget data from API rows."""
-    # Get total spent by getting all expenses for this budget
-    total_spent = get_total_spent_for_budget(budget_row["id"])
+    # Get members, resolving every member plus the creator in one user lookup
+    member_rows = get_request("shared-budget-members/", shared_budget=budget_row["id"]) or []
+    users = get_users_by_ids(
+        [member_row["user_id"] for member_row in member_rows] + [budget_row["created_by"]]
+    )
+
+    # One ledger read covers every member's balance and the total spent,
+    # since each expense is counted once in its payer's total_paid
+    balances = get_ledger_balances(budget_row["id"], [member_row["user_id"] for member_row in member_rows])
+    total_spent = float(total_paid(balances))
     total_amount = float(budget_row["total_amount"])
     remaining = total_amount - total_spent
     progress = (total_spent / total_amount * 100) if total_amount > 0 else 0
 
-    # Get members
-    members_data = get_budget_members(budget_row["id"])
+    members_data = [get_member_data(member_row, budget_row, users, balances) for member_row in member_rows]
 
     # Get current user's role and balance
     user_role = None
@@ -90,7 +111,7 @@ def get_budget_data(budget_row, user_id=None):
         member = next((m for m in members_data if m['user']['id'] == user_id), None)
         if member:
             user_role = member["role"]
-            user_balanace = float(member["balance"])
+            user_balance = float(member["balance"])
 
     return {
         'id': budget_row["id"],
@@ -103,7 +124,7 @@ def get_budget_data(budget_row, user_id=None):
         'category': budget_row["category"],
         'created_by': {
             'id': budget_row["created_by"],
-            'username': get_username(budget_row["created_by"]),
+            'username': (users.get(budget_row["created_by"]) or placeholder_user_data(budget_row["created_by"]))['username'],
         },
         'period_start': budget_row["period_start"],
         'period_end': budget_row["period_end"],
@@ -125,34 +146,9 @@ def get_budget_by_id(budget_id):
 def get_budget_members(budget_id):
     """Get all members for a budget."""
     member_rows = get_request("shared-budget-members/", shared_budget=budget_id) or []
-    members_data = []
-    for member_row in member_rows:
-        member_data = get_member_data(member_row)
-        members_data.append(member_data)
-    return members_data
-
-
-def get_total_paid_by_member(user_id, budget_id):
-    """Get total amount paid by a member in a budget."""
-    # Get expenses where this member paid
-    expense_rows = get_request("shared-expenses/", shared_budget=budget_id, paid_by=user_id) or []
-    total = sum(float(expense_row["amount"]) for expense_row in expense_rows)
-    return total
-
-
-def get_total_owed_by_member(user_id, budget_id):
-    """Get total amount owed by a member in a budget."""
-    # Get splits for this member in this budget that are not settled
-    split_rows = get_request("expense-splits/", shared_budget=budget_id, user_id=user_id, is_settled=False) or []
-    total = sum(float(split_row["amount_owed"]) for split_row in split_rows)
-    return total
-
-
-def get_total_spent_for_budget(budget_id):
-    """Get total amount spent in a budget."""
-    expense_rows = get_request("shared-expenses/", shared_budget=budget_id) or []
-    total = sum(float(expense_row["amount"]) for expense_row in expense_rows)
-    return total
+    users = get_users_by_ids(member_row["user_id"] for member_row in member_rows)
+    balances = get_ledger_balances(budget_id)
+    return [get_member_data(member_row, users=users, balances=balances) for member_row in member_rows]
 
 
 def get_settlements_for_budget(budget_id, limit=10):
@@ -162,17 +158,23 @@ def get_settlements_for_budget(budget_id, limit=10):
     settlement_rows.sort(key=lambda x: x.get("date") or "", reverse=True)
     settlement_rows = settlement_rows[:limit]
 
+    users = get_users_by_ids(
+        [row["payer"] for row in settlement_rows] + [row["receiver"] for row in settlement_rows]
+    )
+
     settlements_data = []
     for settlement_row in settlement_rows:
+        payer = users.get(settlement_row["payer"]) or placeholder_user_data(settlement_row["payer"])
+        receiver = users.get(settlement_row["receiver"]) or placeholder_user_data(settlement_row["receiver"])
         settlements_data.append({
             'id': settlement_row["id"],
             'payer': {
                 'id': settlement_row["payer"],
-                'username': get_username(settlement_row["payer"]),
+                'username': payer['username'],
             },
             'receiver': {
                 'id': settlement_row["receiver"],
-                'username': get_username(settlement_row["receiver"]),
+                'username': receiver['username'],
             },
             'amount': float(settlement_row["amount"]),
             'date': settlement_row.get("date"),
@@ -181,6 +183,25 @@ def get_settlements_for_budget(budget_id, limit=10):
         })
     return settlements_data
 
+
+def create_expense_splits(expense_id, amount, split_type, splits_data, member_rows):
+    """
+    Create every split for an expense with a single bulk insert.
+
+    `split_type` "custom" uses `splits_data` as given; "percentage" and
+    "equal" divide `amount` across `member_rows` so the shares add up to
+    exactly the expense amount. Returns the created split rows ([] if
+    the insert failed).
+    """
+    if split_type == 'custom' and splits_data:
+        split_rows = custom_split_rows(expense_id, splits_data)
+    else:
+        split_rows = member_split_rows(expense_id, amount, member_rows, split_type)
+
+    if not split_rows:
+        return []
+    return post_request("expense-splits/bulk", split_rows) or []
+
 # ============================= SHARED BUDGET CRUD ==========================
 
 @csrf_exempt
@@ -212,14 +233,15 @@ def get_shared_budgets(request):
 
         # Get pending invites for the user
         invite_rows = get_request("shared-budget-invites/", invited_user=user.id, status='pending') or []
+        inviters = get_users_by_ids(invite_row["invited_by"] for invite_row in invite_rows)
         invites_data = []
         for invite_row in invite_rows:
             budget_row = get_request(f"shared-budgets/{invite_row['shared_budget']}")
             budget_name = budget_row["name"] if budget_row else "Unknown Budget"
             budget_amount = float(budget_row["total_amount"]) if budget_row else 0
 
-            invited_by_row = get_request(f"users/{invite_row['invited_by']}")
-            invited_by_username = invited_by_row["username"] if invited_by_row else f"user_{invite_row['invited_by']}"
+            inviter = inviters.get(invite_row["invited_by"]) or placeholder_user_data(invite_row["invited_by"])
+            invited_by_username = inviter["username"]
 
             invites_data.append({
                 'id': invite_row["id"],
@@ -697,9 +719,6 @@ def respond_to_budget_invite(request, invite_id):
                 return JsonResponse({'error': 'Failed to decline invitation'}, status=500)
 
             # Notify the inviter
-            inviter_row = get_request(f"users/{invite_row['invited_by']}")
-            inviter_username = inviter_row["username"] if inviter_row else f"user_{invite_row['invited_by']}"
-
             post_request("shared-budget-notifications/", {
                 'user_id': invite_row["invited_by"],
                 'from_user_id': user.id,
@@ -983,26 +1002,18 @@ def add_expense(request, budget_id):
         if not expense_row:
             return JsonResponse({'error': 'Failed to create expense'}, status=500)
 
-        # Create splits based on type
+        # Create splits based on type, all in one write
+        member_rows = get_request("shared-budget-members/", shared_budget=budget_id) or []
         split_type = data.get('split_type', budget_row["default_split_type"])
-        splits_data = data.get('splits')
-
-        if split_type == 'custom' and splits_data:
-            # Custom splits provided via API
-            for split_data in splits_data:
-                post_request("expense-splits/", {
-                    'shared_expense': expense_row["id"],
-                    'user_id':split_data["user_id"],
-                    'amount_owed': str(split_data["amount_owed"]),
-                    'is_settled':split_data.get("is_settled", False)
-                })
-        else:
-            # Default: equal split via API endpoint
-            post_request(f"shared-expenses/{expense_row['id']}/create-equal-splits", {})
+        split_rows = create_expense_splits(
+            expense_row["id"], expense_row["amount"], split_type, data.get('splits'), member_rows
+        )
+
+        # Keep the balance ledger in step with the new expense
+        record_expense(budget_id, expense_row, split_rows)
 
         # Notify members
         expense_description = data['description']
-        member_rows = get_request("shared-budget-members/", shared_budget=budget_id) or []
         member_user_ids = [m["user_id"] for m in member_rows if m["user_id"] != user.id]
 
         for member_user_id in member_user_ids:
@@ -1073,6 +1084,11 @@ def update_expense(request, budget_id, expense_id):
         if not payload:
             return JsonResponse({'error': 'No valid fields to update'}, status=400)
 
+        # Splits as they were before the change, for the balance ledger
+        old_split_rows = []
+        if 'amount' in data:
+            old_split_rows = get_request("expense-splits/", shared_expense=expense_id) or []
+
         # Update expense via API
         updated_expense_row = patch_request(f"shared-expenses/{expense_id}", payload)
         if not updated_expense_row:
@@ -1081,28 +1097,18 @@ def update_expense(request, budget_id, expense_id):
         # Recalculate splits if amount changed
         if 'amount' in data:
             # Delete existing splits via API
-            split_rows = get_request("expense=splits/", shared_expense=expense_id) or []
-            for split_row in split_rows:
+            for split_row in old_split_rows:
                 delete_request(f"expense-splits/{split_row['id']}")
 
-            # Create new splits based on type
+            # Create new splits based on type, all in one write
             split_type = data.get('split_type', budget_row["default_split_type"])
+            member_rows = get_request("shared-budget-members/", shared_budget=budget_id) or []
+            new_split_rows = create_expense_splits(
+                expense_id, updated_expense_row["amount"], split_type, data.get('splits'), member_rows
+            )
 
-            if split_type == 'custom' and data.get('splits'):
-                # Custom splits provided
-                for split_data in data['splits']:
-                    post_request("expense-splits/", {
-                        'shared_expense': expense_id,
-                        'user_id': split_data["user_id"],
-                        'amount_owed': str(split_data["amount_owed"]),
-                        'is_settled': split_data.get("is_settled", False),
-                    })
-            elif split_type == 'percentage':
-                # Percentage splits
-                post_request(f"shared-expenses/{expense_id}/create-percentage-splits", {})
-            else:
-                # Equal splits
-                post_request(f"shared-expenses/{expense_id}/create-equal-splits", {})
+            # Swap the expense's old amounts in the balance ledger for the new ones
+            record_expense_changed(budget_id, expense_row, old_split_rows, updated_expense_row, new_split_rows)
 
         # Notify members
         member_rows = get_request("shared-budget-members/", shared_budget=budget_id) or []
@@ -1139,7 +1145,7 @@ def delete_expense(request, budget_id, expense_id):
 
     try:
         # Verify budget exists
-        budget_row = get_request(f"shared-bugdets/{budget_id}")
+        budget_row = get_request(f"shared-budgets/{budget_id}")
         if not budget_row:
             return JsonResponse({'error': 'Shared budget not found'}, status=404)
 
@@ -1155,6 +1161,9 @@ def delete_expense(request, budget_id, expense_id):
 
         description = expense_row["description"]
 
+        # The splits are deleted along with the expense, so grab them first
+        split_rows = get_request("expense-splits/", shared_expense=expense_id) or []
+
         # Notify members
         member_rows = get_request("shared-budget-members/", shared_budget=budget_id) or []
         member_user_ids = [m["user_id"] for m in member_rows if m["user_id"] != user.id]
@@ -1173,6 +1182,8 @@ def delete_expense(request, budget_id, expense_id):
         if result is None:
             return JsonResponse({'error': 'Failed to delete expense'}, status=500)
 
+        record_expense_removed(budget_id, expense_row, split_rows)
+
         return JsonResponse({
             'message': f'Expense "{description}" deleted succesfully'
         })
@@ -1201,13 +1212,12 @@ def get_budget_expenses(request, budget_id):
         if not member_row:
             return JsonResponse({'error': 'You are not a member of this budget'}, status=404)
 
-        # Get expenses
-        expense_rows = get_request("shared-expenses/", shared_budget=budget_id) or []
-
-        # Optional filters
+        # Get expenses, optionally for one category
+        expense_filters = {"shared_budget": budget_id}
         category = request.GET.get('category')
         if category:
-            expense_rows = [e for e in expense_rows if e.get("category") == category]
+            expense_filters["category_key"] = category_key(category)
+        expense_rows = get_request("shared-expenses/", **expense_filters) or []
 
         paid_by = request.GET.get('paid_by')
         if paid_by:
@@ -1299,6 +1309,8 @@ def create_settlement(request, budget_id):
         if not settlement_row:
             return JsonResponse({'error': 'Failed to create settlement'}, status=500)
 
+        record_settlement(budget_id, settlement_row)
+
         # Notify receiver
         post_request("shared-budget-notifications/", {
             'user_id': receiver_id,
@@ -1396,13 +1408,15 @@ def get_budget_notifications(request):
         notification_rows.sort(ket=lambda x: x.get("created_at") or "", reverse=True)
         notification_rows = notification_rows[:50]
 
+        senders = get_users_by_ids(notification_row["from_user"] for notification_row in notification_rows)
+
         notifications_data = []
         for notification_row in notification_rows:
             budget_row = None
             if notification_row.get("shared_budget"):
                 budget_row = get_request(f"shared-budgets/{notification_row['shared_budget']}")
 
-            from_user_row = get_request(f"users/{notification_row['from_user']}")
+            from_user_row = senders.get(notification_row["from_user"])
 
             notifications_data.append({
                 'id': notification_row["id"],
@@ -1436,9 +1450,16 @@ def get_expense_data(expense_row):
     """Get expense data from API row."""
     # Get splits for this expense
     split_rows = get_request("expense-splits/", shared_expense=expense_row["id"]) or []
+
+    # Split members, payer and creator all come from one user lookup
+    users = get_users_by_ids(
+        [split_row["user_id"] for split_row in split_rows]
+        + [expense_row["paid_by"], expense_row["created_by"]]
+    )
+
     splits_data = []
     for split_row in split_rows:
-        user_row = get_request(f"users/{split_row['user_id']}")
+        user_row = users.get(split_row["user_id"])
         splits_data.append({
             'id': split_row["id"],
             'user': {
@@ -1450,11 +1471,8 @@ def get_expense_data(expense_row):
             'settled_at': split_row.get("settled_at"),
         })
 
-    # Get payer info
-    payer_row = get_request(f"users/{expense_row['paid_by']}")
-
-    # Get creator info
-    creator_row = get_request(f"users/{expense_row['created_by']}")
+    payer_row = users.get(expense_row["paid_by"])
+    creator_row = users.get(expense_row["created_by"])
 
     return {
         'id': expense_row["id"],
@@ -1479,100 +1497,23 @@ def get_expense_data(expense_row):
 
 
 def get_budget_debts_data(budget_id):
-    """Get all debts/balances for a shared budget from API."""
-    try:
-        # Try to get debts from API endpoint first
-        debts_rows = get_request(f"shared-budgets/{budget_id}/debts") or []
-        if debts_rows:
-            debts_data = []
-            for debt_row in debts_rows:
-                debts_data.append({
-                    'from_user': {
-                        'id': debt_row["from_user_id"],
-                        'username': get_username(debt_row["from_user_id"]),
-                    },
-                    'to_user': {
-                        'id': debt_row["to_user_id"],
-                        'username': get_username(debt_row["to_user_id"]),
-                    },
-                    'amount': float(debt_row["amount"]),
-                })
-            return debts_data
-    except Exception:
-        pass # Fall back to calculation if API ednpoint doesn't exist
-
-    # Calculate debts manually (similar to original calulate_debts function)
-    members = get_request("shared-budget-members/", shared_budget=budget_id) or []
-    balances = {}
-
-    for member_row in members:
-        user_id = member_row["user_id"]
-
-        # Total paid by this member
-        expense_rows = get_request("shared-expenses/", shared_budget=budget_id, paid_by=user_id) or []
-        total_paid = sum(float(expense_row["amount"]) for expense_row in expense_rows)
-
-        # Total owed by this member (from splits)
-        split_rows = get_request("expense-splits/", shared_budget=budget_id, user_id=user_id, is_settled=False) or []
-        total_owed = sum(float(split_row["amount_owed"]) for split_row in split_rows)
-
-        # Total settlements made by this member
-        settlement_rows = get_request("settlements/", shared_budget=budget_id, payer=user_id) or []
-        settlements_paid = sum(float(settlement_row["amount"]) for settlement_row in settlement_rows)
-
-        # Total settlements received by this member
-        settlement_rows = get_request("settlements/", shared_budget=budget_id, receiver=user_id) or []
-        settlements_received = sum(float(settlement_row["amount"]) for settlement_row in settlement_rows)
-
-        # Net balance: positive means others owe them
-        balance = total_paid - total_owed - settlements_received + settlements_paid
-        balances[user_id] = {
-            'user': user_id,
-            'balance': balance
+    """
+    Simplified debts for a shared budget: who should pay whom to settle up.
+
+    One balance ledger read plus one user lookup, however many members or
+    expenses the budget has (see services/balance_ledger.py).
+    """
+    balances = get_ledger_balances(budget_id)
+    debts = simplify_debts(balances)
+
+    users = get_users_by_ids(
+        [debt["from_user_id"] for debt in debts] + [debt["to_user_id"] for debt in debts]
+    )
+    return [
+        {
+            'from_user': users.get(debt["from_user_id"]) or placeholder_user_data(debt["from_user_id"]),
+            'to_user': users.get(debt["to_user_id"]) or placeholder_user_data(debt["to_user_id"]),
+            'amount': float(debt["amount"]),
         }
-
-    # Calculate simplified debts
-    debtors = [] # People who owe (negative balance)
-    creditors = [] # People who are owed (positive balance)
-
-    for user_id, data in balances.items():
-        if data['balance'] < 0:
-            debtors.append({
-                'user': get_user_data(user_id),
-                'amount': abs(data['balance'])
-            })
-        elif data['balance'] > 0:
-            creditors.append({
-                'user': get_user_data(user_id),
-                'amount': data['balance']
-            })
-
-    # Sort for optimal settlement
-    debtors.sort(key=lambda x: x.get['amount'], reverse=True)
-    creditors.sort(key=lambda x: x.get['amout'], reverse=True)
-
-    debts = []
-    i, j = 0, 0
-
-    while i < len(debtors) and j < len(creditors):
-        debtor = debtors[i]
-        creditor = creditors[j]
-
-        settle_amount = min(debtor['amount'], creditor['amount'])
-
-        if settle_amount > 0.01:
-            debts.append({
-                'from_user': debtor['user'],
-                'to_user': creditor['user'],
-                'amount': float(settle_amount)
-            })
-
-        debtor['amount'] -= settle_amount
-        creditor['amount'] -= settle_amount
-
-        if debtor['amount'] <= 0.01:
-            i += 1
-        if creditor['amount'] <= 0.01:
-            j += 1
-
-    return debts
+        for debt in debts
+    ]
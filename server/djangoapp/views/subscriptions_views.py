@@ -1,17 +1,29 @@
 import json
 import logging
-from decimal import Decimal
 
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
 from ..restapi import get_request, post_request, patch_request, delete_request
-from ..services.api_adapters import subscription_from_row, subscription_payment_from_row
+from ..services.api_adapters import (
+    subscription_from_row,
+    subscription_payment_from_row,
+    get_payment_total_and_count,
+    get_total_and_count,
+)
+from ..services.money import Money
 from ..services.date_filter import get_date_bounds
+from ..streaming import StreamingJsonResponse, iter_rows
+from ..summary_cache import bump_version
 
 logger = logging.getLogger(__name__)
 
+# Updating any of these moves a subscription's billing dates
+SCHEDULE_FIELDS = ("billing_cycle", "billing_day", "start_date")
+# Newest first, id to break ties (keyset pages need a unique last column)
+SUBSCRIPTION_ORDER = ("-created_at", "-id")
+
 def _iso_date(dt):
     """Normalize a datetime or date into a plain YYYY-MM-DD string."""
     return dt.date().isoformat() if hasattr(dt, "date") else dt.isoformat()
@@ -21,28 +33,23 @@ def get_subscriptions_data(user, period):
     start, end = get_date_bounds(period)
 
     subscription_params = {"user_id": user.id, "status": "active"}
-    payment_params = {"user_id": user.id}
+    payment_params = {}
 
     if start and end:
         subscription_params["start_date__lte"]= _iso_date(end) # Started before or during period
-        subscription_params["end_date__gte"] = _iso_date(start) # Ends after or during period (or NULL)
+        subscription_params["end_date__gte_or_null"] = _iso_date(start) # Ends after or during period (or NULL)
         payment_params["due_date__gte"] = _iso_date(start)
         payment_params["due_date__lte"] = _iso_date(end)
 
-    # Get active subscriptions for the period
-    subscriptions = get_request("subscriptions/", **subscription_params) or []
-    # Get payments for the period
-    payments = get_request("subscription-payments/", **payment_params) or []
-
-    # Calculate totals
-    subscription_total = sum((Decimal(str(s["amount"])) for s in subscriptions), Decimal('0'))
-    payment_total = sum((Decimal(str(s["amount"])) for p in payments), Decimal('0'))
+    # Totals for active subscriptions and payments in the period
+    subscription_total, subscription_count = get_total_and_count("subscriptions/", **subscription_params)
+    payment_total, payment_count = get_payment_total_and_count(user.id, **payment_params)
 
     return {
         "subscription_total": float(subscription_total),
         "payment_total": float(payment_total),
-        "subscription_count": len(subscriptions),
-        "payment_count": len(payments),
+        "subscription_count": subscription_count,
+        "payment_count": payment_count,
     }
 
 
@@ -59,60 +66,59 @@ def get_subscriptions(request):
         )
 
     try:
-        rows = get_request("subscriptions/", user_id=request.user.id) or []
-        subscriptions = [subscription_from_row(r) for r in rows]
-        subscriptions.sort(key=lambda s: s.created_at, reverse=True)
-
-        data = []
-        for sub in subscriptions:
-            # Get recent payments for this subscription
-            payment_rows = get_request("subscription-payments/", subscription_id=sub.id) or []
-            payments = [subscription_payment_from_row(p) for p in payment_rows]
-            payments.sort(key=lambda p: p.paid_date or p.due_date, reverse=True)
-
-            recent_payments = payments[:5] # Limit to 5 most recent
-
-            # Calculate total paid
-            total_paid = sum((p.amount for p in payments if p.is_paid), Decimal('0'))
-
-            data.append({
-                "id": sub.id,
-                "name": sub.name,
-                "amount": float(sub.amount),
-                "category": sub.category,
-                "billing_cycle": sub.billing_cycle,
-                "billing_day": sub.billing_day,
-                "start_date": sub.start_date.isoformat() if sub.start_date else None,
-                "end_date": sub.end_date.isoformat() if sub.end_date else None,
-                "status": sub.status,
-                "description": sub.description,
-                "created_at": sub.created_at.isoformat(),
-                "payments": [
-                    {
-                        "id": p.id,
-                        "amount": float(p.amount),
-                        "paid_date": p.paid_date.isoformat() if p.paid_date else None,
-                        "is_paid": p.is_paid,
-                    }
-                    for p in recent_payments
-                ],
-                "total_paid": float(total_paid),
-                "payment_count": len(payments),
-            })
-            
-            # Get summary data
-            summary = get_subscriptions_data(request.user, "monthly")
-
-            return JsonResponse({
-                "subscriptions": data,
-                "summary": summary,
-                "user": {
-                    "id": request.user.id,
-                    "username": request.user.username,
-                    "is_authenticated": request.user.is_authenticated
+        user = request.user
+        user_data = {
+            "id": user.id,
+            "username": user.username,
+            "is_authenticated": user.is_authenticated
+        }
+
+        # First page now, so an unreachable API is still a 500
+        rows = iter_rows("subscriptions/", SUBSCRIPTION_ORDER, user_id=user.id)
+
+        def subscriptions_data():
+            for sub in map(subscription_from_row, rows):
+                # Get recent payments for this subscription
+                payment_rows = get_request("subscription-payments/", subscription_id=sub.id) or []
+                payments = [subscription_payment_from_row(p) for p in payment_rows]
+                payments.sort(key=lambda p: p.paid_date or p.due_date, reverse=True)
+
+                recent_payments = payments[:5] # Limit to 5 most recent
+
+                # Calculate total paid
+                total_paid = Money.total(p.amount for p in payments if p.is_paid)
+
+                yield {
+                    "id": sub.id,
+                    "name": sub.name,
+                    "amount": float(sub.amount),
+                    "category": sub.category,
+                    "billing_cycle": sub.billing_cycle,
+                    "billing_day": sub.billing_day,
+                    "start_date": sub.start_date.isoformat() if sub.start_date else None,
+                    "end_date": sub.end_date.isoformat() if sub.end_date else None,
+                    "status": sub.status,
+                    "description": sub.description,
+                    "created_at": sub.created_at.isoformat(),
+                    "payments": [
+                        {
+                            "id": p.id,
+                            "amount": float(p.amount),
+                            "paid_date": p.paid_date.isoformat() if p.paid_date else None,
+                            "is_paid": p.is_paid,
+                        }
+                        for p in recent_payments
+                    ],
+                    "total_paid": float(total_paid),
+                    "payment_count": len(payments),
                 }
-            })
-                          
+
+        return StreamingJsonResponse(
+            "subscriptions",
+            subscriptions_data(),
+            tail=lambda: {"summary": get_subscriptions_data(user, "monthly"), "user": user_data},
+        )
+
     except Exception as e:
         logger.error(f"Error fetching subscriptions: {e}")
         return JsonResponse({"error": "Failed to fetch subscriptions"}, status=500)
@@ -162,6 +168,7 @@ def subscription_create(request):
         return JsonResponse(
             {"error": "Failed to create subscription"}, status=500
         )
+    bump_version(request.user)
 
     subscription = subscription_from_row(row)
 
@@ -299,11 +306,16 @@ def subscription_update(request, subscription_id):
                 {"error": "No valid fields to update"}, status=400
             )
 
+        # A new schedule means payments have to be regenerated from scratch
+        if any(field in payload for field in SCHEDULE_FIELDS):
+            payload["materialized_through"] = None
+
         updated = patch_request(f"subscriptions/{subscription_id}", payload)
         if not updated:
             return JsonResponse(
                 {"error": "Failed to update subscription"}, status=500
             )
+        bump_version(request.user)
 
         subscription = subscription_from_row(updated)
 
@@ -347,6 +359,7 @@ def subscription_delete(request, subscription_id):
             return JsonResponse(
                 {"error": "Failed to delete subscription"}, status=500
             )
+        bump_version(request.user)
 
         return JsonResponse({"message": "Subscription deleted"})
     except Exception as e:
@@ -406,6 +419,7 @@ def subscription_update_status(request, subscription_id):
             return JsonResponse(
                 {"error": "Failed to update subscription status"}, status=500
             )
+        bump_version(request.user)
 
         subscription = subscription_from_row(updated)
 
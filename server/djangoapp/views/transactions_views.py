@@ -1,14 +1,18 @@
 import json
 import logging
+from datetime import date
 from decimal import Decimal
 
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
-from ..restapi import get_request, post_request, patch_request, delete_request
-from ..services.api_adapters import transaction_from_row
+from ..restapi import get_request, page_request, post_request, patch_request, delete_request
+from ..services.api_adapters import transaction_from_row, get_total_and_count
+from ..streaming import StreamingJsonResponse, iter_rows
+from ..services.category_keys import category_key
 from ..services.date_filter import get_date_bounds
+from ..summary_cache import bump_version
 
 logger = logging.getLogger(__name__)
 
@@ -23,19 +27,52 @@ def get_transactions_data(user, period):
     transaction_params = {"user_id": user.id}
 
     if start and end:
-        transaction_params["date__gte"]: _iso_date(start)
-        transaction_params["date__lte"]: _iso_date(end)
-    # Get transactions for the period
-    transactions = get_request("transactions/", **transaction_params) or []
-
-    total_spent = sum((Decimal(str(t["amount"])) for t in transactions), Decimal('0'))
+        transaction_params["date__gte"] = _iso_date(start)
+        transaction_params["date__lte"] = _iso_date(end)
+    # Total and count for the period, summed by the API
+    total_spent, count = get_total_and_count("transactions/", **transaction_params)
 
     return {
         "total_spent": float(total_spent),
-        "count": len(transactions),
+        "count": count,
     }
     
+# Newest first; id breaks ties between transactions on the same day so
+# keyset pages never skip or repeat a row.
+TRANSACTION_ORDER = ("-date", "-id")
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _parse_cursor(cursor):
+    """Check a "<date>,<id>" cursor from a previous page. Returns it, or None if malformed."""
+    try:
+        day, transaction_id = cursor.split(",")
+        date.fromisoformat(day)
+        int(transaction_id)
+    except ValueError:
+        return None
+    return cursor
+
+
+def _transaction_data(transaction):
+    return {
+        "id": transaction.id,
+        "amount": float(transaction.amount),
+        "date": transaction.date.isoformat() if transaction.date else None,
+        "description": transaction.description,
+        "category": transaction.category
+    }
+
+
 def get_transactions(request):
+    """
+    List the user's transactions, newest first.
+
+    Pass ?limit=N (up to MAX_PAGE_SIZE) and/or ?cursor=<next_cursor> to
+    page through them instead of getting every row; next_cursor in the
+    response is null on the last page. The full list is streamed.
+    """
     if not request.user.is_authenticated:
         return JsonResponse(
             {"error": "Unauthorized"}, status=401
@@ -48,32 +85,48 @@ def get_transactions(request):
             {"error": "Method Not Allowed"}, status=405
         )
 
+    limit = request.GET.get("limit")
+    cursor = request.GET.get("cursor")
+    paginated = limit is not None or cursor is not None
+    if paginated:
+        try:
+            limit = min(int(limit or PAGE_SIZE), MAX_PAGE_SIZE)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return JsonResponse({"error": "limit must be a positive integer"}, status=400)
+        if cursor is not None and _parse_cursor(cursor) is None:
+            return JsonResponse({"error": "Invalid cursor"}, status=400)
+
     try:
         params = {"user_id": request.user.id}
         if category:
-            params["category"] = category
-
-        rows = get_request("transactions/", **params) or []
-        transactions = [transaction_from_row(r) for r in rows]
-        transactions.sort(key=lambda t: t.date, reverse=True)
-
-        transactions_data = []
-        for transaction in transactions:
-            transactions_data.append({
-                "id": transaction.id,
-                "amount": float(transaction.amount),
-                "date": transaction.date.isoformat() if transaction.date else None,
-                "description": transaction.description,
-                "category": transaction.category
-            })
+            params["category_key"] = category_key(category)
+
+        user_data = {
+            "id": request.user.id,
+            "username": request.user.username,
+            "is_authenticated": request.user.is_authenticated,
+        }
+
+        # Sorting happens in the API, on the (user, date) index
+        if not paginated:
+            # The whole history: stream it instead of building it in memory
+            rows = iter_rows("transactions/", TRANSACTION_ORDER, **params)
+            return StreamingJsonResponse(
+                "transactions",
+                (_transaction_data(transaction_from_row(r)) for r in rows),
+                tail=lambda: {"next_cursor": None, "user": user_data},
+            )
 
+        rows, next_cursor = page_request("transactions/", TRANSACTION_ORDER, limit, after=cursor, **params)
+        if rows is None:
+            # Not an empty page: the client would take it as the end of the history
+            return JsonResponse({"error": "Failed to fetch transactions"}, status=500)
         return JsonResponse({
-            "transactions": transactions_data,
-            "user": {
-                "id": request.user.id,
-                "username": request.user.username,
-                "is_authenticated": request.user.is_authenticated,
-            }
+            "transactions": [_transaction_data(transaction_from_row(r)) for r in rows],
+            "next_cursor": next_cursor,
+            "user": user_data,
         })
     except Exception as e:
         logger.error(f"Error fetching transactions: {e}")
@@ -117,6 +170,7 @@ def transaction_create(request):
         return JsonResponse(
             {"error": "Failed to create transaction."}, status=500
         )
+    bump_version(request.user)
 
     transaction = transaction_from_row(row)
 
@@ -178,6 +232,7 @@ def transaction_update(request, transaction_id):
         return JsonResponse(
             {"error": "Failed to update transaction"}, status=500
         )
+    bump_version(request.user)
 
     transaction = transaction_from_row(updated)
 
@@ -236,6 +291,8 @@ def transaction_delete(request):
         result = delete_request(f"transactions/{tid}")
         if result is not None: # Successful deletion
             deleted_count += 1
+    if deleted_count:
+        bump_version(request.user)
 
     return JsonResponse({
         "message": f"Deleted {deleted_count} transaction record(s).",
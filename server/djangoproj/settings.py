@@ -120,10 +120,31 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "djangoapp.middleware.GatewayCacheMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Cross-request cache, used for the per-user dashboard summaries
+# (djangoapp/summary_cache.py). With several web processes set REDIS_URL
+# (needs the `redis` package) so they share one cache; the in-process
+# LocMemCache fallback is fine for development and tests.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "money-manager",
+        }
+    }
+
 SESSION_COOKIE_AGE = 3600              # 1 hour (default is 2 weeks)
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 SESSION_COOKIE_HTTPONLY = True          # Prevent JavaScript access